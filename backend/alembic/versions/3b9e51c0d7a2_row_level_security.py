@@ -0,0 +1,68 @@
+"""row-level-security
+
+Revision ID: 3b9e51c0d7a2
+Revises: 691fbbe24d41
+Create Date: 2025-02-03 10:12:41.508213
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b9e51c0d7a2"
+down_revision: str | None = "691fbbe24d41"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ("actor", "tour", "event")
+
+READ_POLICY = """
+    current_setting('app.is_superuser', true) = 'on'
+    OR other_read = true
+    OR owner_id = nullif(current_setting('app.user_id', true), '')::uuid
+    OR (member_read = true AND current_setting('app.is_member', true) = 'on')
+    OR (
+        group_read = true
+        AND group_owner_id = ANY (
+            string_to_array(nullif(current_setting('app.group_ids', true), ''), ',')::uuid[]
+        )
+    )
+"""
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            CREATE ROLE app_rls NOLOGIN;
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$
+        """
+    )
+    op.execute("GRANT app_rls TO CURRENT_USER")
+    op.execute("GRANT USAGE ON SCHEMA public TO app_rls")
+    op.execute(
+        "GRANT SELECT, INSERT, UPDATE, DELETE ON ALL TABLES IN SCHEMA public TO app_rls"
+    )
+    op.execute(
+        "ALTER DEFAULT PRIVILEGES IN SCHEMA public "
+        "GRANT SELECT, INSERT, UPDATE, DELETE ON TABLES TO app_rls"
+    )
+
+    # Not forced: the owner of the tables bypasses the policies
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+        op.execute(f"CREATE POLICY {table}_read ON {table} FOR SELECT USING ({READ_POLICY})")
+        op.execute(f"CREATE POLICY {table}_insert ON {table} FOR INSERT WITH CHECK (true)")
+        op.execute(f"CREATE POLICY {table}_update ON {table} FOR UPDATE USING (true)")
+        op.execute(f"CREATE POLICY {table}_delete ON {table} FOR DELETE USING (true)")
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        for policy in ("read", "insert", "update", "delete"):
+            op.execute(f"DROP POLICY IF EXISTS {table}_{policy} ON {table}")
+        op.execute(f"ALTER TABLE {table} DISABLE ROW LEVEL SECURITY")
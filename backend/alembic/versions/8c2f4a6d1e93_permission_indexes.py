@@ -0,0 +1,52 @@
+"""permission-indexes
+
+Revision ID: 8c2f4a6d1e93
+Revises: 3b9e51c0d7a2
+Create Date: 2025-02-05 09:41:27.118506
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c2f4a6d1e93"
+down_revision: Union[str, None] = "3b9e51c0d7a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+tables = ("actor", "tour", "event")
+
+
+def upgrade() -> None:
+    for table in tables:
+        op.create_index(f"ix_{table}_owner_id", table, ["owner_id"])
+        op.create_index(
+            f"ix_{table}_group_owner_id_group_read",
+            table,
+            ["group_owner_id"],
+            postgresql_where=sa.text("group_read"),
+        )
+        op.create_index(
+            f"ix_{table}_member_read",
+            table,
+            ["id"],
+            postgresql_where=sa.text("member_read"),
+        )
+        op.create_index(
+            f"ix_{table}_other_read",
+            table,
+            ["id"],
+            postgresql_where=sa.text("other_read"),
+        )
+
+
+def downgrade() -> None:
+    for table in tables:
+        op.drop_index(f"ix_{table}_other_read", table_name=table)
+        op.drop_index(f"ix_{table}_member_read", table_name=table)
+        op.drop_index(f"ix_{table}_group_owner_id_group_read", table_name=table)
+        op.drop_index(f"ix_{table}_owner_id", table_name=table)
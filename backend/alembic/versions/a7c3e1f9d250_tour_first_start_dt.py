@@ -0,0 +1,39 @@
+"""tour-first-start-dt
+
+Revision ID: a7c3e1f9d250
+Revises: f3b8d2e6a419
+Create Date: 2025-02-14 16:02:41.773190
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c3e1f9d250"
+down_revision: str | None = "f3b8d2e6a419"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("tour", sa.Column("first_start_dt", sa.DateTime(), nullable=True))
+    op.add_column("tour", sa.Column("year", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE tour SET first_start_dt = (
+            SELECT min(event.start_dt) FROM event WHERE event.tour_id = tour.id
+        )
+        """
+    )
+    op.execute("UPDATE tour SET year = extract(year FROM first_start_dt)")
+    op.create_index("ix_tour_year", "tour", ["year"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tour_year", table_name="tour")
+    op.drop_column("tour", "year")
+    op.drop_column("tour", "first_start_dt")
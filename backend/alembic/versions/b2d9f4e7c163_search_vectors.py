@@ -0,0 +1,73 @@
+"""search-vectors
+
+Revision ID: b2d9f4e7c163
+Revises: a7c3e1f9d250
+Create Date: 2025-02-15 10:21:37.402518
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b2d9f4e7c163"
+down_revision: str | None = "a7c3e1f9d250"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+SEARCH_VECTORS = {
+    "org": (
+        "setweight(to_tsvector('french', immutable_unaccent(coalesce(name, ''))), 'A')"
+        " || setweight(to_tsvector('french', "
+        "immutable_unaccent(coalesce(description, ''))), 'B')"
+    ),
+    "person": (
+        "setweight(to_tsvector('french', immutable_unaccent(coalesce(name, ''))), 'A')"
+        " || setweight(to_tsvector('french', "
+        "immutable_unaccent(coalesce(role, ''))), 'C')"
+    ),
+    "tour": (
+        "setweight(to_tsvector('french', immutable_unaccent(coalesce(name, ''))), 'A')"
+        " || setweight(to_tsvector('french', "
+        "immutable_unaccent(coalesce(description, ''))), 'B')"
+    ),
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+        """
+    )
+    for table, expression in SEARCH_VECTORS.items():
+        op.add_column(
+            table,
+            sa.Column(
+                "search_vector",
+                postgresql.TSVECTOR(),
+                sa.Computed(expression, persisted=True),
+                nullable=False,
+            ),
+        )
+        op.create_index(
+            f"ix_{table}_search_vector",
+            table,
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+        )
+
+
+def downgrade() -> None:
+    for table in SEARCH_VECTORS:
+        op.drop_index(f"ix_{table}_search_vector", table_name=table)
+        op.drop_column(table, "search_vector")
+    op.execute("DROP FUNCTION IF EXISTS immutable_unaccent(text)")
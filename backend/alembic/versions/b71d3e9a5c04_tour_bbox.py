@@ -0,0 +1,58 @@
+"""tour-bbox
+
+Revision ID: b71d3e9a5c04
+Revises: 8c2f4a6d1e93
+Create Date: 2025-02-07 15:03:52.640871
+
+"""
+
+from collections.abc import Sequence
+
+import geoalchemy2
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b71d3e9a5c04"
+down_revision: str | None = "8c2f4a6d1e93"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tour",
+        sa.Column(
+            "bbox",
+            geoalchemy2.types.Geometry(
+                geometry_type="GEOMETRY",
+                srid=4326,
+                spatial_index=False,
+                from_text="ST_GeomFromEWKT",
+                name="geometry",
+            ),
+            nullable=True,
+        ),
+    )
+    op.execute(
+        """
+        UPDATE tour SET bbox = (
+            SELECT ST_Envelope(ST_Union(addressgeo.geom_point))
+            FROM addressgeo
+            JOIN contact ON addressgeo.id = contact.address_id
+            JOIN actor ON contact.id = actor.contact_id
+            JOIN eventactorassoc ON actor.id = eventactorassoc.actor_id
+            JOIN event ON eventactorassoc.event_id = event.id
+            WHERE event.tour_id = tour.id
+        )
+        """
+    )
+    op.create_index(
+        "ix_tour_bbox", "tour", ["bbox"], unique=False, postgresql_using="gist"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tour_bbox", table_name="tour", postgresql_using="gist")
+    op.drop_column("tour", "bbox")
@@ -0,0 +1,38 @@
+"""name-trigram-indexes
+
+Revision ID: c8e1a5f3d274
+Revises: b2d9f4e7c163
+Create Date: 2025-02-15 15:47:12.918356
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c8e1a5f3d274"
+down_revision: str | None = "b2d9f4e7c163"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TRIGRAM_TABLES = ("org", "person", "tour", "activity", "discipline", "mobility")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table in TRIGRAM_TABLES:
+        op.create_index(
+            f"ix_{table}_name_trgm",
+            table,
+            [sa.text("immutable_unaccent(name) gin_trgm_ops")],
+            unique=False,
+            postgresql_using="gin",
+        )
+
+
+def downgrade() -> None:
+    for table in TRIGRAM_TABLES:
+        op.drop_index(f"ix_{table}_name_trgm", table_name=table)
@@ -0,0 +1,43 @@
+"""addressgeo-spatial-indexes
+
+Revision ID: d4a8c1f7b2e6
+Revises: b71d3e9a5c04
+Create Date: 2025-02-10 11:26:08.375912
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a8c1f7b2e6"
+down_revision: Union[str, None] = "b71d3e9a5c04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_addressgeo_geom_point",
+        "addressgeo",
+        ["geom_point"],
+        unique=False,
+        postgresql_using="gist",
+    )
+    op.create_index(
+        "idx_addressgeo_geom_shape",
+        "addressgeo",
+        ["geom_shape"],
+        unique=False,
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "idx_addressgeo_geom_shape", table_name="addressgeo", postgresql_using="gist"
+    )
+    op.drop_index(
+        "idx_addressgeo_geom_point", table_name="addressgeo", postgresql_using="gist"
+    )
@@ -0,0 +1,51 @@
+"""keyset-sort-keys
+
+Revision ID: d6f2b8a4e195
+Revises: c8e1a5f3d274
+Create Date: 2025-02-16 11:08:54.630417
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d6f2b8a4e195"
+down_revision: str | None = "c8e1a5f3d274"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "actor",
+        sa.Column("sort_name", sa.String(), nullable=False, server_default=""),
+    )
+    op.alter_column("actor", "sort_name", server_default=None)
+    op.execute(
+        """
+        UPDATE actor SET sort_name = coalesce(org.name, person.name, '')
+        FROM actor AS a
+        LEFT OUTER JOIN org ON org.id = a.id
+        LEFT OUTER JOIN person ON person.id = a.id
+        WHERE a.id = actor.id
+        """
+    )
+    op.create_index(
+        "ix_actor_sort_name_id", "actor", ["sort_name", "id"], unique=False
+    )
+    op.create_index(
+        "ix_tour_sort_year_id",
+        "tour",
+        [sa.text("coalesce(year, 0)"), "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tour_sort_year_id", table_name="tour")
+    op.drop_index("ix_actor_sort_name_id", table_name="actor")
+    op.drop_column("actor", "sort_name")
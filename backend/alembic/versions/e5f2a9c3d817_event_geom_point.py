@@ -0,0 +1,62 @@
+"""event-geom-point
+
+Revision ID: e5f2a9c3d817
+Revises: d4a8c1f7b2e6
+Create Date: 2025-02-12 10:21:37.218405
+
+"""
+
+from collections.abc import Sequence
+
+import geoalchemy2
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5f2a9c3d817"
+down_revision: str | None = "d4a8c1f7b2e6"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "event",
+        sa.Column(
+            "geom_point",
+            geoalchemy2.types.Geometry(
+                geometry_type="POINT",
+                srid=4326,
+                spatial_index=False,
+                from_text="ST_GeomFromEWKT",
+                name="geometry",
+            ),
+            nullable=True,
+        ),
+    )
+    op.execute(
+        """
+        UPDATE event SET geom_point = (
+            SELECT ST_Centroid(ST_Collect(addressgeo.geom_point))
+            FROM addressgeo
+            JOIN contact ON addressgeo.id = contact.address_id
+            JOIN actor ON contact.id = actor.contact_id
+            JOIN eventactorassoc ON actor.id = eventactorassoc.actor_id
+            WHERE eventactorassoc.event_id = event.id
+            AND eventactorassoc.data ->> 'role' = 'diffusion'
+        )
+        """
+    )
+    op.create_index(
+        "ix_event_geom_point",
+        "event",
+        ["geom_point"],
+        unique=False,
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_geom_point", table_name="event", postgresql_using="gist")
+    op.drop_column("event", "geom_point")
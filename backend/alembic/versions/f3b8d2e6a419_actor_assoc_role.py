@@ -0,0 +1,41 @@
+"""actor-assoc-role
+
+Revision ID: f3b8d2e6a419
+Revises: e5f2a9c3d817
+Create Date: 2025-02-13 09:47:12.530917
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f3b8d2e6a419"
+down_revision: str | None = "e5f2a9c3d817"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Tables and the column of their parent
+ASSOC_TABLES = {
+    "orgactorassoc": "org_id",
+    "touractorassoc": "tour_id",
+    "eventactorassoc": "event_id",
+}
+
+
+def upgrade() -> None:
+    for table, parent_id in ASSOC_TABLES.items():
+        op.add_column(table, sa.Column("role", sa.String(), nullable=True))
+        op.execute(f"UPDATE {table} SET role = data ->> 'role'")
+        op.create_index(
+            f"ix_{table}_{parent_id}_role", table, [parent_id, "role"], unique=False
+        )
+
+
+def downgrade() -> None:
+    for table, parent_id in ASSOC_TABLES.items():
+        op.drop_index(f"ix_{table}_{parent_id}_role", table_name=table)
+        op.drop_column(table, "role")
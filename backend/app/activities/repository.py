@@ -1,11 +1,22 @@
 from collections.abc import Sequence
+from operator import attrgetter
+from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy_utils import Ltree
 
 from app.core.db.models import Activity
-from app.core.schemas import PageParams
+from app.core.pagination import SortKey, get_page, get_page_async, paginate
+from app.core.schemas import KeysetPageParams
+
+# Paths are unique
+ACTIVITY_SORT_KEYS = (SortKey(Activity.path, attrgetter("path")),)
+
+
+def get_activity_statement(*, path: str | Ltree) -> Select[tuple[Activity]]:
+    return select(Activity).where(Activity.path == Ltree(path))
 
 
 def get_activity(
@@ -13,29 +24,52 @@ def get_activity(
     session: Session,
     path: str | Ltree,
 ) -> Activity:
-    statement = select(Activity).where(Activity.path == Ltree(path))
-    return session.scalars(statement).one()
+    return session.scalars(get_activity_statement(path=path)).one()
 
 
-def get_activities(
+async def get_activity_async(
+    *,
+    session: AsyncSession,
+    path: str | Ltree,
+) -> Activity:
+    return (await session.scalars(get_activity_statement(path=path))).one()
+
+
+def get_activities_statements(
     *,
-    session: Session,
     path: str | None = None,
-    page_params: PageParams = PageParams(),
-) -> tuple[Sequence[Activity], int]:
+    page_params: KeysetPageParams = KeysetPageParams(),
+) -> tuple[Select[Any], Select[tuple[int]]]:
     count_statement = select(func.count()).select_from(Activity)
-    statement = (
-        select(Activity)
-        .order_by(Activity.path.asc())
-        .offset(page_params.offset)
-        .limit(page_params.limit)
-    )
+    statement = paginate(select(Activity), page_params, ACTIVITY_SORT_KEYS)
 
     if path is not None and path != "":
         filter_clause = Activity.path.descendant_of(Ltree(path))
         statement = statement.filter(filter_clause)
         count_statement = count_statement.filter(filter_clause)
 
-    count = session.scalars(count_statement).one()
-    activities = session.scalars(statement).all()
-    return activities, count
+    return statement, count_statement
+
+
+def get_activities(
+    *,
+    session: Session,
+    path: str | None = None,
+    page_params: KeysetPageParams = KeysetPageParams(),
+) -> tuple[Sequence[Activity], int]:
+    statement, count_statement = get_activities_statements(
+        path=path, page_params=page_params
+    )
+    return get_page(session, statement, count_statement, page_params)
+
+
+async def get_activities_async(
+    *,
+    session: AsyncSession,
+    path: str | None = None,
+    page_params: KeysetPageParams = KeysetPageParams(),
+) -> tuple[Sequence[Activity], int]:
+    statement, count_statement = get_activities_statements(
+        path=path, page_params=page_params
+    )
+    return await get_page_async(session, statement, count_statement, page_params)
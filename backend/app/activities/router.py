@@ -4,9 +4,10 @@ from sqlalchemy.exc import NoResultFound
 from app.activities import repository
 from app.activities.schemas import TreePublic
 from app.core.db.session import SessionDep
+from app.core.pagination import get_next_cursor
 from app.core.schemas import (
+    KeysetPageParamsDep,
     PagedResponse,
-    PageParamsDep,
 )
 
 router = APIRouter()
@@ -16,7 +17,7 @@ router = APIRouter()
 def get_activities_by_path(
     session: SessionDep,
     path: str,
-    page_params: PageParamsDep,
+    page_params: KeysetPageParamsDep,
     descendant: bool = False,
 ) -> PagedResponse[TreePublic] | TreePublic:
     """
@@ -41,6 +42,9 @@ def get_activities_by_path(
                 "total": total,
                 "limit": page_params.limit,
                 "offset": page_params.offset,
+                "next_cursor": get_next_cursor(
+                    results, page_params, repository.ACTIVITY_SORT_KEYS
+                ),
                 "results": results,
             }
         )
@@ -48,7 +52,7 @@ def get_activities_by_path(
 
 @router.get("/", response_model=PagedResponse[TreePublic])
 def get_activities(
-    session: SessionDep, page_params: PageParamsDep
+    session: SessionDep, page_params: KeysetPageParamsDep
 ) -> PagedResponse[TreePublic]:
     """
     Read all activities.
@@ -59,6 +63,9 @@ def get_activities(
             "total": total,
             "limit": page_params.limit,
             "offset": page_params.offset,
+            "next_cursor": get_next_cursor(
+                results, page_params, repository.ACTIVITY_SORT_KEYS
+            ),
             "results": results,
         }
     )
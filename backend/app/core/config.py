@@ -34,6 +34,18 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Resolved security contexts, per worker process
+    SECURITY_CONTEXT_CACHE_SIZE: int = 1024
+    SECURITY_CONTEXT_CACHE_TTL: int = 60
+    # Restricted models by statement structure, per worker process
+    PERMISSION_PLAN_CACHE_SIZE: int = 512
+    # Builds /explore responses with Pydantic models ("python") or in Postgres ("sql")
+    EXPLORE_ENGINE: Literal["python", "sql"] = "python"
+    # Serialized /explore responses, per worker process
+    EXPLORE_CACHE_SIZE: int = 256
+    EXPLORE_CACHE_TTL: int = 60
+    # /explore clusters the points below this zoom level
+    EXPLORE_CLUSTER_MAX_ZOOM: int = 12
     FRONTEND_HOST: str = "http://localhost:4173"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
@@ -55,6 +67,14 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
+    # Connection pool, per worker process
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_MAX_OVERFLOW: int = 10
+    POSTGRES_POOL_PRE_PING: bool = True
+    # Recycle connections after this many seconds, -1 to disable
+    POSTGRES_POOL_RECYCLE: int = 1800
+    # Let Postgres filter rows by permissions instead of the ORM, see app.core.db.rls
+    POSTGRES_ROW_LEVEL_SECURITY: bool = False
 
     @computed_field  # type: ignore[prop-decorator]
     @property
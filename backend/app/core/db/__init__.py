@@ -0,0 +1,2 @@
+# Register the listeners maintaining denormalized columns
+from app.core.db import denormalized  # noqa: F401
@@ -0,0 +1,300 @@
+"""
+Denormalized columns, recomputed by the ORM when the rows they derive from are
+flushed.
+
+Recomputations are done in SQL in `after_flush`, from the ids of the flushed
+objects, and the stale attributes of the loaded objects are expired in
+`after_flush_postexec`. Rows changed outside of the ORM are not tracked.
+
+The `role` of the actor associations, moving out of their `data`, is kept in
+sync with `data["role"]` in `before_flush`, as is the `sort_name` of the actors.
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from typing import Any
+
+from geoalchemy2.functions import ST_Centroid, ST_Collect, ST_Envelope, ST_Union
+from sqlalchemy import (
+    ColumnElement,
+    Connection,
+    Integer,
+    Select,
+    cast,
+    func,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.event import listens_for
+from sqlalchemy.orm import Session, attributes
+from sqlalchemy.orm.session import UOWTransaction
+from sqlalchemy.orm.util import identity_key
+
+from app.core.db.models import (
+    Actor,
+    AddressGeo,
+    Base,
+    Contact,
+    Event,
+    EventActorAssoc,
+    Org,
+    OrgActorAssoc,
+    Person,
+    Tour,
+    TourActorAssoc,
+)
+from app.core.db.rls import without_row_level_security
+
+
+def get_tour_bbox_expression() -> ColumnElement[Any]:
+    """
+    Bounding box of the addresses of all the event actors of a tour
+    """
+    return (
+        select(ST_Envelope(ST_Union(AddressGeo.geom_point)))
+        .join(Contact, AddressGeo.id == Contact.address_id)
+        .join(Actor, Contact.id == Actor.contact_id)
+        .join(EventActorAssoc, Actor.id == EventActorAssoc.actor_id)
+        .join(Event, EventActorAssoc.event_id == Event.id)
+        .filter(Event.tour_id == Tour.id)
+        .correlate(Tour)
+        .scalar_subquery()
+    )
+
+
+def get_event_geom_point_expression() -> ColumnElement[Any]:
+    """
+    Center of the addresses of the venues of an event, its actors with the
+    diffusion role
+    """
+    return (
+        select(ST_Centroid(ST_Collect(AddressGeo.geom_point)))
+        .join(Contact, AddressGeo.id == Contact.address_id)
+        .join(Actor, Contact.id == Actor.contact_id)
+        .join(EventActorAssoc, Actor.id == EventActorAssoc.actor_id)
+        .filter(EventActorAssoc.event_id == Event.id)
+        .filter(EventActorAssoc.role == "diffusion")
+        .correlate(Event)
+        .scalar_subquery()
+    )
+
+
+def get_values(obj: object, key: str) -> set[Any]:
+    """
+    Return the current and previous values of an attribute
+    """
+    history = attributes.get_history(obj, key)
+    return {
+        value
+        for value in (*history.added, *history.unchanged, *history.deleted)
+        if value is not None
+    }
+
+
+def has_changes(obj: object, key: str) -> bool:
+    return attributes.get_history(obj, key).has_changes()
+
+
+@dataclass
+class FlushedVenues:
+    """
+    Ids of the flushed rows the tour boxes and the event points derive from
+    """
+
+    tour_ids: set[uuid.UUID] = field(default_factory=set)
+    event_ids: set[uuid.UUID] = field(default_factory=set)
+    actor_ids: set[uuid.UUID] = field(default_factory=set)
+    contact_ids: set[uuid.UUID] = field(default_factory=set)
+    address_ids: set[uuid.UUID] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.tour_ids
+            or self.event_ids
+            or self.actor_ids
+            or self.contact_ids
+            or self.address_ids
+        )
+
+    def get_affected_events(self) -> Select[tuple[uuid.UUID, uuid.UUID]]:
+        """
+        Select the ids and tour ids of the events whose actors changed
+        """
+        # The flushed assocs are matched by their event id, since deleted ones
+        # are already gone from the table
+        actor_event_ids = (
+            select(EventActorAssoc.event_id)
+            .join(Actor, Actor.id == EventActorAssoc.actor_id)
+            .outerjoin(Contact, Contact.id == Actor.contact_id)
+            .where(
+                or_(
+                    Actor.id.in_(self.actor_ids),
+                    Contact.id.in_(self.contact_ids),
+                    Contact.address_id.in_(self.address_ids),
+                )
+            )
+        )
+        return select(Event.id, Event.tour_id).where(
+            or_(Event.id.in_(self.event_ids), Event.id.in_(actor_event_ids))
+        )
+
+
+def get_flushed_venues(session: Session) -> FlushedVenues:
+    venues = FlushedVenues()
+
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        deleted = obj in session.deleted
+        if isinstance(obj, Event) and (deleted or has_changes(obj, "tour_id")):
+            venues.tour_ids |= get_values(obj, "tour_id")
+        elif isinstance(obj, EventActorAssoc):
+            venues.event_ids |= get_values(obj, "event_id")
+        elif isinstance(obj, Actor) and has_changes(obj, "contact_id"):
+            venues.actor_ids.add(obj.id)
+        elif isinstance(obj, Contact) and has_changes(obj, "address_id"):
+            venues.contact_ids.add(obj.id)
+        elif isinstance(obj, AddressGeo) and has_changes(obj, "geom_point"):
+            venues.address_ids.add(obj.id)
+
+    return venues
+
+
+def refresh_tour_bboxes(
+    connection: Connection, venues: FlushedVenues
+) -> set[uuid.UUID]:
+    """
+    Recompute `Tour.bbox` for the tours affected by the pending flush and return
+    their ids.
+    """
+    affected_tour_ids = venues.get_affected_events().with_only_columns(Event.tour_id)
+    statement = (
+        update(Tour)
+        .where(or_(Tour.id.in_(venues.tour_ids), Tour.id.in_(affected_tour_ids)))
+        .values(bbox=get_tour_bbox_expression())
+        .returning(Tour.id)
+    )
+
+    # The box covers every venue, whoever flushes
+    with without_row_level_security(connection):
+        return set(connection.scalars(statement))
+
+
+def refresh_event_geom_points(
+    connection: Connection, venues: FlushedVenues
+) -> set[uuid.UUID]:
+    """
+    Recompute `Event.geom_point` for the events affected by the pending flush and
+    return their ids.
+    """
+    affected_event_ids = venues.get_affected_events().with_only_columns(Event.id)
+    statement = (
+        update(Event)
+        .where(Event.id.in_(affected_event_ids))
+        .values(geom_point=get_event_geom_point_expression())
+        .returning(Event.id)
+    )
+
+    # The point covers every venue, whoever flushes
+    with without_row_level_security(connection):
+        return set(connection.scalars(statement))
+
+
+def get_flushed_dated_tour_ids(session: Session) -> set[uuid.UUID]:
+    """
+    Return the ids of the tours whose events were added, removed or rescheduled
+    """
+    tour_ids: set[uuid.UUID] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Event) and (
+            obj in session.new
+            or obj in session.deleted
+            or has_changes(obj, "start_dt")
+            or has_changes(obj, "tour_id")
+        ):
+            tour_ids |= get_values(obj, "tour_id")
+    return tour_ids
+
+
+def refresh_tour_dates(
+    connection: Connection, tour_ids: set[uuid.UUID]
+) -> set[uuid.UUID]:
+    """
+    Recompute `Tour.first_start_dt` and `Tour.year` and return the ids of the
+    refreshed tours.
+    """
+    first_start_dt = (
+        select(func.min(Event.start_dt))
+        .where(Event.tour_id == Tour.id)
+        .correlate(Tour)
+        .scalar_subquery()
+    )
+    statement = (
+        update(Tour)
+        .where(Tour.id.in_(tour_ids))
+        .values(
+            first_start_dt=first_start_dt,
+            year=cast(func.extract("year", first_start_dt), Integer),
+        )
+        .returning(Tour.id)
+    )
+
+    # The dates cover every event, whoever flushes
+    with without_row_level_security(connection):
+        return set(connection.scalars(statement))
+
+
+def sync_assoc_role(assoc: OrgActorAssoc | TourActorAssoc | EventActorAssoc) -> None:
+    """
+    Copy the role from `data` to `role`, or the other way around when only
+    `role` was set
+    """
+    data_role = (assoc.data or {}).get("role")
+    if data_role == assoc.role:
+        return
+    if has_changes(assoc, "role") and not (
+        has_changes(assoc, "data") and data_role is not None
+    ):
+        assoc.data = {**(assoc.data or {}), "role": assoc.role}
+    else:
+        assoc.role = data_role
+
+
+@listens_for(Session, "before_flush")
+def sync_denormalized_columns(
+    session: Session, _flush_context: UOWTransaction, _instances: Any
+):
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, OrgActorAssoc | TourActorAssoc | EventActorAssoc):
+            sync_assoc_role(obj)
+        elif isinstance(obj, Org | Person) and obj.sort_name != obj.name:
+            obj.sort_name = obj.name
+
+
+@listens_for(Session, "after_flush")
+def refresh_denormalized_columns(session: Session, _flush_context: UOWTransaction):
+    # Attributes to expire after the flush, by model
+    refreshed: list[tuple[type[Base], set[uuid.UUID], list[str]]] = []
+    connection = session.connection()
+
+    dated_tour_ids = get_flushed_dated_tour_ids(session)
+    if dated_tour_ids:
+        tour_ids = refresh_tour_dates(connection, dated_tour_ids)
+        refreshed.append((Tour, tour_ids, ["first_start_dt", "year"]))
+
+    venues = get_flushed_venues(session)
+    if venues:
+        event_ids = refresh_event_geom_points(connection, venues)
+        refreshed.append((Event, event_ids, ["geom_point"]))
+        tour_ids = refresh_tour_bboxes(connection, venues)
+        refreshed.append((Tour, tour_ids, ["bbox"]))
+
+    session.info["refreshed_attributes"] = refreshed
+
+
+@listens_for(Session, "after_flush_postexec")
+def expire_denormalized_columns(session: Session, _flush_context: UOWTransaction):
+    for model, ids, names in session.info.pop("refreshed_attributes", ()):
+        for obj_id in ids:
+            obj = session.identity_map.get(identity_key(model, obj_id))
+            if obj is not None:
+                session.expire(obj, names)
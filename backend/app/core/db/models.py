@@ -5,19 +5,22 @@ from datetime import datetime
 from typing import Any
 
 from geoalchemy2 import Geometry
-from geoalchemy2.functions import ST_Envelope, ST_Union
 from sqlalchemy import (
     DateTime,
     ForeignKey,
+    Index,
     func,
+    literal_column,
     select,
+    text,
 )
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
     declared_attr,
+    has_inherited_table,
     mapped_column,
     relationship,
 )
@@ -25,6 +28,8 @@ from sqlalchemy.types import TypeDecorator
 from sqlalchemy_utils import Ltree
 from sqlalchemy_utils.types import LtreeType
 
+from app.core.db.search import generated_search_vector, trigram_index
+
 #
 # Bases, mixins and user
 #
@@ -76,6 +81,30 @@ class RowLevelRestrictionMixin:
     member_write: Mapped[bool] = mapped_column(default=False)
     other_read: Mapped[bool] = mapped_column(default=False)
 
+    @declared_attr.directive
+    def __table_args__(cls: type[Any]) -> tuple[Any, ...]:
+        """
+        Indexes for each arm of the permission filter, so Postgres can combine
+        them in a bitmap scan instead of scanning the table, see
+        `get_permission_filter`.
+        """
+        # Person and Org use the columns of the actor table
+        if has_inherited_table(cls):
+            return ()
+        table = cls.__tablename__
+        return (
+            Index(f"ix_{table}_owner_id", "owner_id"),
+            Index(
+                f"ix_{table}_group_owner_id_group_read",
+                "group_owner_id",
+                postgresql_where=text("group_read"),
+            ),
+            Index(
+                f"ix_{table}_member_read", "id", postgresql_where=text("member_read")
+            ),
+            Index(f"ix_{table}_other_read", "id", postgresql_where=text("other_read")),
+        )
+
 
 class PermissionsType(TypeDecorator):
     impl = JSONB
@@ -206,6 +235,9 @@ class Actor(RowLevelRestrictionMixin, Base):
         default=None,
     )
     contact: Mapped[Contact] = relationship(back_populates="actor")
+    # Name of the org or the person, for a sort index across both tables,
+    # maintained by app.core.db.denormalized
+    sort_name: Mapped[str] = mapped_column(default="")
 
     __mapper_args__ = {
         "polymorphic_on": type,
@@ -214,6 +246,9 @@ class Actor(RowLevelRestrictionMixin, Base):
     }
 
 
+Index("ix_actor_sort_name_id", Actor.sort_name, Actor.id)
+
+
 class Org(Actor):
     id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("actor.id"),
@@ -229,6 +264,12 @@ class Org(Actor):
         back_populates="org",
         cascade="all, delete-orphan",
     )
+    # Generated by Postgres, see app.core.db.search
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        generated_search_vector(("name", "A"), ("description", "B")),
+        deferred=True,
+    )
     __mapper_args__ = {
         "polymorphic_identity": "Org",
         "inherit_condition": id == Actor.id,
@@ -240,6 +281,10 @@ class Org(Actor):
         return f"{self.__class__.__name__}(id={self.id} name={self.name})"
 
 
+Index("ix_org_search_vector", Org.search_vector, postgresql_using="gin")
+trigram_index("ix_org_name_trgm", Org.name)
+
+
 class Person(Actor):
     id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("actor.id"),
@@ -250,6 +295,10 @@ class Person(Actor):
     user: Mapped[User | None] = relationship(
         back_populates="person", foreign_keys=[User.person_id]
     )
+    # Generated by Postgres, see app.core.db.search
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, generated_search_vector(("name", "A"), ("role", "C")), deferred=True
+    )
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(id={self.id} other_read={self.other_read} owner_id={self.owner_id})"
@@ -261,6 +310,10 @@ class Person(Actor):
     }
 
 
+Index("ix_person_search_vector", Person.search_vector, postgresql_using="gin")
+trigram_index("ix_person_name_trgm", Person.name)
+
+
 class Contact(Base):
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     email_address: Mapped[str | None] = mapped_column(default=None)
@@ -306,8 +359,12 @@ class AddressGeo(Base):
     administrative_area_2: Mapped[str | None] = mapped_column(default=None)
     administrative_area_3: Mapped[str | None] = mapped_column(default=None)
 
-    geom_point: Mapped[Geometry | None] = mapped_column(Geometry("POINT", srid=4326))
-    geom_shape: Mapped[Geometry | None] = mapped_column(Geometry("POLYGON", srid=4326))
+    geom_point: Mapped[Geometry | None] = mapped_column(
+        Geometry("POINT", srid=4326, spatial_index=False)
+    )
+    geom_shape: Mapped[Geometry | None] = mapped_column(
+        Geometry("POLYGON", srid=4326, spatial_index=False)
+    )
 
     def __repr__(self) -> str:
         if not self.q:
@@ -315,6 +372,11 @@ class AddressGeo(Base):
         return f"{self.__class__.__name__}({self.q})"
 
 
+# Spatial indexes are declared explicitly so `alembic check` sees them
+Index("idx_addressgeo_geom_point", AddressGeo.geom_point, postgresql_using="gist")
+Index("idx_addressgeo_geom_shape", AddressGeo.geom_shape, postgresql_using="gist")
+
+
 class Tour(Base, RowLevelRestrictionMixin):
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column()
@@ -332,75 +394,53 @@ class Tour(Base, RowLevelRestrictionMixin):
     actor_assocs: Mapped[list[TourActorAssoc]] = relationship(
         cascade="all, delete-orphan",
     )
-
-    @hybrid_property
-    def year(self) -> int | None:
-        if self.events:
-            # Filter out None values and get the year
-            years = [
-                event.start_dt.year
-                for event in self.events
-                if event.start_dt is not None
-            ]
-            return min(years) if years else None
-        return None
-
-    @year.expression  # type: ignore[no-redef]
-    def year(cls):
-        return (
-            select(func.extract("year", func.min(Event.start_dt)))
-            .where(Event.tour_id == cls.id)
-            .correlate(cls)
-            .label("year")
-        )
+    producer_assocs: Mapped[list[TourActorAssoc]] = relationship(
+        primaryjoin="and_(Tour.id == TourActorAssoc.tour_id, "
+        "TourActorAssoc.role == 'producer')",
+        viewonly=True,
+    )
+    # Bounding box of the event venues, maintained by app.core.db.denormalized
+    bbox: Mapped[Geometry | None] = mapped_column(
+        Geometry("GEOMETRY", srid=4326, spatial_index=False), default=None
+    )
+    # Start of the first event and its year, maintained by app.core.db.denormalized
+    first_start_dt: Mapped[datetime | None] = mapped_column(DateTime, default=None)
+    year: Mapped[int | None] = mapped_column(default=None)
+    # Generated by Postgres, see app.core.db.search
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        generated_search_vector(("name", "A"), ("description", "B")),
+        deferred=True,
+    )
 
     @hybrid_property
     def producers(self) -> list[Actor]:
-        if self.actor_assocs:
-            return [
-                a.actor
-                for a in self.actor_assocs
-                if a.data and a.data.get("role") == "producer"
-            ]
-        return []
+        return [a.actor for a in self.producer_assocs]
 
     @producers.expression  # type: ignore[no-redef]
     def producers(cls):
         return (
             select(Actor)
             .join(TourActorAssoc, Actor.id == TourActorAssoc.actor_id)
-            .join(Tour, Tour.id == TourActorAssoc.tour_id)
-            .where(Tour.id == cls.id)
-            .where(
-                func.jsonb_extract_path_text(TourActorAssoc.data, "role") == "producer"
-            )
+            .where(TourActorAssoc.tour_id == cls.id)
+            .where(TourActorAssoc.role == "producer")
             .subquery()
         )
 
-    @hybrid_property
-    def bbox(self):
-        """Returns the bounding box of all address points associated with the tour"""
-        raise NotImplementedError("Hybrid properties can't execute complex SQL")
-
-    @bbox.expression  # type: ignore[no-redef]
-    def bbox(cls):
-        """SQL expression for calculating the tour's bounding box"""
-        return (
-            select(ST_Envelope(ST_Union(AddressGeo.geom_point)))
-            .join(Contact, AddressGeo.id == Contact.address_id)
-            .join(Actor, Contact.id == Actor.contact_id)
-            .join(EventActorAssoc, Actor.id == EventActorAssoc.actor_id)
-            .join(Event, EventActorAssoc.event_id == Event.id)
-            .filter(Event.tour_id == cls.id)
-            .scalar_subquery()
-        )
-
     def __repr__(self) -> str:
         if not self.name:
             return super().__repr__()
         return f"{self.__class__.__name__}({self.name})"
 
 
+Index("ix_tour_bbox", Tour.bbox, postgresql_using="gist")
+Index("ix_tour_year", Tour.year)
+# Sort key of the tour listing, tours without events last
+Index("ix_tour_sort_year_id", func.coalesce(Tour.year, literal_column("0")), Tour.id)
+Index("ix_tour_search_vector", Tour.search_vector, postgresql_using="gin")
+trigram_index("ix_tour_name_trgm", Tour.name)
+
+
 class Event(Base, RowLevelRestrictionMixin):
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     name: Mapped[str | None] = mapped_column(default=None)
@@ -418,32 +458,34 @@ class Event(Base, RowLevelRestrictionMixin):
     actor_assocs: Mapped[list[EventActorAssoc]] = relationship(
         cascade="all, delete-orphan",
     )
+    venue_assocs: Mapped[list[EventActorAssoc]] = relationship(
+        primaryjoin="and_(Event.id == EventActorAssoc.event_id, "
+        "EventActorAssoc.role == 'diffusion')",
+        viewonly=True,
+    )
+    # Center of the event venues, maintained by app.core.db.denormalized
+    geom_point: Mapped[Geometry | None] = mapped_column(
+        Geometry("POINT", srid=4326, spatial_index=False), default=None
+    )
 
     @hybrid_property
     def event_venues(self) -> list[Actor]:
-        if self.actor_assocs:
-            return [
-                a.actor
-                for a in self.actor_assocs
-                if a.data and a.data.get("role") == "diffusion"
-            ]
-        return []
+        return [a.actor for a in self.venue_assocs]
 
     @event_venues.expression  # type: ignore[no-redef]
     def event_venues(cls):
         return (
             select(Actor)
             .join(EventActorAssoc, Actor.id == EventActorAssoc.actor_id)
-            .join(Event, Event.id == EventActorAssoc.tour_id)
-            .where(Event.id == cls.id)
-            .where(
-                func.jsonb_extract_path_text(EventActorAssoc.data, "role")
-                == "diffusion"
-            )
+            .where(EventActorAssoc.event_id == cls.id)
+            .where(EventActorAssoc.role == "diffusion")
             .subquery()
         )
 
 
+Index("ix_event_geom_point", Event.geom_point, postgresql_using="gist")
+
+
 #
 # Tags
 #
@@ -474,6 +516,11 @@ class Mobility(TreeBase):
     )
 
 
+trigram_index("ix_activity_name_trgm", Activity.name)
+trigram_index("ix_discipline_name_trgm", Discipline.name)
+trigram_index("ix_mobility_name_trgm", Mobility.name)
+
+
 #
 # Many to many relation tables
 #
@@ -520,6 +567,8 @@ class OrgActorAssoc(Base):
         foreign_keys=[actor_id],
     )
     data: Mapped[dict[str, Any] | None] = mapped_column(JSONB, default=None)
+    # Copied from `data["role"]`, see app.core.db.denormalized
+    role: Mapped[str | None] = mapped_column(default=None)
 
     def __repr__(self) -> str:
         return (
@@ -527,6 +576,9 @@ class OrgActorAssoc(Base):
         )
 
 
+Index("ix_orgactorassoc_org_id_role", OrgActorAssoc.org_id, OrgActorAssoc.role)
+
+
 class TourActorAssoc(Base):
     tour_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("tour.id"),
@@ -545,11 +597,16 @@ class TourActorAssoc(Base):
         foreign_keys=[actor_id],
     )
     data: Mapped[dict[str, Any]] = mapped_column(JSONB)
+    # Copied from `data["role"]`, see app.core.db.denormalized
+    role: Mapped[str | None] = mapped_column(default=None)
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(tour_id={self.tour_id} actor_id={self.actor_id})"
 
 
+Index("ix_touractorassoc_tour_id_role", TourActorAssoc.tour_id, TourActorAssoc.role)
+
+
 class TourDiscipline(Base):
     tour_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("tour.id"), primary_key=True)
     discipline_id: Mapped[uuid.UUID] = mapped_column(
@@ -588,6 +645,13 @@ class EventActorAssoc(Base):
         foreign_keys=[actor_id],
     )
     data: Mapped[dict[str, Any]] = mapped_column(JSONB)
+    # Copied from `data["role"]`, see app.core.db.denormalized
+    role: Mapped[str | None] = mapped_column(default=None)
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(event_id={self.event_id} actor_id={self.actor_id})"
+
+
+Index(
+    "ix_eventactorassoc_event_id_role", EventActorAssoc.event_id, EventActorAssoc.role
+)
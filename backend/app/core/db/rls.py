@@ -0,0 +1,118 @@
+"""
+Postgres Row Level Security policies, the database side of `get_permission_filter`.
+
+They are only enforced when `POSTGRES_ROW_LEVEL_SECURITY` is enabled: the security
+context is then pushed in transaction settings (see `push_security_context`) and the
+transaction switches to `RLS_ROLE`.
+
+RLS is enabled but not forced on the tables, so their owner, the role the
+application connects with and runs the migrations as, bypasses the policies.
+Otherwise the policy would be added to every query, and Postgres doesn't use
+operators that aren't leakproof, such as the PostGIS `&&`, the full-text `@@`
+or the trigram `<%`, as index conditions below a policy: the GiST, GIN and
+trigram indexes would be skipped. The application must therefore connect as
+the owner of the tables, or as a role with BYPASSRLS, when the mode is off.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import Connection, text
+
+from app.core.config import settings
+
+RLS_ROLE = "app_rls"
+
+RLS_TABLES = ("actor", "tour", "event")
+
+# Same rules as `get_permission_filter`
+READ_POLICY = """
+    current_setting('app.is_superuser', true) = 'on'
+    OR other_read = true
+    OR owner_id = nullif(current_setting('app.user_id', true), '')::uuid
+    OR (member_read = true AND current_setting('app.is_member', true) = 'on')
+    OR (
+        group_read = true
+        AND group_owner_id = ANY (
+            string_to_array(nullif(current_setting('app.group_ids', true), ''), ',')::uuid[]
+        )
+    )
+"""
+
+
+def create_row_level_security(connection: Connection) -> None:
+    connection.execute(
+        text(
+            f"""
+            DO $$
+            BEGIN
+                CREATE ROLE {RLS_ROLE} NOLOGIN;
+            EXCEPTION WHEN duplicate_object THEN NULL;
+            END $$
+            """
+        )
+    )
+    connection.execute(text(f"GRANT {RLS_ROLE} TO CURRENT_USER"))
+    connection.execute(text(f"GRANT USAGE ON SCHEMA public TO {RLS_ROLE}"))
+    connection.execute(
+        text(
+            "GRANT SELECT, INSERT, UPDATE, DELETE ON ALL TABLES IN SCHEMA public "
+            f"TO {RLS_ROLE}"
+        )
+    )
+    connection.execute(
+        text(
+            "ALTER DEFAULT PRIVILEGES IN SCHEMA public "
+            f"GRANT SELECT, INSERT, UPDATE, DELETE ON TABLES TO {RLS_ROLE}"
+        )
+    )
+
+    for table in RLS_TABLES:
+        connection.execute(text(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY"))
+        connection.execute(
+            text(
+                f"CREATE POLICY {table}_read ON {table} FOR SELECT USING ({READ_POLICY})"
+            )
+        )
+        # Writes are not restricted, like with the ORM filters
+        connection.execute(
+            text(
+                f"CREATE POLICY {table}_insert ON {table} FOR INSERT WITH CHECK (true)"
+            )
+        )
+        connection.execute(
+            text(f"CREATE POLICY {table}_update ON {table} FOR UPDATE USING (true)")
+        )
+        connection.execute(
+            text(f"CREATE POLICY {table}_delete ON {table} FOR DELETE USING (true)")
+        )
+
+
+def drop_row_level_security(connection: Connection) -> None:
+    for table in RLS_TABLES:
+        for policy in ("read", "insert", "update", "delete"):
+            connection.execute(
+                text(f"DROP POLICY IF EXISTS {table}_{policy} ON {table}")
+            )
+        connection.execute(text(f"ALTER TABLE {table} DISABLE ROW LEVEL SECURITY"))
+
+
+@contextmanager
+def without_row_level_security(connection: Connection) -> Iterator[None]:
+    """
+    Lift the policies for the statements run inside the block, for internal
+    bookkeeping that must see every row, then restore the security context.
+    """
+    if not settings.POSTGRES_ROW_LEVEL_SECURITY:
+        yield
+        return
+
+    role = connection.execute(text("SELECT current_setting('role')")).scalar_one()
+    # Back to the owner of the tables
+    connection.execute(text("SELECT set_config('role', 'none', true)"))
+    try:
+        yield
+    finally:
+        connection.execute(
+            text("SELECT set_config('role', :role, true)"), {"role": role}
+        )
@@ -0,0 +1,112 @@
+"""
+Full-text search on generated `tsvector` columns.
+
+The searchable columns of a table are concatenated in a `search_vector` column
+generated by Postgres, weighted by importance, and indexed with GIN. Both the
+documents and the queries go through unaccent with the French configuration, so
+"theatre" matches "Théâtre" and "spectacles" matches "spectacle".
+
+Names are also indexed by trigrams (pg_trgm) for the suggestions, which match
+partial and misspelled words, see `trigram_index`.
+
+`unaccent` is only stable, since it depends on its dictionary, which generated
+columns and index expressions don't accept: `immutable_unaccent` wraps it with
+an explicit dictionary, see `create_search_functions`.
+"""
+
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Computed,
+    Connection,
+    Index,
+    SQLColumnExpression,
+    func,
+    literal,
+    text,
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSQUERY
+
+SEARCH_CONFIG = "french"
+
+
+def create_search_functions(connection: Connection) -> None:
+    """
+    Create `immutable_unaccent`, the unaccent extension must exist
+    """
+    connection.execute(
+        text(
+            """
+            CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text
+            LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+            AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+            """
+        )
+    )
+
+
+def drop_search_functions(connection: Connection) -> None:
+    connection.execute(text("DROP FUNCTION IF EXISTS immutable_unaccent(text)"))
+
+
+def generated_search_vector(*columns: tuple[str, str]) -> Computed:
+    """
+    Return the generated expression of a `search_vector` column from
+    `(column name, weight)` pairs, weights are "A" (most important) to "D".
+    """
+    vectors = [
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+        f"immutable_unaccent(coalesce({name}, ''))), '{weight}')"
+        for name, weight in columns
+    ]
+    return Computed(" || ".join(vectors), persisted=True)
+
+
+def get_search_query(q: str) -> ColumnElement[TSQUERY]:
+    """
+    Return the `tsquery` of a search string, in the syntax of web search
+    engines: quoted phrases, `or` and `-` to exclude words
+    """
+    return func.websearch_to_tsquery(
+        literal(SEARCH_CONFIG, REGCONFIG), func.immutable_unaccent(q)
+    )
+
+
+def search_matches(
+    vector: SQLColumnExpression[Any], query: ColumnElement[TSQUERY]
+) -> ColumnElement[bool]:
+    return vector.bool_op("@@")(query)
+
+
+def search_rank(
+    vector: SQLColumnExpression[Any], query: ColumnElement[TSQUERY]
+) -> ColumnElement[float]:
+    return func.ts_rank(vector, query)
+
+
+def trigram_index(name: str, column: Any) -> Index:
+    """
+    Return a GIN trigram index on the unaccented values of a column, used by
+    `trigram_matches`
+    """
+    return Index(
+        name,
+        func.immutable_unaccent(column).label("unaccented"),
+        postgresql_using="gin",
+        postgresql_ops={"unaccented": "gin_trgm_ops"},
+    )
+
+
+def trigram_matches(column: Any, q: str) -> ColumnElement[bool]:
+    """
+    Match the values of a column containing a word similar to `q`, the
+    threshold is `pg_trgm.word_similarity_threshold`
+    """
+    return func.immutable_unaccent(q).bool_op("<%")(func.immutable_unaccent(column))
+
+
+def trigram_similarity(column: Any, q: str) -> ColumnElement[float]:
+    return func.word_similarity(
+        func.immutable_unaccent(q), func.immutable_unaccent(column)
+    )
@@ -1,25 +1,131 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+from threading import Lock
 from typing import Annotated
 
 from fastapi import Depends
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
 
+# One engine (and thus one connection pool) per worker process, created on
+# first use so that importing this module never opens a connection.
+_engine: Engine | None = None
+_session_factory: sessionmaker[Session] | None = None
+_engine_lock = Lock()
+
+_async_engine: AsyncEngine | None = None
+_async_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+
+def get_engine() -> Engine:
+    global _engine, _session_factory
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(
+                    str(settings.SQLALCHEMY_DATABASE_URI),
+                    plugins=["geoalchemy2"],
+                    echo=False,
+                    pool_size=settings.POSTGRES_POOL_SIZE,
+                    max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+                    pool_pre_ping=settings.POSTGRES_POOL_PRE_PING,
+                    pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+                )
+                _session_factory = sessionmaker(
+                    autocommit=False, autoflush=False, bind=_engine
+                )
+    return _engine
+
+
+def get_session_factory() -> sessionmaker[Session]:
+    get_engine()
+    assert _session_factory is not None
+    return _session_factory
+
+
+def dispose_engine() -> None:
+    """
+    Close all pooled connections, called on application shutdown.
+    The engine will be recreated on next use.
+    """
+    global _engine, _session_factory
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+        _engine = None
+        _session_factory = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Same as `get_engine`, with psycopg in async mode. The permission filters
+    and the security context apply the same way since an `AsyncSession` proxies
+    a regular `Session`.
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                _async_engine = create_async_engine(
+                    str(settings.SQLALCHEMY_DATABASE_URI),
+                    plugins=["geoalchemy2"],
+                    echo=False,
+                    pool_size=settings.POSTGRES_POOL_SIZE,
+                    max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+                    pool_pre_ping=settings.POSTGRES_POOL_PRE_PING,
+                    pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+                )
+                _async_session_factory = async_sessionmaker(
+                    autoflush=False, bind=_async_engine, expire_on_commit=False
+                )
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    get_async_engine()
+    assert _async_session_factory is not None
+    return _async_session_factory
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_session_factory
+    engine = _async_engine
+    with _engine_lock:
+        _async_engine = None
+        _async_session_factory = None
+    if engine is not None:
+        await engine.dispose()
+
 
 def get_db() -> Generator[Session, None, None]:
-    engine = create_engine(
-        str(settings.SQLALCHEMY_DATABASE_URI),
-        plugins=["geoalchemy2"],
-        echo=False,
-    )
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = get_session_factory()()
     try:
-        db = SessionLocal()
         yield db
     finally:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Lazy loading is not available on an `AsyncSession`: the statements must eagerly
+    load what will be serialized, or the serialization must run in
+    `session.run_sync`.
+    """
+    async with get_async_session_factory()() as db:
+        yield db
+
+
 SessionDep = Annotated[Session, Depends(get_db)]
+
+# For the work outliving the request, such as a streamed response body: the
+# session dependency exits before the body is sent.
+SessionFactoryDep = Annotated[sessionmaker[Session], Depends(get_session_factory)]
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
@@ -0,0 +1,93 @@
+"""
+Sparse fieldsets of the listings.
+
+`include` lists the relationships of the results to load and serialize, eg.
+`include=contact,activities`, the others are neither queried (`noload`) nor
+serialized. `fields` lists the other fields to serialize, `id` and `type` are
+always kept. Both are comma separated, and every field is returned when they
+are not given.
+
+The repositories pick their loader options from `include`, the routers dump
+the response with `get_excluded_fields`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Collection
+from typing import Any
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+
+ALWAYS_INCLUDED = {"id", "type"}
+
+
+def parse_field_names(
+    value: str | None, allowed: Collection[str], param: str
+) -> set[str] | None:
+    """
+    Return the names of a comma separated query param, None when not given
+    """
+    if value is None:
+        return None
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = names - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown {param}: {', '.join(sorted(unknown))}",
+        )
+    return names
+
+
+def get_included_relationships(
+    include: str | None, relationships: Collection[str], default: Collection[str]
+) -> set[str]:
+    """
+    Return the relationships to load, `default` when `include` is not given
+    """
+    included = parse_field_names(include, relationships, "include")
+    return set(default) if included is None else included
+
+
+def get_field_names(*models: type[BaseModel]) -> set[str]:
+    return {name for model in models for name in model.model_fields}
+
+
+def get_excluded_fields(
+    models: Collection[type[BaseModel]],
+    relationships: Collection[str],
+    include: str | None,
+    fields: str | None,
+) -> set[str]:
+    """
+    Return the fields of the results to leave out of the response
+    """
+    field_names = get_field_names(*models) - set(relationships)
+    included = parse_field_names(include, relationships, "include")
+    kept = parse_field_names(fields, field_names, "fields")
+    excluded = set()
+    if included is not None:
+        excluded |= set(relationships) - included
+    if kept is not None:
+        excluded |= field_names - kept - ALWAYS_INCLUDED
+    return excluded
+
+
+def dump_paged_response(
+    response_model: type[BaseModel],
+    content: dict[str, Any],
+    excluded: set[str],
+    context: dict[str, Any] | None = None,
+) -> Response:
+    """
+    Serialize a paged response without the excluded fields of its results,
+    `context` is the validation context, eg. the `max_depth` of the results
+    """
+    response = response_model.model_validate(content, context=context)
+    return Response(
+        response.model_dump_json(
+            exclude_none=True, exclude={"results": {"__all__": excluded}}
+        ),
+        media_type="application/json",
+    )
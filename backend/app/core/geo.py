@@ -0,0 +1,101 @@
+"""
+Decoding of the WKB points loaded from PostGIS, for the API serializers.
+
+Reading two floats doesn't need a Shapely object per point: a single point is
+unpacked with `struct`, lists of points are decoded in one vectorized Shapely
+call.
+
+The models type their geometry columns as `Geometry`, but the loaded values are
+`WKBElement`: both are accepted.
+"""
+
+from __future__ import annotations
+
+import struct
+from collections.abc import Sequence
+from itertools import pairwise
+
+import numpy as np
+import numpy.typing as npt
+import shapely
+from geoalchemy2 import Geometry, WKBElement
+
+WKB_POINT = 1
+EWKB_SRID_FLAG = 0x20000000
+
+
+def get_wkb(element: WKBElement | Geometry) -> bytes:
+    if not isinstance(element, WKBElement):
+        raise TypeError(f"Not a WKBElement: {element!r}")
+    data = element.data
+    if isinstance(data, str):
+        return bytes.fromhex(data)
+    return bytes(data)
+
+
+def decode_point(element: WKBElement | Geometry) -> tuple[float, float]:
+    """
+    Return the coordinates of a 2D WKB or EWKB point
+    """
+    data = get_wkb(element)
+    byte_order = "<" if data[0] == 1 else ">"
+    (geometry_type,) = struct.unpack_from(f"{byte_order}I", data, 1)
+    if geometry_type & 0xFFFF != WKB_POINT:
+        raise ValueError(f"Not a WKB point: {geometry_type}")
+    offset = 9 if geometry_type & EWKB_SRID_FLAG else 5
+    x, y = struct.unpack_from(f"{byte_order}dd", data, offset)
+    return x, y
+
+
+def decode_bounds(
+    element: WKBElement | Geometry,
+) -> tuple[float, float, float, float]:
+    """
+    Return the bounds of a WKB geometry: min x, min y, max x, max y
+    """
+    min_x, min_y, max_x, max_y = shapely.from_wkb(get_wkb(element)).bounds
+    return min_x, min_y, max_x, max_y
+
+
+def decode_points(
+    elements: Sequence[WKBElement | Geometry | None],
+) -> npt.NDArray[np.float64]:
+    """
+    Return the coordinates of WKB points as an array of (x, y) rows, NaN for
+    missing points
+    """
+    geometries = shapely.from_wkb(
+        np.array(
+            [get_wkb(e) if e is not None else None for e in elements], dtype=object
+        )
+    )
+    return np.column_stack((shapely.get_x(geometries), shapely.get_y(geometries)))
+
+
+def get_centroid(
+    elements: Sequence[WKBElement | Geometry | None],
+) -> tuple[float, float] | None:
+    """
+    Return the average coordinates of WKB points, None if there is no point
+    """
+    coordinates = decode_points(elements)
+    coordinates = coordinates[~np.isnan(coordinates).any(axis=1)]
+    if len(coordinates) == 0:
+        return None
+    x, y = coordinates.mean(axis=0)
+    return float(x), float(y)
+
+
+def get_segments_coordinates(
+    elements: Sequence[WKBElement | Geometry | None],
+) -> list[tuple[float, float]]:
+    """
+    Return the ends of each segment joining two consecutive points, skipping
+    the segments with a missing point
+    """
+    coordinates = decode_points(elements).tolist()
+    segments = []
+    for start, end in pairwise(coordinates):
+        if not np.isnan(start + end).any():
+            segments.extend([(start[0], start[1]), (end[0], end[1])])
+    return segments
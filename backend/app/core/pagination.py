@@ -0,0 +1,192 @@
+"""
+Pagination of the listings, and their totals.
+
+Keyset pagination is the opt-in alternative to `offset`.
+
+A full page comes with a `next_cursor`, an opaque token holding the sort key of
+its last row. Passing it as `cursor` selects the rows after that key with a row
+comparison, `WHERE (sort_name, id) > (...)`, which Postgres resolves with an
+index on the sort key instead of reading and discarding the `offset` first
+rows: every page costs the same, and rows inserted meanwhile don't shift the
+next pages.
+
+Sort keys end with a unique column, must not be null, and are all sorted in
+the same direction, so that the row comparison matches the order and an index.
+Ranked search results, when `q` is given, are paginated by offset.
+
+The exact total of an offset page is counted by the page query itself, with a
+`count(*) OVER ()` column, so the filtered rows are read once. Pages after a
+cursor and empty pages run the count statement instead. With `total=estimate`,
+the total is the planner estimate of the count statement, from the table
+statistics, which costs a query plan instead of a scan.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from fastapi import HTTPException
+from sqlalchemy import ColumnElement, Row, Select, cast, func, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import InstrumentedAttribute, Session
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.elements import ClauseElement
+
+from app.core.schemas import KeysetPageParams
+
+T = TypeVar("T", bound=tuple[Any, ...])
+
+# Label of the window count of the offset pages
+TOTAL_LABEL = "total"
+
+
+@dataclass(frozen=True)
+class SortKey:
+    # A mapped attribute, or a column of a statement
+    column: ColumnElement[Any] | InstrumentedAttribute[Any]
+    # Value of the column for a loaded result
+    get_value: Callable[[Any], Any]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    data = json.dumps([str(value) for value in values]).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> list[str]:
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, ValueError):
+        values = None
+    if not (
+        isinstance(values, list)
+        and len(values) == length
+        and all(isinstance(value, str) for value in values)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def paginate(
+    statement: Select[T],
+    page_params: KeysetPageParams,
+    sort_keys: Sequence[SortKey],
+    descending: bool = False,
+) -> Select[Any]:
+    """
+    Order a statement by its sort keys and select a page, after the cursor if
+    any, else at the offset with the window count of the exact total
+    """
+    columns = [key.column for key in sort_keys]
+    statement = statement.order_by(
+        *(column.desc() if descending else column.asc() for column in columns)
+    ).limit(page_params.limit)
+
+    if page_params.cursor is None:
+        if page_params.total == "exact":
+            statement = statement.add_columns(func.count().over().label(TOTAL_LABEL))
+        return statement.offset(page_params.offset)
+    if page_params.q:
+        raise HTTPException(
+            status_code=400, detail="Search results are paginated by offset"
+        )
+
+    values = decode_cursor(page_params.cursor, len(sort_keys))
+    # The values are cast by Postgres, eg. to uuid or ltree
+    row = tuple_(*columns)
+    cursor_row = tuple_(
+        *(
+            cast(literal(value), column.type)
+            for value, column in zip(values, columns, strict=True)
+        )
+    )
+    return statement.where(row < cursor_row if descending else row > cursor_row)
+
+
+def get_next_cursor(
+    results: Sequence[Any], page_params: KeysetPageParams, sort_keys: Sequence[SortKey]
+) -> str | None:
+    """
+    Return the cursor of the page following the results, if they fill a page
+    """
+    if page_params.q or len(results) < page_params.limit:
+        return None
+    return encode_cursor([key.get_value(results[-1]) for key in sort_keys])
+
+
+class Explain(Executable, ClauseElement):
+    """
+    `EXPLAIN (FORMAT JSON)` of a statement, its plan without running it
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select[Any]) -> None:
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def compile_explain(element: Explain, compiler: SQLCompiler, **kw: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def get_estimated_count(plan: list[dict[str, Any]]) -> int:
+    """
+    Return the number of rows the plan of a count statement expects to count
+    """
+    node = plan[0]["Plan"]
+    # The aggregate reads the rows of its child
+    if node.get("Plans"):
+        node = node["Plans"][0]
+    return int(node["Plan Rows"])
+
+
+def get_window_count(rows: Sequence[Row[Any]]) -> int | None:
+    if rows and TOTAL_LABEL in rows[0]._fields:
+        return int(rows[0]._mapping[TOTAL_LABEL])
+    return None
+
+
+def get_page(
+    session: Session,
+    paged_statement: Select[Any],
+    count_statement: Select[tuple[int]],
+    page_params: KeysetPageParams,
+) -> tuple[Sequence[Any], int]:
+    """
+    Return the results of a page statement made by `paginate` and the total
+    """
+    rows = session.execute(paged_statement).unique().all()
+    count = get_window_count(rows)
+    if count is None and page_params.total == "estimate":
+        count = get_estimated_count(session.scalars(Explain(count_statement)).one())
+    elif count is None:
+        count = session.scalars(count_statement).one()
+    return [row[0] for row in rows], count
+
+
+async def get_page_async(
+    session: AsyncSession,
+    paged_statement: Select[Any],
+    count_statement: Select[tuple[int]],
+    page_params: KeysetPageParams,
+) -> tuple[Sequence[Any], int]:
+    """
+    Async version of `get_page`
+    """
+    rows = (await session.execute(paged_statement)).unique().all()
+    count = get_window_count(rows)
+    if count is None and page_params.total == "estimate":
+        plan = (await session.scalars(Explain(count_statement))).one()
+        count = get_estimated_count(plan)
+    elif count is None:
+        count = (await session.scalars(count_statement)).one()
+    return [row[0] for row in rows], count
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 import uuid
-from collections.abc import Iterator, Sequence
-from contextlib import contextmanager
+from collections.abc import Callable, Sequence
+from contextvars import ContextVar
 from datetime import datetime
 from typing import Annotated, Any, Generic, Literal, TypeVar
 
@@ -14,9 +14,10 @@ from pydantic import (
     BeforeValidator,
     ConfigDict,
     Field,
-    ValidationError,
-    WrapValidator,
+    ValidationInfo,
+    ValidatorFunctionWrapHandler,
     field_validator,
+    model_validator,
 )
 
 from app.activities.schemas import TreePublic
@@ -25,6 +26,7 @@ from app.core.db.models import (
     OrgActorAssoc,
     TourActorAssoc,
 )
+from app.core.geo import decode_point
 
 T = TypeVar("T")
 
@@ -37,11 +39,21 @@ class PageParams(BaseModel):
     offset: int = Field(default=0, ge=0)
 
 
+class KeysetPageParams(PageParams):
+    """Request query params of the listings paginated by app.core.pagination."""
+
+    # `next_cursor` of the previous page, replaces the offset
+    cursor: str | None = Field(default=None)
+    # Exact count or planner estimate of the total
+    total: Literal["exact", "estimate"] = Field(default="exact")
+
+
 class ErrorResponse(BaseModel):
     detail: str
 
 
 PageParamsDep = Annotated[PageParams, Depends()]
+KeysetPageParamsDep = Annotated[KeysetPageParams, Depends()]
 
 
 class PagedResponse(BaseModel, Generic[T]):
@@ -50,6 +62,7 @@ class PagedResponse(BaseModel, Generic[T]):
     total: int
     limit: int
     offset: int
+    next_cursor: str | None = None
     results: list[T]
 
 
@@ -101,39 +114,57 @@ def remove_uncomplete_assocs(
     return new_assocs
 
 
-def is_recursion_validation_error(exc: ValidationError) -> bool:
-    errors = exc.errors()
-    return len(errors) == 1 and errors[0]["type"] == "recursion_loop"
+class Base(BaseModel):
+    model_config = ConfigDict(
+        from_attributes=True,
+        arbitrary_types_allowed=True,
+    )
 
 
-@contextmanager
-def suppress_recursion_validation_error() -> Iterator[None]:
-    try:
-        yield
-    except ValidationError as exc:
-        if not is_recursion_validation_error(exc):
-            raise exc
+# Objects being validated by the `NodePublic` schemas, from the root of the
+# response to the current one
+validation_path: ContextVar[tuple[int, ...]] = ContextVar("validation_path", default=())
 
 
-def drop_cyclic_references(children, h):
-    try:
-        return h(children)
-    except ValidationError as exc:
-        if not (is_recursion_validation_error(exc) and isinstance(children, list)):
-            raise exc
+class NodePublic(Base):
+    """
+    Actors, tours and events, whose assocs link them in a graph with cycles,
+    eg. an org and its member org.
 
-        value_without_cyclic_refs = []
-        for child in children:
-            with suppress_recursion_validation_error():
-                value_without_cyclic_refs.extend(h([child]))
-        return h(value_without_cyclic_refs)
+    Their assoc lists skip the objects already on the validation path, and are
+    empty at the `max_depth` of the validation context, if any: the graph is
+    validated in one pass, as a tree, eg.
+    `OrgPublic.model_validate(org, context={"max_depth": 2})`.
+    """
 
+    @model_validator(mode="wrap")
+    @classmethod
+    def track_validation_path(
+        cls, data: Any, handler: ValidatorFunctionWrapHandler
+    ) -> Any:
+        token = validation_path.set((*validation_path.get(), id(data)))
+        try:
+            return handler(data)
+        finally:
+            validation_path.reset(token)
+
+
+def drop_visited_assocs(
+    target: str,
+) -> Callable[[Sequence[Any], ValidationInfo], Sequence[Any]]:
+    """
+    Return a validator of assocs removing those whose `target` is on the
+    validation path, or all of them at the maximum depth
+    """
 
-class Base(BaseModel):
-    model_config = ConfigDict(
-        from_attributes=True,
-        arbitrary_types_allowed=True,
-    )
+    def validator(assocs: Sequence[Any], info: ValidationInfo) -> Sequence[Any]:
+        path = validation_path.get()
+        max_depth = (info.context or {}).get("max_depth")
+        if max_depth is not None and len(path) >= max_depth:
+            return []
+        return [assoc for assoc in assocs if id(getattr(assoc, target)) not in path]
+
+    return validator
 
 
 class ContactPublic(Base):
@@ -159,28 +190,27 @@ class AddressPublic(Base):
         if not isinstance(v, geoalchemy2.WKBElement):
             raise ValueError("Not a WKBElement")
 
-        shape = geoalchemy2.shape.to_shape(v)
-
+        longitude, latitude = decode_point(v)
         coords = geojson_pydantic.types.Position2D(
-            longitude=shape.coords[0][0], latitude=shape.coords[0][1]
+            longitude=longitude, latitude=latitude
         )
         return geojson_pydantic.Point(type="Point", coordinates=coords)
 
 
-class ActorPublicBase(Base):
+class ActorPublicBase(NodePublic):
     id: uuid.UUID
     name: str
     contact: ContactPublic | None = None
 
     membership_assocs: Annotated[
         list[OrgAssocPublic],
-        WrapValidator(drop_cyclic_references),
+        BeforeValidator(drop_visited_assocs("org")),
         BeforeValidator(remove_uncomplete_assocs),
     ]
 
     tour_assocs: Annotated[
         list[TourAssocPublic],
-        WrapValidator(drop_cyclic_references),
+        BeforeValidator(drop_visited_assocs("tour")),
         BeforeValidator(remove_uncomplete_assocs),
     ]
 
@@ -192,7 +222,7 @@ class OrgPublic(ActorPublicBase, PermissionMixin):
 
     member_assocs: Annotated[
         list[ActorAssocPublic],
-        WrapValidator(drop_cyclic_references),
+        BeforeValidator(drop_visited_assocs("actor")),
         BeforeValidator(remove_uncomplete_assocs),
     ]
 
@@ -202,7 +232,7 @@ class PersonPublic(ActorPublicBase, PermissionMixin):
     role: str | None = None
 
 
-class EventPublic(Base, PermissionMixin):
+class EventPublic(NodePublic, PermissionMixin):
     """
     Used for the /tours/{id} endpoint
     """
@@ -213,12 +243,12 @@ class EventPublic(Base, PermissionMixin):
     end_dt: datetime | None = None
     actor_assocs: Annotated[
         list[ActorAssocPublic],
-        WrapValidator(drop_cyclic_references),
+        BeforeValidator(drop_visited_assocs("actor")),
         BeforeValidator(remove_uncomplete_assocs),
     ]
 
 
-class TourPublic(Base, PermissionMixin):
+class TourPublic(NodePublic, PermissionMixin):
     """
     Used for the /tours endpoint
     """
@@ -231,7 +261,7 @@ class TourPublic(Base, PermissionMixin):
     mobilities: list[TreePublic]
     actor_assocs: Annotated[
         list[ActorAssocPublic],
-        WrapValidator(drop_cyclic_references),
+        BeforeValidator(drop_visited_assocs("actor")),
         BeforeValidator(remove_uncomplete_assocs),
     ]
     events: list[EventPublic]
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import uuid
-from dataclasses import dataclass, field
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta, timezone
-from typing import Annotated, Any
+from functools import cache
+from typing import Annotated, Any, TypeVar
 
 import jwt
 from fastapi import Depends, HTTPException, status
@@ -11,18 +13,31 @@ from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from passlib.context import CryptContext
 from pydantic import ValidationError
-from sqlalchemy import Column, ColumnElement, Select, and_, or_, select, true
+from sqlalchemy import (
+    ColumnElement,
+    Connection,
+    FromClause,
+    Join,
+    Select,
+    TableClause,
+    and_,
+    or_,
+    select,
+    text,
+    true,
+)
 from sqlalchemy.event import listens_for
 from sqlalchemy.exc import NoResultFound
-from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, attributes, joinedload, raiseload, selectinload
 from sqlalchemy.orm.query import QueryContext
-from sqlalchemy.orm.session import ORMExecuteState
+from sqlalchemy.orm.session import ORMExecuteState, SessionTransaction
 from sqlalchemy.sql.elements import BooleanClauseList
 
 from app.core import security
+from app.core.cache import LRUCache
 from app.core.config import settings
 from app.core.db.models import (
-    Actor,
     Base,
     Contact,
     OrgActorAssoc,
@@ -30,9 +45,12 @@ from app.core.db.models import (
     RowLevelRestrictionMixin,
     User,
 )
-from app.core.db.session import SessionDep
+from app.core.db.rls import RLS_ROLE
+from app.core.db.session import AsyncSessionDep, SessionDep
 from app.users.schemas import TokenPayload
 
+T = TypeVar("T", bound=tuple[Any, ...])
+
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
@@ -53,7 +71,11 @@ ALGORITHM = "HS256"
 
 def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {
+        "exp": expire,
+        "iat": datetime.now(timezone.utc),
+        "sub": str(subject),
+    }
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -96,11 +118,54 @@ class SecurityContext:
     group_ids: list[uuid.UUID] = field(default_factory=list)
 
 
-def set_security_context(session: Session, security_context: SecurityContext) -> None:
+def set_security_context(
+    session: Session | AsyncSession, security_context: SecurityContext
+) -> None:
     session.info["security_context"] = security_context
+    if isinstance(session, Session) and session.in_transaction():
+        push_security_context(session.connection(), security_context)
+
+
+def push_security_context(
+    connection: Connection, security_context: SecurityContext
+) -> None:
+    """
+    With `POSTGRES_ROW_LEVEL_SECURITY`, copy the security context to the settings of
+    the current transaction, read by the RLS policies, and switch to the RLS role.
+    See `app.core.db.rls`.
+    """
+    if not settings.POSTGRES_ROW_LEVEL_SECURITY:
+        return
+
+    connection.execute(
+        text(
+            "SELECT set_config('app.user_id', :user_id, true), "
+            "set_config('app.is_superuser', :is_superuser, true), "
+            "set_config('app.is_member', :is_member, true), "
+            "set_config('app.group_ids', :group_ids, true), "
+            "set_config('role', :role, true)"
+        ),
+        {
+            "user_id": str(security_context.user_id or ""),
+            "is_superuser": "on" if security_context.is_superuser else "off",
+            "is_member": "on" if security_context.is_member else "off",
+            "group_ids": ",".join(str(id) for id in security_context.group_ids),
+            "role": RLS_ROLE,
+        },
+    )
 
 
-def get_security_context(session: Session) -> SecurityContext:
+@listens_for(Session, "after_begin")
+def push_security_context_on_begin(
+    session: Session, _transaction: SessionTransaction, connection: Connection
+) -> None:
+    # Transaction settings are lost on commit or rollback
+    push_security_context(
+        connection, session.info.get("security_context") or SecurityContext()
+    )
+
+
+def get_security_context(session: Session | AsyncSession) -> SecurityContext:
     security_context = session.info.get("security_context")
     if security_context is None:
         security_context = SecurityContext()
@@ -115,6 +180,8 @@ def set_security_context_from_user(session: Session, user: User | None) -> None:
     security_context.user_id = user.id
     security_context.is_superuser = user.is_superuser
     security_context.is_member = user.is_member
+    # Let the database see the user's own rows while loading the groups
+    set_security_context(session, security_context)
     stmt = (
         select(User)
         .where(User.id == user.id)
@@ -135,35 +202,142 @@ def set_security_context_from_user(session: Session, user: User | None) -> None:
 
     session.expunge_all()
 
+    # Push the complete context to the transaction
+    set_security_context(session, security_context)
 
-def set_security_context_from_oauth(
-    session: SessionDep, token: NoAutoErrorTokenDep
-) -> None:
+
+# Resolved security contexts, keyed by user id and token `iat`
+security_context_cache: LRUCache[tuple[str, int | None], SecurityContext] = LRUCache(
+    maxsize=settings.SECURITY_CONTEXT_CACHE_SIZE,
+    ttl=settings.SECURITY_CONTEXT_CACHE_TTL,
+)
+
+# Changes of these User attributes invalidate the user's cached security context
+SECURITY_CONTEXT_USER_ATTRIBUTES = (
+    "is_active",
+    "is_member",
+    "is_superuser",
+    "person_id",
+)
+
+
+def decode_access_token(token: str) -> TokenPayload | None:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
-        token_data = TokenPayload(**payload)
+        return TokenPayload(**payload)
     except (InvalidTokenError, ValidationError):
-        return
+        return None
 
-    try:
-        statement = select(User).where(
-            and_(
-                User.id == token_data.sub,
-                User.is_active == True,  # noqa: E712
-            )
+
+def get_active_user_statement(token_data: TokenPayload) -> Select[tuple[User]]:
+    return select(User).where(
+        and_(
+            User.id == token_data.sub,
+            User.is_active == True,  # noqa: E712
         )
-        user = session.scalars(statement).one()
+    )
+
+
+def set_cached_security_context(
+    session: Session | AsyncSession, token_data: TokenPayload
+) -> bool:
+    """
+    Set the cached security context of the token on the session, return False
+    if it is not cached.
+    """
+    cached = security_context_cache.get((str(token_data.sub), token_data.iat))
+    if cached is None:
+        return False
+    set_security_context(session, replace(cached, group_ids=list(cached.group_ids)))
+    return True
+
+
+def cache_security_context(
+    session: Session | AsyncSession, token_data: TokenPayload
+) -> None:
+    security_context = get_security_context(session)
+    security_context_cache.set(
+        (str(token_data.sub), token_data.iat),
+        replace(security_context, group_ids=list(security_context.group_ids)),
+    )
+
+
+def set_security_context_from_oauth(
+    session: SessionDep, token: NoAutoErrorTokenDep
+) -> None:
+    token_data = decode_access_token(token)
+    if token_data is None:
+        return
 
+    if set_cached_security_context(session, token_data):
+        return
+
+    try:
+        user = session.scalars(get_active_user_statement(token_data)).one()
     except NoResultFound:
         return
 
     set_security_context_from_user(session, user)
+    cache_security_context(session, token_data)
+
+
+async def set_security_context_from_oauth_async(
+    session: AsyncSessionDep, token: NoAutoErrorTokenDep
+) -> None:
+    token_data = decode_access_token(token)
+    if token_data is None:
+        return
+
+    if set_cached_security_context(session, token_data):
+        return
+
+    try:
+        user = (await session.scalars(get_active_user_statement(token_data))).one()
+    except NoResultFound:
+        return
+
+    await session.run_sync(set_security_context_from_user, user)
+    cache_security_context(session, token_data)
+
+
+@listens_for(Session, "after_flush")
+def collect_security_context_invalidations(session: Session, _flush_context) -> None:
+    """
+    Collect the users whose cached security context is made stale by the flush:
+    users whose flags changed, or anyone when a membership changed.
+    They are invalidated on commit, see `invalidate_security_contexts`.
+    """
+    invalidations: set[str] = session.info.setdefault(
+        "security_context_invalidations", set()
+    )
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, OrgActorAssoc):
+            invalidations.add("*")
+        elif isinstance(obj, User) and (
+            obj in session.deleted
+            or any(
+                attributes.get_history(obj, name).has_changes()
+                for name in SECURITY_CONTEXT_USER_ATTRIBUTES
+            )
+        ):
+            invalidations.add(str(obj.id))
+
+
+@listens_for(Session, "after_commit")
+def invalidate_security_contexts(session: Session) -> None:
+    invalidations = session.info.pop("security_context_invalidations", set())
+    if "*" in invalidations:
+        security_context_cache.clear()
+    elif invalidations:
+        security_context_cache.discard_where(lambda key: key[0] in invalidations)
 
 
 OAuthSecurityContextDep = Depends(set_security_context_from_oauth)
 
+AsyncOAuthSecurityContextDep = Depends(set_security_context_from_oauth_async)
+
 
 def get_current_active_superuser(current_user: CurrentUserDep) -> User:
     if not current_user.is_superuser:
@@ -233,42 +407,111 @@ def get_permission_filter(
     return or_(*criteria)
 
 
-def get_model_from_table_name(table_name: str) -> type[Base] | None:
+def filter_by_permissions(
+    statement: Select[T],
+    model: type[RowLevelRestrictionMixin],
+    session: Session | AsyncSession,
+) -> Select[T]:
+    """
+    Explicitly filter a statement by the permissions on a model, for statements
+    the `do_orm_execute` hook can't see through, eg. a count over a subquery.
+    """
+    if settings.POSTGRES_ROW_LEVEL_SECURITY:
+        return statement
+    return statement.filter(get_permission_filter(model, get_security_context(session)))
+
+
+@cache
+def get_table_model_index() -> dict[str, type[Base]]:
+    """
+    Return the mapped classes by table name, built once all models are mapped.
+    """
+    index: dict[str, type[Base]] = {}
     for mapper in Base.registry.mappers:
-        if mapper.class_.__tablename__ == table_name:
-            return mapper.class_
-    return None
+        index.setdefault(mapper.class_.__tablename__, mapper.class_)
+    return index
+
+
+def get_model_from_table_name(table_name: str) -> type[Base] | None:
+    return get_table_model_index().get(table_name)
+
+
+def get_surface_tables(from_clause: FromClause) -> Iterator[TableClause]:
+    """
+    Yield the tables of a FROM clause, looking into joins but not into aliases
+    and subqueries, whose columns don't belong to the table.
+    """
+    if isinstance(from_clause, Join):
+        yield from get_surface_tables(from_clause.left)
+        yield from get_surface_tables(from_clause.right)
+    elif isinstance(from_clause, TableClause):
+        yield from_clause
+
+
+def get_restricted_models_from_froms(
+    froms: Sequence[FromClause],
+) -> tuple[type[RowLevelRestrictionMixin], ...]:
+    """
+    Return the models with row level restrictions selected by the columns clause
+    of a statement, given its FROM objects.
+    """
+    models = set()
+    for from_clause in froms:
+        for table in get_surface_tables(from_clause):
+            model = get_model_from_table_name(table.name)
+            if model and issubclass(model, RowLevelRestrictionMixin):
+                models.add(model)
+    return tuple(models)
+
+
+# Restricted models by FROM objects of the columns clause. Mapped tables and the
+# joins of joined inheritance are the same objects from one statement to another,
+# so the selectin loads of a query hit the cache on every request.
+permission_plan_cache: LRUCache[
+    tuple[FromClause, ...], tuple[type[RowLevelRestrictionMixin], ...]
+] = LRUCache(maxsize=settings.PERMISSION_PLAN_CACHE_SIZE)
+
+
+def get_restricted_models(
+    statement: Select,
+) -> tuple[type[RowLevelRestrictionMixin], ...]:
+    """
+    Return the models with row level restrictions selected by the statement.
+    """
+    froms = tuple(statement.columns_clause_froms)
+    models = permission_plan_cache.get(froms)
+    if models is None:
+        models = get_restricted_models_from_froms(froms)
+        permission_plan_cache.set(froms, models)
+    return models
 
 
 @listens_for(Session, "do_orm_execute")
 def add_permission_filters_on_select(orm_execute_state: ORMExecuteState) -> None:
     """
     On Session `do_orm_execute` event, add filters on subclasses of PermissionsMixin
-    by inspecting the exported_columns of the statement.
+    by inspecting the tables of the columns clause of the statement.
+
+    The listener is set on the `Session` class, so it also applies to the `Session`
+    proxied by an `AsyncSession`.
     """
 
     if not isinstance(orm_execute_state.statement, Select):
         return
 
-    security_context = get_security_context(orm_execute_state.session)
-
-    models = set()
+    # Rows are filtered by the database
+    if settings.POSTGRES_ROW_LEVEL_SECURITY:
+        return
 
-    # First pass to build the models set
-    for col in orm_execute_state.statement.exported_columns:
-        # Could have a func instead of a real col
-        if not isinstance(col, Column):
-            continue
-        model = get_model_from_table_name(col.table.name)
-        if model:
-            models.add(model)
+    models = get_restricted_models(orm_execute_state.statement)
+    if not models:
+        return
 
-    # Second pass, add filters
+    security_context = get_security_context(orm_execute_state.session)
     for model in models:
-        if issubclass(model, RowLevelRestrictionMixin) or isinstance(model, Actor):
-            orm_execute_state.statement = orm_execute_state.statement.filter(
-                get_permission_filter(model, security_context)
-            )
+        orm_execute_state.statement = orm_execute_state.statement.filter(
+            get_permission_filter(model, security_context)
+        )
 
 
 @listens_for(Contact, "load")
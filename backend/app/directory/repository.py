@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 from collections.abc import Sequence
+from operator import attrgetter
+from typing import Any
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import Select, func, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import (
     Session,
     noload,
@@ -21,20 +24,42 @@ from app.core.db.models import (
     Person,
     Tour,
     TourActorAssoc,
+    User,
 )
-from app.core.security import get_permission_filter, get_security_context
+from app.core.db.search import get_search_query, search_matches, search_rank
+from app.core.fieldsets import get_included_relationships
+from app.core.pagination import SortKey, get_page, get_page_async, paginate
+from app.core.security import filter_by_permissions
 from app.directory.schemas import DirectoryPageParams
 
+ACTOR_RELATIONSHIPS = (
+    "activities",
+    "contact",
+    "group_owner",
+    "member_assocs",
+    "membership_assocs",
+    "owner",
+    "tour_assocs",
+)
+# The tours of the actors are only shown by the actor pages
+DEFAULT_ACTOR_INCLUDE = set(ACTOR_RELATIONSHIPS) - {"tour_assocs"}
+# Depth of the serialized actors, their assocs are loaded without their own
+# assocs, see app.core.schemas.NodePublic
+ACTOR_MAX_DEPTH = 2
 
-def get_all_actors(
+ACTOR_SORT_KEYS = (
+    SortKey(Actor.sort_name, attrgetter("sort_name")),
+    SortKey(Actor.id, attrgetter("id")),
+)
+
+
+def get_all_actors_statements(
     *,
-    session: Session,
-    page_params: DirectoryPageParams = DirectoryPageParams(),
-) -> tuple[Sequence[Actor], int]:
+    session: Session | AsyncSession,
+    page_params: DirectoryPageParams,
+) -> tuple[Select[Any], Select[tuple[int]]]:
     """
-    Returns all actors paginated and filtered by name or activity
-    Will load actors with their memberships and members. Memberships and members' actors
-    won't have their own children loaded.
+    Returns the paged statement and the count statement of `get_all_actors`
     """
 
     actor_poly = with_polymorphic(Actor, [Org, Person])
@@ -54,61 +79,114 @@ def get_all_actors(
             noload(Org.member_assocs)
         ),
     )
-    statement = (
-        select(actor_poly)
-        .options(
-            selectinload(actor_poly.membership_assocs).options(
-                *select_actor,
-                select_org,
-            ),
-            selectinload(actor_poly.contact),
-            selectinload(actor_poly.Org.member_assocs).options(
-                *select_actor,
-                select_org,
+    # Loader of each relationship, see app.core.fieldsets
+    relationships = {
+        "membership_assocs": actor_poly.membership_assocs,
+        "contact": actor_poly.contact,
+        "member_assocs": actor_poly.Org.member_assocs,
+        "activities": actor_poly.Org.activities,
+        "tour_assocs": actor_poly.tour_assocs,
+        "owner": actor_poly.owner,
+        "group_owner": actor_poly.group_owner,
+    }
+    loaders = {
+        "membership_assocs": (*select_actor, select_org),
+        "member_assocs": (*select_actor, select_org),
+        "tour_assocs": (
+            selectinload(TourActorAssoc.tour).options(
+                noload(Tour.actor_assocs),
+                noload(Tour.events),
             ),
-            noload(actor_poly.tour_assocs),
+        ),
+        "owner": (selectinload(User.person),),
+    }
+    include = get_included_relationships(
+        page_params.include, ACTOR_RELATIONSHIPS, DEFAULT_ACTOR_INCLUDE
+    )
+    statement = select(actor_poly).options(
+        *(
+            selectinload(relationship).options(*loaders.get(name, ()))
+            if name in include
+            else noload(relationship)
+            for name, relationship in relationships.items()
         )
-        .order_by(func.coalesce(actor_poly.Org.name, actor_poly.Person.name).asc())
     )
 
     if page_params.q is not None and page_params.q != "":
+        # Each table is searched with its own index, the best matches first
+        org = Org.__table__
+        person = Person.__table__
+        query = get_search_query(page_params.q)
         statement = statement.where(
-            or_(
-                actor_poly.Org.name.ilike(f"%{page_params.q}%"),
-                actor_poly.Org.description.ilike(f"%{page_params.q}%"),
-                actor_poly.Person.name.ilike(f"%{page_params.q}%"),
+            actor_poly.id.in_(
+                union_all(
+                    select(org.c.id).where(search_matches(org.c.search_vector, query)),
+                    select(person.c.id).where(
+                        search_matches(person.c.search_vector, query)
+                    ),
+                )
             )
+        ).order_by(
+            search_rank(
+                func.coalesce(
+                    actor_poly.Org.search_vector, actor_poly.Person.search_vector
+                ),
+                query,
+            ).desc()
         )
+
     if page_params.activity is not None and page_params.activity != "":
         statement = statement.join(actor_poly.Org.activities).filter(
             Activity.path.descendant_of(Ltree(page_params.activity))
         )
 
     # Add pagination
-    paged_statement = statement.offset(page_params.offset).limit(page_params.limit)
-
-    # Retrieve entities
-    actors = session.scalars(paged_statement).unique().all()
+    paged_statement = paginate(statement, page_params, ACTOR_SORT_KEYS)
 
     # Count statement
     # Since the security filter works by inspecting selected columns
     # we need to apply directly the filter
-    statement = statement.filter(
-        get_permission_filter(Actor, get_security_context(session))
-    )
+    statement = filter_by_permissions(statement, Actor, session)
     count_statement = select(func.count()).select_from(statement.subquery())
-    count = session.scalars(count_statement).one()
 
-    return actors, count
+    return paged_statement, count_statement
 
 
-def get_org(*, session: Session, id) -> Org:
+def get_all_actors(
+    *,
+    session: Session,
+    page_params: DirectoryPageParams = DirectoryPageParams(),
+) -> tuple[Sequence[Actor], int]:
     """
-    Returns details of an org:
-    - org itself
-    - memberships
-    - members
-    - tours
+    Returns all actors paginated and filtered by name or activity
+    Will load actors with their memberships and members. Memberships and members' actors
+    won't have their own children loaded.
+    """
+    paged_statement, count_statement = get_all_actors_statements(
+        session=session, page_params=page_params
+    )
+
+    return get_page(session, paged_statement, count_statement, page_params)
+
+
+async def get_all_actors_async(
+    *,
+    session: AsyncSession,
+    page_params: DirectoryPageParams = DirectoryPageParams(),
+) -> tuple[Sequence[Actor], int]:
+    """
+    Async version of `get_all_actors`
+    """
+    paged_statement, count_statement = get_all_actors_statements(
+        session=session, page_params=page_params
+    )
+
+    return await get_page_async(session, paged_statement, count_statement, page_params)
+
+
+def get_org_statement(*, id) -> Select[tuple[Org]]:
+    """
+    Returns the statement of `get_org`
     """
 
     select_org = selectinload(OrgActorAssoc.org).options(
@@ -146,16 +224,30 @@ def get_org(*, session: Session, id) -> Org:
         .where(Org.id == id)
     )
 
-    return session.scalars(statement).one()
+    return statement
 
 
-def get_person(*, session: Session, id) -> Person:
+def get_org(*, session: Session, id) -> Org:
     """
-    Returns details of a person:
-    - person itself
+    Returns details of an org:
+    - org itself
     - memberships
+    - members
     - tours
-    - events
+    """
+    return session.scalars(get_org_statement(id=id)).one()
+
+
+async def get_org_async(*, session: AsyncSession, id) -> Org:
+    """
+    Async version of `get_org`
+    """
+    return (await session.scalars(get_org_statement(id=id))).one()
+
+
+def get_person_statement(*, id) -> Select[tuple[Person]]:
+    """
+    Returns the statement of `get_person`
     """
 
     select_org = selectinload(OrgActorAssoc.org).options(
@@ -198,4 +290,22 @@ def get_person(*, session: Session, id) -> Person:
         .where(Person.id == id)
     )
 
-    return session.scalars(statement).one()
+    return statement
+
+
+def get_person(*, session: Session, id) -> Person:
+    """
+    Returns details of a person:
+    - person itself
+    - memberships
+    - tours
+    - events
+    """
+    return session.scalars(get_person_statement(id=id)).one()
+
+
+async def get_person_async(*, session: AsyncSession, id) -> Person:
+    """
+    Async version of `get_person`
+    """
+    return (await session.scalars(get_person_statement(id=id))).one()
@@ -11,6 +11,8 @@ from app.core.db.models import (
     Person,
 )
 from app.core.db.session import SessionDep
+from app.core.fieldsets import dump_paged_response, get_excluded_fields
+from app.core.pagination import get_next_cursor
 from app.core.schemas import ErrorResponse, OrgPublic, PagedResponse, PersonPublic
 from app.core.security import (
     OAuthSecurityContextDep,
@@ -34,19 +36,34 @@ def get_all_actors(
     page_params: DirectoryPageParamsDep,
 ) -> Any:
     """
-    Paginated list of actors
+    Paginated list of actors, `include` and `fields` select the relationships
+    and the fields of the results
 
     """
 
+    excluded = get_excluded_fields(
+        (OrgPublic, PersonPublic),
+        repository.ACTOR_RELATIONSHIPS,
+        page_params.include,
+        page_params.fields,
+    )
     actors, count = repository.get_all_actors(session=session, page_params=page_params)
     print(count)
 
-    return {
-        "total": count,
-        "limit": page_params.limit,
-        "offset": page_params.offset,
-        "results": actors,
-    }
+    return dump_paged_response(
+        PagedResponse[Union[OrgPublic, PersonPublic]],  # noqa: UP007
+        {
+            "total": count,
+            "limit": page_params.limit,
+            "offset": page_params.offset,
+            "next_cursor": get_next_cursor(
+                actors, page_params, repository.ACTOR_SORT_KEYS
+            ),
+            "results": actors,
+        },
+        excluded,
+        context={"max_depth": repository.ACTOR_MAX_DEPTH},
+    )
 
 
 @router.get(
@@ -5,12 +5,15 @@ from typing import Annotated
 from fastapi import Depends
 
 from app.core.schemas import (
-    PageParams,
+    KeysetPageParams,
 )
 
 
-class DirectoryPageParams(PageParams):
+class DirectoryPageParams(KeysetPageParams):
     activity: str | None = None
+    # Comma separated relationships and fields, see app.core.fieldsets
+    include: str | None = None
+    fields: str | None = None
 
 
 DirectoryPageParamsDep = Annotated[DirectoryPageParams, Depends()]
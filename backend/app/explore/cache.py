@@ -0,0 +1,161 @@
+"""
+Cache of the /explore tours and responses.
+
+Viewports are snapped outward to a grid of tiles sized after the viewport, so
+that nearby viewports of a panning map share the tours fetched for the snapped
+bounding box. Each response only shows the tours intersecting its viewport: the
+serialized responses are cached by the tours they show.
+
+The tours depend on the permissions of the caller: anonymous callers share
+entries, as do superusers, while authenticated users don't since they may own
+rows.
+
+Any commit changing what the responses are built from clears the caches.
+"""
+
+from __future__ import annotations
+
+import math
+import uuid
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from sqlalchemy.event import listens_for
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.db.models import (
+    Activity,
+    Actor,
+    AddressGeo,
+    Contact,
+    Discipline,
+    Event,
+    EventActorAssoc,
+    Mobility,
+    OrgActivity,
+    Tour,
+    TourActorAssoc,
+    TourDiscipline,
+    TourMobility,
+)
+from app.core.security import SecurityContext
+from app.explore.schemas import BBox
+
+MAX_ZOOM = 22
+
+# Changes of these models invalidate the cache
+EXPLORE_CACHE_MODELS = (
+    Activity,
+    Actor,
+    AddressGeo,
+    Contact,
+    Discipline,
+    Event,
+    EventActorAssoc,
+    Mobility,
+    OrgActivity,
+    Tour,
+    TourActorAssoc,
+    TourDiscipline,
+    TourMobility,
+)
+
+SecurityFingerprint = (
+    Literal["anonymous", "superuser"] | tuple[uuid.UUID, bool, tuple[uuid.UUID, ...]]
+)
+
+# Snapped bbox, filters, engine and security fingerprint
+ExploreToursKey = tuple[BBox, tuple[Any, ...], str, SecurityFingerprint]
+
+# Tours key, ids of the tours shown, cluster zoom and format
+ExploreCacheKey = tuple[ExploreToursKey, tuple[str, ...], int | None, str]
+
+
+@dataclass(frozen=True)
+class ExploreTour:
+    """
+    The serialized collection of a tour, with the bounding box of the tour
+    """
+
+    bbox: BBox
+    collection: dict[str, Any]
+
+
+explore_tours_cache: LRUCache[ExploreToursKey, list[ExploreTour]] = LRUCache(
+    maxsize=settings.EXPLORE_CACHE_SIZE,
+    ttl=settings.EXPLORE_CACHE_TTL,
+)
+
+explore_cache: LRUCache[ExploreCacheKey, bytes] = LRUCache(
+    maxsize=settings.EXPLORE_CACHE_SIZE,
+    ttl=settings.EXPLORE_CACHE_TTL,
+)
+
+
+def snap_bbox(min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> BBox:
+    """
+    Expand a bounding box to the tiles covering it, on a grid of the smallest
+    tiles at least as large as the bounding box: the result spans at most 2x2
+    tiles.
+    """
+    width = max(max_lon - min_lon, 1e-9)
+    height = max(max_lat - min_lat, 1e-9)
+    zoom = math.floor(min(math.log2(360 / width), math.log2(180 / height)))
+    zoom = min(max(zoom, 0), MAX_ZOOM)
+    tile_width = 360 / 2**zoom
+    tile_height = 180 / 2**zoom
+    return (
+        max(math.floor(min_lon / tile_width) * tile_width, -180),
+        max(math.floor(min_lat / tile_height) * tile_height, -90),
+        min(math.ceil(max_lon / tile_width) * tile_width, 180),
+        min(math.ceil(max_lat / tile_height) * tile_height, 90),
+    )
+
+
+def intersects(bbox: BBox, other: BBox) -> bool:
+    """
+    Whether two bounding boxes intersect, borders included like `ST_Intersects`
+    """
+    return (
+        bbox[0] <= other[2]
+        and other[0] <= bbox[2]
+        and bbox[1] <= other[3]
+        and other[1] <= bbox[3]
+    )
+
+
+def get_security_fingerprint(security_context: SecurityContext) -> SecurityFingerprint:
+    """
+    Return what the permission filters read from a security context
+    """
+    if security_context.user_id is None:
+        return "anonymous"
+    if security_context.is_superuser:
+        return "superuser"
+    return (
+        security_context.user_id,
+        security_context.is_member,
+        tuple(sorted(security_context.group_ids)),
+    )
+
+
+@listens_for(Session, "after_flush")
+def collect_explore_cache_invalidation(session: Session, _flush_context) -> None:
+    """
+    Flag the session when the flush changes what the responses are built from,
+    the cache is cleared on commit, see `invalidate_explore_cache`.
+    """
+    if any(
+        isinstance(obj, EXPLORE_CACHE_MODELS)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    ):
+        session.info["explore_cache_invalidation"] = True
+
+
+@listens_for(Session, "after_commit")
+def invalidate_explore_cache(session: Session) -> None:
+    if session.info.pop("explore_cache_invalidation", False):
+        explore_tours_cache.clear()
+        explore_cache.clear()
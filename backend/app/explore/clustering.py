@@ -0,0 +1,112 @@
+"""
+Grid clustering of the explore points, for low zoom levels.
+
+The points of the serialized tour collections are grouped by type in the cells
+of a grid sized after the zoom level, and replaced by a cluster in the average
+position of its points. An actor shown by several tours or events counts once.
+
+See `ExploreClusters` for the shape of the result.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+# Cells per side of a 256px tile, clusters are at least 64px apart
+CELLS_PER_TILE = 4
+
+POINT_TYPES = ("event_point", "tour_actor", "event_actor")
+
+
+def get_cell_size(zoom: int) -> float:
+    """
+    Return the size of a grid cell in degrees
+    """
+    return 360 / 2**zoom / CELLS_PER_TILE
+
+
+def cluster_points(
+    types: list[str],
+    ids: list[str],
+    coordinates: npt.NDArray[np.float64],
+    zoom: int,
+) -> list[dict[str, Any]]:
+    """
+    Return the cluster features of points, represented by the point closest to
+    the center of their cluster
+    """
+    if len(ids) == 0:
+        return []
+
+    cells = np.floor(coordinates / get_cell_size(zoom)).astype(np.int64)
+    keys = np.column_stack(([POINT_TYPES.index(t) for t in types], cells))
+    unique_keys, groups, counts = np.unique(
+        keys, axis=0, return_inverse=True, return_counts=True
+    )
+    groups = groups.ravel()
+
+    centers = np.column_stack(
+        [np.bincount(groups, coordinates[:, i], len(counts)) / counts for i in range(2)]
+    )
+    distances = ((coordinates - centers[groups]) ** 2).sum(axis=1)
+    order = np.lexsort((distances, groups))
+    is_first = np.ones(len(order), dtype=bool)
+    is_first[1:] = groups[order][1:] != groups[order][:-1]
+    representatives = order[is_first]
+
+    return [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [float(x), float(y)]},
+            "properties": {
+                "id": ids[representative],
+                "type": "cluster",
+                "cluster_of": POINT_TYPES[key[0]],
+                "count": int(count),
+            },
+        }
+        for key, (x, y), count, representative in zip(
+            unique_keys, centers, counts, representatives, strict=True
+        )
+    ]
+
+
+def cluster_collections(collections: list[dict[str, Any]], zoom: int) -> dict[str, Any]:
+    """
+    Split serialized tour collections into their tour lines and the clusters of
+    their points. Points without geometry are dropped.
+    """
+    tours = []
+    types: list[str] = []
+    ids: list[str] = []
+    coordinates: list[list[float]] = []
+    seen = set()
+
+    for collection in collections:
+        lines = []
+        for feature in collection["features"]:
+            properties = feature["properties"]
+            if properties["type"] == "tour_line":
+                lines.append(feature)
+                continue
+            key = (properties["type"], properties["id"])
+            if feature.get("geometry") is None or key in seen:
+                continue
+            seen.add(key)
+            types.append(properties["type"])
+            ids.append(properties["id"])
+            coordinates.append(feature["geometry"]["coordinates"][:2])
+        tours.append({**collection, "features": lines})
+
+    return {
+        "tours": tours,
+        "clusters": {
+            "type": "FeatureCollection",
+            "features": cluster_points(
+                types, ids, np.array(coordinates, dtype=np.float64), zoom
+            ),
+        },
+    }
@@ -0,0 +1,121 @@
+"""
+Compact format of the explore responses.
+
+The serialized tour collections repeat each actor in every feature showing it,
+with its activities. In the compact format, actors, activities, disciplines and
+mobilities are listed once in lookup tables, keyed by id or by path, and the
+tours reference them:
+
+- the tour actor features become `actors` references, with their role, in the
+  properties of the tour. The event actor features repeat the tour actors for
+  each event: they are dropped, the events share the actors of their tour
+- producers, event venues, disciplines and mobilities become lists of keys
+
+See `CompactExplore` for the shape of the result.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+ACTOR_FEATURE_TYPES = ("tour_actor", "event_actor")
+
+
+class LookupTables:
+    def __init__(self) -> None:
+        self.actors: dict[str, dict[str, Any]] = {}
+        self.activities: dict[str, dict[str, Any]] = {}
+        self.disciplines: dict[str, dict[str, Any]] = {}
+        self.mobilities: dict[str, dict[str, Any]] = {}
+
+    def add_trees(
+        self, table: dict[str, dict[str, Any]], trees: list[dict[str, Any]]
+    ) -> list[str]:
+        for tree in trees:
+            table.setdefault(tree["path"], tree)
+        return [tree["path"] for tree in trees]
+
+    def add_actor(self, actor: dict[str, Any]) -> str:
+        """
+        Add an actor from an `ActorGeo` or from the properties and geometry
+        of an actor feature
+        """
+        entry = self.actors.setdefault(actor["id"], {})
+        entry["type"] = actor["type"]
+        entry["name"] = actor["name"]
+        for name in ("description", "geometry"):
+            if actor.get(name) is not None:
+                entry[name] = actor[name]
+        if "activities" in actor:
+            entry["activities"] = self.add_trees(self.activities, actor["activities"])
+        return actor["id"]
+
+    def add_actor_feature(self, feature: dict[str, Any]) -> dict[str, Any]:
+        """
+        Add the actor of a feature, return its reference
+        """
+        properties = feature["properties"]
+        actor = {
+            **properties,
+            "type": properties["actor_type"],
+            "geometry": feature.get("geometry"),
+        }
+        reference = {"id": self.add_actor(actor)}
+        if properties.get("role") is not None:
+            reference["role"] = properties["role"]
+        return reference
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "actors": self.actors,
+            "activities": self.activities,
+            "disciplines": self.disciplines,
+            "mobilities": self.mobilities,
+        }
+
+
+def compact_collection(
+    collection: dict[str, Any], tables: LookupTables
+) -> dict[str, Any]:
+    properties = collection["properties"]
+    features = []
+    tour_actors = []
+
+    for feature in collection["features"]:
+        feature_properties = feature["properties"]
+        if feature_properties["type"] == "event_point":
+            event = {
+                **feature_properties,
+                "event_venues": [
+                    tables.add_actor(venue)
+                    for venue in feature_properties["event_venues"]
+                ],
+            }
+            features.append({**feature, "properties": event})
+        elif feature_properties["type"] == "tour_actor":
+            tour_actors.append(tables.add_actor_feature(feature))
+        elif feature_properties["type"] not in ACTOR_FEATURE_TYPES:
+            features.append(feature)
+
+    return {
+        **collection,
+        "features": features,
+        "properties": {
+            **properties,
+            "producers": [tables.add_actor(p) for p in properties["producers"]],
+            "disciplines": tables.add_trees(
+                tables.disciplines, properties["disciplines"]
+            ),
+            "mobilities": tables.add_trees(tables.mobilities, properties["mobilities"]),
+            "actors": tour_actors,
+        },
+    }
+
+
+def compact_collections(collections: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Return tour collections, as serialized to JSON, in the compact format
+    """
+    tables = LookupTables()
+    tours = [compact_collection(collection, tables) for collection in collections]
+    return {"tours": tours, **tables.as_dict()}
@@ -0,0 +1,117 @@
+"""
+Events in a bounding box and a date range, located by their denormalized
+`Event.geom_point`.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends
+from geoalchemy2.functions import ST_MakeEnvelope
+from geojson_pydantic import Point
+from pydantic import Field
+from sqlalchemy import Select, func, select
+
+from app.core.db.models import Event, Tour
+from app.core.db.session import SessionDep
+from app.core.geo import decode_point
+from app.core.security import OAuthSecurityContextDep
+from app.explore.schemas import (
+    BBoxParams,
+    EventFeature,
+    EventFeatureCollection,
+    EventFeatureProperties,
+)
+
+router = APIRouter()
+
+
+class EventsParams(BBoxParams):
+    # Events overlapping the date range
+    start_dt: datetime | None = None
+    end_dt: datetime | None = None
+    limit: int = Field(default=10, gt=0, le=100)
+    offset: int = Field(default=0, ge=0)
+
+
+EventsParamsDep = Annotated[EventsParams, Depends()]
+
+
+def get_events_in_bbox_statement(
+    min_lon: float,
+    min_lat: float,
+    max_lon: float,
+    max_lat: float,
+    start_dt: datetime | None = None,
+    end_dt: datetime | None = None,
+) -> Select[tuple[Any, ...]]:
+    """
+    Select the events in a bounding box by start date. The permissions of the
+    events and of their tours are filtered by the `do_orm_execute` hook.
+    """
+    statement = (
+        select(
+            Event.id,
+            Event.name,
+            Event.start_dt,
+            Event.end_dt,
+            Event.tour_id,
+            Tour.name.label("tour_name"),
+            Event.geom_point,
+        )
+        .join(Tour, Tour.id == Event.tour_id)
+        .where(
+            Event.geom_point.intersects(
+                ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, 4326)
+            )
+        )
+        .order_by(Event.start_dt.asc().nulls_last(), Event.id)
+    )
+    if start_dt is not None:
+        statement = statement.where(
+            func.coalesce(Event.end_dt, Event.start_dt) >= start_dt
+        )
+    if end_dt is not None:
+        statement = statement.where(Event.start_dt <= end_dt)
+    return statement
+
+
+@router.get(
+    "/events",
+    response_model=EventFeatureCollection,
+    response_model_exclude_none=True,
+    dependencies=[OAuthSecurityContextDep],
+)
+def get_events(session: SessionDep, params: EventsParamsDep) -> EventFeatureCollection:
+    min_lon, min_lat, max_lon, max_lat = params.bounds
+    statement = get_events_in_bbox_statement(
+        min_lon,
+        min_lat,
+        max_lon,
+        max_lat,
+        start_dt=params.start_dt,
+        end_dt=params.end_dt,
+    )
+    rows = session.execute(statement.limit(params.limit).offset(params.offset))
+
+    return EventFeatureCollection(
+        type="FeatureCollection",
+        features=[
+            EventFeature(
+                type="Feature",
+                geometry=Point(type="Point", coordinates=decode_point(row.geom_point)),
+                properties=EventFeatureProperties(
+                    id=row.id,
+                    type="event",
+                    name=row.name,
+                    start_dt=row.start_dt,
+                    end_dt=row.end_dt,
+                    tour_id=row.tour_id,
+                    tour_name=row.tour_name,
+                ),
+            )
+            for row in rows
+        ],
+    )
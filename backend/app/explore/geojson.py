@@ -0,0 +1,469 @@
+"""
+SQL engine of `/explore`: the `TourFeatureCollection` of each tour is assembled
+as JSON by Postgres, without loading ORM objects nor validating Pydantic models.
+
+The output follows the schemas of `app.explore.schemas`, as serialized by the
+Python engine with `response_model_exclude_none`: null fields are stripped.
+Events are located at the center of their venues, and the tour line joins
+these centers.
+
+Statements select from CTEs, which the `do_orm_execute` hook can't see
+through, so the permission filters are applied explicitly.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from geoalchemy2.functions import (
+    ST_X,
+    ST_Y,
+    ST_Intersects,
+    ST_MakeEnvelope,
+    ST_XMax,
+    ST_XMin,
+    ST_YMax,
+    ST_YMin,
+)
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    String,
+    and_,
+    case,
+    cast,
+    func,
+    literal,
+    select,
+    union,
+)
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.selectable import NamedFromClause
+from sqlalchemy_utils import Ltree
+
+from app.core.db.models import (
+    Activity,
+    Actor,
+    AddressGeo,
+    Contact,
+    Discipline,
+    Event,
+    EventActorAssoc,
+    Mobility,
+    Org,
+    OrgActivity,
+    Person,
+    Tour,
+    TourActorAssoc,
+    TourDiscipline,
+    TourMobility,
+    TreeBase,
+)
+from app.core.security import filter_by_permissions
+from app.explore.cache import ExploreTour
+from app.tours.repository import filter_tours_by_year
+
+jsonb_object = func.jsonb_build_object
+jsonb_array = func.jsonb_build_array
+
+
+def empty_array() -> ColumnElement[Any]:
+    return literal([], JSONB)
+
+
+def flatten(arrays: ColumnElement[Any]) -> ColumnElement[Any]:
+    """Concatenate an array of arrays"""
+    return func.jsonb_path_query_array(arrays, "$[*][*]")
+
+
+def tree_public(model: type[TreeBase]) -> ColumnElement[Any]:
+    """`TreePublic`"""
+    return jsonb_object("name", model.name, "path", cast(model.path, String))
+
+
+def actor_geo(actors: NamedFromClause) -> ColumnElement[Any]:
+    """`OrgGeo` or `PersonGeo`"""
+    return jsonb_object(
+        "id",
+        actors.c.id,
+        "type",
+        actors.c.type,
+        "name",
+        actors.c.name,
+        "activities",
+        actors.c.activities,
+    )
+
+
+def actor_feature(
+    actors: NamedFromClause, type: str, parent_id: ColumnElement[Any]
+) -> ColumnElement[Any]:
+    """`ActorFeature` of an actor assoc"""
+    return jsonb_object(
+        "type",
+        "Feature",
+        "geometry",
+        jsonb_object("type", "Point", "coordinates", actors.c.coordinates),
+        "properties",
+        jsonb_object(
+            "id",
+            actors.c.id,
+            "type",
+            type,
+            "parent_id",
+            parent_id,
+            "name",
+            actors.c.name,
+            "role",
+            actors.c.role,
+            "actor_type",
+            actors.c.type,
+            "description",
+            actors.c.description,
+            "activities",
+            actors.c.activities,
+        ),
+    )
+
+
+def get_tour_feature_collections_statement(
+    session: Session,
+    mobility_path: str | None,
+    min_lon: float,
+    min_lat: float,
+    max_lon: float,
+    max_lat: float,
+    min_year: int | None = None,
+    max_year: int | None = None,
+) -> Select[tuple[float, float, float, float, dict[str, Any]]]:
+    """
+    Returns a statement selecting the bounding box and the JSON collection of
+    the tours intersecting the bounding box, like `get_tours_in_bbox`
+    """
+    tours_statement = select(
+        Tour.id,
+        Tour.name,
+        Tour.description,
+        Tour.year,
+        Tour.bbox,
+    ).filter(
+        ST_Intersects(
+            Tour.bbox, ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, 4326)
+        )
+    )
+    if mobility_path is not None and mobility_path != "":
+        tours_statement = tours_statement.where(
+            Tour.mobilities.any(Mobility.path.descendant_of(Ltree(mobility_path)))
+        )
+    tours_statement = filter_tours_by_year(tours_statement, min_year, max_year)
+    tours = filter_by_permissions(tours_statement, Tour, session).cte("tours")
+
+    # Actors of the tours and of their visible events
+    actor_ids = union(
+        select(TourActorAssoc.actor_id).join(
+            tours, tours.c.id == TourActorAssoc.tour_id
+        ),
+        filter_by_permissions(
+            select(EventActorAssoc.actor_id)
+            .join(Event, Event.id == EventActorAssoc.event_id)
+            .join(tours, tours.c.id == Event.tour_id),
+            Event,
+            session,
+        ),
+    )
+    activities = (
+        select(func.jsonb_agg(tree_public(Activity)))
+        .join(OrgActivity, OrgActivity.activity_id == Activity.id)
+        .where(OrgActivity.org_id == Actor.id)
+        .scalar_subquery()
+    )
+    org = Org.__table__
+    person = Person.__table__
+    actors = filter_by_permissions(
+        select(
+            Actor.id,
+            Actor.type,
+            func.coalesce(org.c.name, person.c.name).label("name"),
+            org.c.description,
+            case((Actor.type == "Org", func.coalesce(activities, empty_array()))).label(
+                "activities"
+            ),
+            ST_X(AddressGeo.geom_point).label("x"),
+            ST_Y(AddressGeo.geom_point).label("y"),
+        )
+        .outerjoin(org, org.c.id == Actor.id)
+        .outerjoin(person, person.c.id == Actor.id)
+        .outerjoin(Contact, Contact.id == Actor.contact_id)
+        .outerjoin(AddressGeo, AddressGeo.id == Contact.address_id)
+        .where(Actor.id.in_(actor_ids)),
+        Actor,
+        session,
+    ).cte("actors")
+
+    def assoc_actors(assoc: type[TourActorAssoc] | type[EventActorAssoc]):
+        return select(
+            *actors.c,
+            case((actors.c.x.isnot(None), jsonb_array(actors.c.x, actors.c.y))).label(
+                "coordinates"
+            ),
+            assoc.role.label("role"),
+        ).join(actors, actors.c.id == assoc.actor_id)
+
+    tour_actors = (
+        assoc_actors(TourActorAssoc)
+        .add_columns(TourActorAssoc.tour_id)
+        .cte("tour_actors")
+    )
+
+    # Tour actor features and producers, by tour
+    tour_actor_summaries = (
+        select(
+            tour_actors.c.tour_id,
+            func.jsonb_agg(
+                actor_feature(tour_actors, "tour_actor", tour_actors.c.tour_id)
+            )
+            .filter(tour_actors.c.coordinates.isnot(None))
+            .label("features"),
+            func.jsonb_agg(actor_geo(tour_actors))
+            .filter(tour_actors.c.role == "producer")
+            .label("producers"),
+        )
+        .group_by(tour_actors.c.tour_id)
+        .cte("tour_actor_summaries")
+    )
+
+    # Events in the center of their venues
+    events = filter_by_permissions(
+        select(
+            Event.id,
+            Event.tour_id,
+            Event.start_dt,
+            Event.end_dt,
+            ST_X(Event.geom_point).label("x"),
+            ST_Y(Event.geom_point).label("y"),
+        ).join(tours, tours.c.id == Event.tour_id),
+        Event,
+        session,
+    ).cte("events")
+    event_venues = (
+        assoc_actors(EventActorAssoc)
+        .add_columns(EventActorAssoc.event_id)
+        .where(EventActorAssoc.role == "diffusion")
+        .cte("event_venues")
+    )
+    event_summaries = (
+        select(
+            events.c.id,
+            events.c.tour_id,
+            events.c.start_dt,
+            events.c.end_dt,
+            events.c.x,
+            events.c.y,
+            func.coalesce(
+                func.jsonb_agg(actor_geo(event_venues)).filter(
+                    event_venues.c.id.isnot(None)
+                ),
+                empty_array(),
+            ).label("venues"),
+        )
+        .outerjoin(event_venues, event_venues.c.event_id == events.c.id)
+        .group_by(*events.c)
+        .subquery()
+    )
+    coordinates = case(
+        (
+            event_summaries.c.x.isnot(None),
+            jsonb_array(event_summaries.c.x, event_summaries.c.y),
+        )
+    )
+    events_with_previous = select(
+        event_summaries,
+        coordinates.label("coordinates"),
+        func.lag(coordinates)
+        .over(
+            partition_by=event_summaries.c.tour_id,
+            order_by=event_summaries.c.start_dt.asc().nulls_first(),
+        )
+        .label("previous_coordinates"),
+    ).cte("events_with_previous")
+
+    # Event actor features: the tour actors, by event
+    event_actor_features = (
+        select(
+            events.c.id,
+            func.jsonb_agg(
+                actor_feature(tour_actors, "event_actor", events.c.id)
+            ).label("features"),
+        )
+        .join(tour_actors, tour_actors.c.tour_id == events.c.tour_id)
+        .where(tour_actors.c.coordinates.isnot(None))
+        .group_by(events.c.id)
+        .cte("event_actor_features")
+    )
+
+    # Event features and the tour line, by tour
+    ev = events_with_previous
+    event_feature = jsonb_object(
+        "type",
+        "Feature",
+        "geometry",
+        case(
+            (
+                ev.c.coordinates.isnot(None),
+                jsonb_object("type", "Point", "coordinates", ev.c.coordinates),
+            )
+        ),
+        "properties",
+        jsonb_object(
+            "id",
+            ev.c.id,
+            "type",
+            "event_point",
+            "start_dt",
+            ev.c.start_dt,
+            "end_dt",
+            ev.c.end_dt,
+            "tour_id",
+            ev.c.tour_id,
+            "event_venues",
+            ev.c.venues,
+        ),
+    )
+    event_order = ev.c.start_dt.asc().nulls_first()
+    has_segment = and_(
+        ev.c.coordinates.isnot(None), ev.c.previous_coordinates.isnot(None)
+    )
+    event_summaries_by_tour = (
+        select(
+            ev.c.tour_id,
+            flatten(
+                func.jsonb_agg(
+                    aggregate_order_by(
+                        jsonb_array(event_feature).op("||")(
+                            func.coalesce(
+                                event_actor_features.c.features, empty_array()
+                            )
+                        ),
+                        event_order,
+                    )
+                )
+            ).label("features"),
+            flatten(
+                func.jsonb_agg(
+                    aggregate_order_by(
+                        jsonb_array(ev.c.previous_coordinates, ev.c.coordinates),
+                        event_order,
+                    )
+                ).filter(has_segment)
+            ).label("line"),
+        )
+        .outerjoin(event_actor_features, event_actor_features.c.id == ev.c.id)
+        .group_by(ev.c.tour_id)
+        .cte("event_summaries_by_tour")
+    )
+
+    def trees_by_tour(model: type[Discipline] | type[Mobility], assoc: Any):
+        return (
+            select(assoc.tour_id, func.jsonb_agg(tree_public(model)).label("trees"))
+            .join(model)
+            .join(tours, tours.c.id == assoc.tour_id)
+            .group_by(assoc.tour_id)
+            .cte(f"{model.__tablename__}_by_tour")
+        )
+
+    disciplines = trees_by_tour(Discipline, TourDiscipline)
+    mobilities = trees_by_tour(Mobility, TourMobility)
+
+    line_feature = jsonb_object(
+        "type",
+        "Feature",
+        "geometry",
+        case(
+            (
+                event_summaries_by_tour.c.line.isnot(None),
+                jsonb_object(
+                    "type",
+                    "MultiLineString",
+                    "coordinates",
+                    jsonb_array(event_summaries_by_tour.c.line),
+                ),
+            )
+        ),
+        "properties",
+        jsonb_object("id", tours.c.id, "type", "tour_line"),
+    )
+    collection = jsonb_object(
+        "type",
+        "FeatureCollection",
+        "features",
+        jsonb_array(line_feature)
+        .op("||")(func.coalesce(tour_actor_summaries.c.features, empty_array()))
+        .op("||")(func.coalesce(event_summaries_by_tour.c.features, empty_array())),
+        "properties",
+        jsonb_object(
+            "id",
+            tours.c.id,
+            "type",
+            "tour_collection",
+            "name",
+            tours.c.name,
+            "description",
+            tours.c.description,
+            "year",
+            tours.c.year,
+            "producers",
+            func.coalesce(tour_actor_summaries.c.producers, empty_array()),
+            "disciplines",
+            func.coalesce(disciplines.c.trees, empty_array()),
+            "mobilities",
+            func.coalesce(mobilities.c.trees, empty_array()),
+        ),
+    )
+
+    return (
+        select(
+            ST_XMin(tours.c.bbox),
+            ST_YMin(tours.c.bbox),
+            ST_XMax(tours.c.bbox),
+            ST_YMax(tours.c.bbox),
+            func.jsonb_strip_nulls(collection, type_=JSONB),
+        )
+        .select_from(tours)
+        .outerjoin(tour_actor_summaries, tour_actor_summaries.c.tour_id == tours.c.id)
+        .outerjoin(
+            event_summaries_by_tour, event_summaries_by_tour.c.tour_id == tours.c.id
+        )
+        .outerjoin(disciplines, disciplines.c.tour_id == tours.c.id)
+        .outerjoin(mobilities, mobilities.c.tour_id == tours.c.id)
+        .order_by(tours.c.year.desc())
+    )
+
+
+def get_tour_feature_collections(
+    session: Session,
+    mobility_path: str | None,
+    min_lon: float,
+    min_lat: float,
+    max_lon: float,
+    max_lat: float,
+    min_year: int | None = None,
+    max_year: int | None = None,
+) -> list[ExploreTour]:
+    """
+    Returns the serialized collections of the tours intersecting the bounding box
+    """
+    statement = get_tour_feature_collections_statement(
+        session,
+        mobility_path,
+        min_lon,
+        min_lat,
+        max_lon,
+        max_lat,
+        min_year,
+        max_year,
+    )
+    return [
+        ExploreTour(bbox=(x_min, y_min, x_max, y_max), collection=collection)
+        for x_min, y_min, x_max, y_max, collection in session.execute(statement)
+    ]
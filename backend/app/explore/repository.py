@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from geoalchemy2.functions import ST_Intersects, ST_MakeEnvelope
+from sqlalchemy import Select, select
+from sqlalchemy.orm import (
+    QueryableAttribute,
+    Session,
+    joinedload,
+    noload,
+    selectinload,
+    with_polymorphic,
+)
+from sqlalchemy.orm.interfaces import LoaderOption
+from sqlalchemy.orm.strategy_options import _AbstractLoad
+from sqlalchemy_utils import Ltree
+
+from app.core.db.models import (
+    Actor,
+    Contact,
+    Event,
+    EventActorAssoc,
+    Mobility,
+    Org,
+    Person,
+    Tour,
+    TourActorAssoc,
+)
+from app.tours.repository import filter_tours_by_year
+
+
+def get_actor_options(assoc_actor: QueryableAttribute) -> _AbstractLoad:
+    """
+    Load an assoc's actor with what the explore features need: its address
+    and, for orgs, its activities
+    """
+    actor_poly = with_polymorphic(Actor, [Org, Person])
+    return selectinload(assoc_actor.of_type(actor_poly)).options(
+        joinedload(actor_poly.contact).joinedload(Contact.address),
+        selectinload(actor_poly.Org.activities),
+        noload(actor_poly.membership_assocs),
+        noload(actor_poly.event_assocs),
+        noload(actor_poly.tour_assocs),
+    )
+
+
+def get_tour_options() -> tuple[LoaderOption, ...]:
+    """
+    Load everything `get_tour_feature_collection` walks through, so a response
+    for any number of tours executes a constant number of statements
+    """
+    return (
+        selectinload(Tour.events).options(
+            selectinload(Event.venue_assocs).options(
+                get_actor_options(EventActorAssoc.actor)
+            ),
+        ),
+        selectinload(Tour.actor_assocs).options(
+            get_actor_options(TourActorAssoc.actor)
+        ),
+        selectinload(Tour.producer_assocs).options(
+            get_actor_options(TourActorAssoc.actor)
+        ),
+        selectinload(Tour.disciplines),
+        selectinload(Tour.mobilities),
+    )
+
+
+def get_tours_in_bbox_statement(
+    mobility_path: str | None,
+    min_lon: float,
+    min_lat: float,
+    max_lon: float,
+    max_lat: float,
+    min_year: int | None = None,
+    max_year: int | None = None,
+) -> Select[tuple[Tour]]:
+    """
+    Returns the statement of `get_tours_in_bbox`
+    """
+    statement = (
+        select(Tour)
+        .options(*get_tour_options())
+        .filter(
+            ST_Intersects(
+                Tour.bbox,
+                ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, 4326),
+            )
+        )
+        .order_by(Tour.year.desc())
+    )
+    statement = filter_tours_by_year(statement, min_year, max_year)
+
+    if mobility_path is not None and mobility_path != "":
+        statement = statement.join(Tour.mobilities).filter(
+            Mobility.path.descendant_of(Ltree(mobility_path))
+        )
+
+    return statement
+
+
+def get_tours_in_bbox(
+    session: Session,
+    mobility_path: str | None,
+    min_lon: float,
+    min_lat: float,
+    max_lon: float,
+    max_lat: float,
+    min_year: int | None = None,
+    max_year: int | None = None,
+) -> Sequence[Tour]:
+    """Get all tours that intersect with the given bounding box"""
+    statement = get_tours_in_bbox_statement(
+        mobility_path, min_lon, min_lat, max_lon, max_lat, min_year, max_year
+    )
+    return session.scalars(statement).all()
@@ -1,39 +1,57 @@
 from __future__ import annotations
 
+import json
 import uuid
-from collections.abc import Sequence
-from typing import Annotated, Literal
+from collections.abc import Iterator
+from typing import Annotated, Any, Literal
 
-from fastapi import APIRouter, Depends
-from geoalchemy2 import WKBElement
-from geoalchemy2.functions import ST_Intersects, ST_MakeEnvelope
-from geoalchemy2.shape import to_shape
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
 from geojson_pydantic import MultiLineString, Point
-from shapely.geometry import Point as ShapelyPoint
-from sqlalchemy import select
-from sqlalchemy.orm import Session
-from sqlalchemy_utils import Ltree
+from pydantic import Field
+from sqlalchemy import Select
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.activities.schemas import TreePublic
+from app.core.config import settings
 from app.core.db.models import (
     Event,
     EventActorAssoc,
-    Mobility,
     Org,
     Person,
     Tour,
     TourActorAssoc,
 )
-from app.core.db.session import SessionDep
+from app.core.db.session import SessionDep, SessionFactoryDep
+from app.core.geo import decode_bounds, decode_point, get_segments_coordinates
 from app.core.schemas import (
-    AddressPublic,
     PageParams,
 )
-from app.core.security import OAuthSecurityContextDep
+from app.core.security import (
+    OAuthSecurityContextDep,
+    SecurityContext,
+    get_security_context,
+    set_security_context,
+)
+from app.explore.cache import (
+    ExploreTour,
+    explore_cache,
+    explore_tours_cache,
+    get_security_fingerprint,
+    intersects,
+    snap_bbox,
+)
+from app.explore.clustering import cluster_collections
+from app.explore.compact import compact_collections
+from app.explore.geojson import get_tour_feature_collections
+from app.explore.repository import get_tours_in_bbox, get_tours_in_bbox_statement
 from app.explore.schemas import (
     ActorFeature,
+    BBoxParams,
+    CompactExplore,
     EventPointFeature,
     EventPointFeatureProperties,
+    ExploreClusters,
     OrgFeatureProperties,
     OrgGeo,
     PersonFeatureProperties,
@@ -46,11 +64,27 @@ from app.explore.schemas import (
 
 router = APIRouter()
 
+# Tours loaded, with their relationships, per round trip when streaming
+STREAM_BATCH_SIZE = 50
+
 
-class ExplorePageParams(PageParams):
+class ExplorePageParams(PageParams, BBoxParams):
     activity: str | None = None
-    bbox: str
     mobility_path: str | None = None
+    # Year of the first event of the tours
+    min_year: int | None = None
+    max_year: int | None = None
+    # Defaults to the EXPLORE_ENGINE setting
+    engine: Literal["python", "sql"] | None = None
+    # Stream the collections of the python engine as a JSON array or as
+    # newline-delimited JSON
+    stream: Literal["json", "ndjson"] | None = None
+    # Cluster the points of the non-streamed responses below the
+    # EXPLORE_CLUSTER_MAX_ZOOM setting
+    zoom: int | None = Field(default=None, ge=0, le=22)
+    # Emit the actors, activities, disciplines and mobilities of the non-streamed
+    # responses once, in lookup tables referenced by the tours
+    format: Literal["geojson", "compact"] = "geojson"
 
 
 ExplorePageParamsDep = Annotated[ExplorePageParams, Depends()]
@@ -114,86 +148,20 @@ def get_tour_feature_geomety(tour: Tour) -> MultiLineString | None:
     """Return a multiline geometry joining all tour events location"""
 
     # Generate a MultiLineString, each LineString representing the way between two events
-    coordinates = []
-    for i in range(len(tour.events) - 1):
-        event1 = tour.events[i]
-        event2 = tour.events[i + 1]
-
-        address1 = AddressPublic.model_validate(
-            event1.actor_assocs[0].actor.contact.address
-        )
-        address2 = AddressPublic.model_validate(
-            event2.actor_assocs[0].actor.contact.address
-        )
-        if address1.geom_point and address2.geom_point:
-            coordinates.append(address1.geom_point.coordinates)
-            coordinates.append(address2.geom_point.coordinates)
+    coordinates = get_segments_coordinates([event.geom_point for event in tour.events])
 
     if len(coordinates) < 1:
         return None
     return MultiLineString(type="MultiLineString", coordinates=[coordinates])
 
 
-def get_center_coordinates_of_wkbelement_list(
-    points: list[WKBElement],
-) -> tuple[float, float]:
-    # Convert WKB to shapely points
-    shapely_points = [to_shape(p) for p in points]
-
-    # Calculate average coordinates
-    x_avg = sum(p.x for p in shapely_points) / len(shapely_points)
-    y_avg = sum(p.y for p in shapely_points) / len(shapely_points)
-
-    # Create new Point and return as tuple
-    point = ShapelyPoint(x_avg, y_avg)
-    return (point.x, point.y)
-
-
 def get_event_feature_geometry(event: Event) -> Point | None:
     """Return a Point geometry in the center of all event's actors with role diffusion"""
 
-    coordinates = []
-    for actor in event.event_venues:
-        if actor.contact.address.geom_point:
-            coordinates.append(actor.contact.address.geom_point)
-
-    if len(coordinates) < 1:
+    if event.geom_point is None:
         return None
 
-    return Point(
-        type="Point", coordinates=get_center_coordinates_of_wkbelement_list(coordinates)
-    )
-
-
-# Query functions
-def get_tours_in_bbox(
-    session: Session,
-    mobility_path: str | None,
-    min_lon: float,
-    min_lat: float,
-    max_lon: float,
-    max_lat: float,
-) -> Sequence[Tour]:
-    """Get all tours that intersect with the given bounding box"""
-    # Create the query
-    statement = (
-        select(Tour)
-        .filter(
-            ST_Intersects(
-                Tour.bbox,
-                ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, 4326),
-            )
-        )
-        .order_by(Tour.year.desc())  # type: ignore[attr-defined]
-    )
-
-    if mobility_path is not None and mobility_path != "":
-        statement = statement.join(Tour.mobilities).filter(
-            Mobility.path.descendant_of(Ltree(mobility_path))
-        )
-
-    # Execute the query
-    return session.scalars(statement).all()
+    return Point(type="Point", coordinates=decode_point(event.geom_point))
 
 
 def get_tour_feature_collection(tour: Tour) -> TourFeatureCollection:
@@ -287,7 +255,7 @@ def get_actor_assoc_features(
                 type=type,
                 parent_id=parent_id,
                 name=assoc.actor.name,
-                role=assoc.data.get("role"),
+                role=assoc.role,
                 description=assoc.actor.description,
                 activities=[
                     TreePublic.model_validate(activity)
@@ -300,50 +268,189 @@ def get_actor_assoc_features(
                 type=type,
                 parent_id=parent_id,
                 name=assoc.actor.name,
-                role=assoc.data.get("role"),
+                role=assoc.role,
             )
         else:
             raise ValueError(f"Unknown actor type: {assoc.actor.__class__.__name__}")
 
         geometry = Point(
             type="Point",
-            coordinates=get_center_coordinates_of_wkbelement_list(
-                [assoc.actor.contact.address.geom_point]  # type: ignore[list-item]
-            ),
+            coordinates=decode_point(assoc.actor.contact.address.geom_point),  # type: ignore[arg-type]
         )
-        feature: ActorFeature[
-            OrgFeatureProperties | PersonFeatureProperties
-        ] = ActorFeature(
-            type="Feature",
-            id=str(assoc.actor.id),
-            geometry=geometry,
-            properties=properties,
+        feature: ActorFeature[OrgFeatureProperties | PersonFeatureProperties] = (
+            ActorFeature(
+                type="Feature",
+                id=str(assoc.actor.id),
+                geometry=geometry,
+                properties=properties,
+            )
         )
         features.append(feature)
     return features
 
 
+def reshape_collections(
+    collections: list[dict[str, Any]],
+    cluster_zoom: int | None,
+    format: Literal["geojson", "compact"],
+) -> list[dict[str, Any]] | dict[str, Any]:
+    """
+    Cluster the points and/or compact serialized tour collections
+    """
+    if cluster_zoom is None:
+        return compact_collections(collections) if format == "compact" else collections
+    clusters = cluster_collections(collections, cluster_zoom)
+    if format == "compact":
+        return {**clusters, **compact_collections(clusters["tours"])}
+    return clusters
+
+
+def get_explore_tour(tour: Tour) -> ExploreTour:
+    """
+    Return the serialized collection of a tour, with its bounding box
+    """
+    # The tours are selected by their bounding box
+    assert tour.bbox is not None
+    return ExploreTour(
+        bbox=decode_bounds(tour.bbox),
+        collection=get_tour_feature_collection(tour).model_dump(
+            mode="json", exclude_none=True
+        ),
+    )
+
+
+def stream_tour_feature_collections(
+    session_factory: sessionmaker[Session],
+    security_context: SecurityContext,
+    statement: Select[tuple[Tour]],
+    ndjson: bool,
+) -> Iterator[str]:
+    """
+    Serialize the collections of the tours as they are fetched, a batch at a
+    time, instead of building the whole response in memory.
+
+    The session dependency has exited by the time the response is sent, so the
+    tours are fetched with a session of the stream, in the security context of
+    the request.
+    """
+    with session_factory() as session:
+        set_security_context(session, security_context)
+        result = session.scalars(
+            statement.execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        if not ndjson:
+            yield "["
+        separator = ""
+        for tours in result.partitions():
+            for tour in tours:
+                collection = get_tour_feature_collection(tour)
+                if ndjson:
+                    yield collection.model_dump_json(exclude_none=True) + "\n"
+                else:
+                    yield separator + collection.model_dump_json(exclude_none=True)
+                    separator = ","
+            # Forget the batch before loading the next one
+            session.expunge_all()
+        if not ndjson:
+            yield "]"
+
+
 @router.get(
     "/",
-    response_model=list[TourFeatureCollection],
+    response_model=list[TourFeatureCollection] | ExploreClusters | CompactExplore,
     response_model_exclude_none=True,
     dependencies=[OAuthSecurityContextDep],
 )
 def get_data(
     session: SessionDep,
+    session_factory: SessionFactoryDep,
     page_params: ExplorePageParamsDep,
-) -> list[TourFeatureCollection]:
-    # Get tours in the bounding box
-    tours = get_tours_in_bbox(
-        session,
-        page_params.mobility_path,
-        *map(float, page_params.bbox.split(",")),
+) -> Response:
+    bbox = page_params.bounds
+    min_lon, min_lat, max_lon, max_lat = bbox
+    engine = page_params.engine or settings.EXPLORE_ENGINE
+
+    if page_params.stream is not None and engine == "python":
+        return StreamingResponse(
+            stream_tour_feature_collections(
+                session_factory,
+                get_security_context(session),
+                get_tours_in_bbox_statement(
+                    page_params.mobility_path,
+                    min_lon,
+                    min_lat,
+                    max_lon,
+                    max_lat,
+                    min_year=page_params.min_year,
+                    max_year=page_params.max_year,
+                ),
+                ndjson=page_params.stream == "ndjson",
+            ),
+            media_type="application/x-ndjson"
+            if page_params.stream == "ndjson"
+            else "application/json",
+        )
+
+    cluster_zoom = (
+        page_params.zoom
+        if page_params.zoom is not None
+        and page_params.zoom < settings.EXPLORE_CLUSTER_MAX_ZOOM
+        else None
     )
 
-    # List of collections to return
-    results: list[TourFeatureCollection] = []
+    # Tours are fetched and cached for the snapped bounding box
+    snapped_bbox = snap_bbox(min_lon, min_lat, max_lon, max_lat)
+    tours_key = (
+        snapped_bbox,
+        (
+            page_params.mobility_path or None,
+            page_params.activity or None,
+            page_params.min_year,
+            page_params.max_year,
+        ),
+        engine,
+        get_security_fingerprint(get_security_context(session)),
+    )
+    tours = explore_tours_cache.get(tours_key)
+
+    if tours is None:
+        if engine == "sql":
+            tours = get_tour_feature_collections(
+                session,
+                page_params.mobility_path,
+                *snapped_bbox,
+                min_year=page_params.min_year,
+                max_year=page_params.max_year,
+            )
+        else:
+            tours = [
+                get_explore_tour(tour)
+                for tour in get_tours_in_bbox(
+                    session,
+                    page_params.mobility_path,
+                    *snapped_bbox,
+                    min_year=page_params.min_year,
+                    max_year=page_params.max_year,
+                )
+            ]
+        explore_tours_cache.set(tours_key, tours)
+
+    # The response only shows the tours intersecting the bounding box
+    tours = [tour for tour in tours if intersects(tour.bbox, bbox)]
+    cache_key = (
+        tours_key,
+        tuple(tour.collection["properties"]["id"] for tour in tours),
+        cluster_zoom,
+        page_params.format,
+    )
+    content = explore_cache.get(cache_key)
 
-    for tour in tours:
-        results.append(get_tour_feature_collection(tour))
+    if content is None:
+        content = json.dumps(
+            reshape_collections(
+                [tour.collection for tour in tours], cluster_zoom, page_params.format
+            )
+        ).encode()
+        explore_cache.set(cache_key, content)
 
-    return results
+    return Response(content=content, media_type="application/json")
@@ -1,15 +1,58 @@
 from __future__ import annotations
 
+import math
 import uuid
 from datetime import datetime
 from typing import Annotated, Generic, Literal
 
+from fastapi import HTTPException
 from geojson_pydantic import MultiLineString, Point
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing_extensions import TypeVar
 
 from app.activities.schemas import TreePublic
 
+BBox = tuple[float, float, float, float]
+
+# Query params
+
+
+def parse_bbox(value: str) -> BBox:
+    """
+    Return the bounds of a `min_lon,min_lat,max_lon,max_lat` query param
+    """
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in value.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=422, detail="bbox must be min_lon,min_lat,max_lon,max_lat"
+        ) from None
+    bounds = (min_lon, min_lat, max_lon, max_lat)
+    if not all(math.isfinite(v) for v in bounds):
+        raise HTTPException(status_code=422, detail="bbox must be finite")
+    if min_lon > max_lon or min_lat > max_lat:
+        raise HTTPException(status_code=422, detail="bbox min must not exceed max")
+    return bounds
+
+
+class BBoxParams(BaseModel):
+    # min_lon,min_lat,max_lon,max_lat
+    bbox: str
+
+    @field_validator("bbox")
+    @classmethod
+    def validate_bbox(cls, value: str) -> str:
+        """
+        A malformed bbox is a 422: the HTTPException isn't caught by Pydantic
+        """
+        parse_bbox(value)
+        return value
+
+    @property
+    def bounds(self) -> BBox:
+        return parse_bbox(self.bbox)
+
+
 # Base models
 
 
@@ -131,3 +174,131 @@ class TourFeatureCollectionProperties(BaseModel):
     producers: list[ActorGeo]
     disciplines: list[TreePublic]
     mobilities: list[TreePublic]
+
+
+## GeoJSON Cluster Feature
+
+
+class ClusterFeature(BaseModel):
+    type: Literal["Feature"]
+    geometry: Point
+    properties: ClusterFeatureProperties
+
+
+class ClusterFeatureProperties(BaseModel):
+    # The feature closest to the center of the cluster
+    id: uuid.UUID
+    type: Literal["cluster"]
+    cluster_of: Literal["event_point", "tour_actor", "event_actor"]
+    count: int
+
+
+class ClusterFeatureCollection(BaseModel):
+    type: Literal["FeatureCollection"]
+    features: list[ClusterFeature]
+
+
+class ExploreClusters(BaseModel):
+    """
+    Response of /explore at low zoom levels.
+
+    - tours: the TourFeatureCollection of each tour, with its TourLineFeature only
+    - clusters: the event and actor points, clustered on a grid
+    """
+
+    tours: list[TourFeatureCollection]
+    clusters: ClusterFeatureCollection
+
+
+# Compact format
+
+
+class ActorReference(BaseModel):
+    id: uuid.UUID
+    role: str | None = None
+
+
+class CompactActor(BaseModel):
+    type: Literal["Org", "Person"]
+    name: str
+    description: str | None = None
+    geometry: Point | None = None
+    # Paths of the activities of an Org
+    activities: list[str] | None = None
+
+
+class CompactEventPointFeature(BaseModel):
+    type: Literal["Feature"]
+    geometry: Point
+    properties: CompactEventPointFeatureProperties
+
+
+class CompactEventPointFeatureProperties(BaseModel):
+    id: uuid.UUID
+    type: Literal["event_point"]
+    start_dt: datetime
+    end_dt: datetime | None = None
+    tour_id: uuid.UUID
+    event_venues: list[uuid.UUID]
+
+
+class CompactTourFeatureCollection(BaseModel):
+    type: Literal["FeatureCollection"]
+    features: list[TourLineFeature | CompactEventPointFeature]
+    properties: CompactTourFeatureCollectionProperties
+
+
+class CompactTourFeatureCollectionProperties(BaseModel):
+    id: uuid.UUID
+    type: Literal["tour_collection"]
+    name: str
+    description: str | None = None
+    year: int
+    producers: list[uuid.UUID]
+    # Paths of the disciplines and mobilities
+    disciplines: list[str]
+    mobilities: list[str]
+    # The actors of the tour, and of each of its events
+    actors: list[ActorReference]
+
+
+class CompactExplore(BaseModel):
+    """
+    Response of /explore in the compact format: the tours reference the actors,
+    activities, disciplines and mobilities of the lookup tables, keyed by actor
+    id and by path.
+
+    At low zoom levels, the tours have their TourLineFeature only and the points
+    are clustered, as in ExploreClusters.
+    """
+
+    tours: list[CompactTourFeatureCollection]
+    clusters: ClusterFeatureCollection | None = None
+    actors: dict[uuid.UUID, CompactActor]
+    activities: dict[str, TreePublic]
+    disciplines: dict[str, TreePublic]
+    mobilities: dict[str, TreePublic]
+
+
+# Events in a bounding box
+
+
+class EventFeature(BaseModel):
+    type: Literal["Feature"]
+    geometry: Point
+    properties: EventFeatureProperties
+
+
+class EventFeatureProperties(BaseModel):
+    id: uuid.UUID
+    type: Literal["event"]
+    name: str | None = None
+    start_dt: datetime | None = None
+    end_dt: datetime | None = None
+    tour_id: uuid.UUID
+    tour_name: str
+
+
+class EventFeatureCollection(BaseModel):
+    type: Literal["FeatureCollection"]
+    features: list[EventFeature]
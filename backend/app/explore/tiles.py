@@ -0,0 +1,220 @@
+"""
+Mapbox Vector Tiles of the explore map, rendered by PostGIS.
+
+A tile has three layers:
+
+- tours: a line joining the events of a tour, by start date
+- events: a point in the center of the venues of an event
+- actors: the actors of the tours and of their events
+
+Tile statements select from subqueries, which the `do_orm_execute` hook can't see
+through, so the permission filters are applied explicitly.
+"""
+
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from geoalchemy2.functions import (
+    ST_AsMVT,
+    ST_AsMVTGeom,
+    ST_MakeLine,
+    ST_TileEnvelope,
+    ST_Transform,
+)
+from pydantic import BaseModel
+from sqlalchemy import (
+    ColumnElement,
+    LargeBinary,
+    Select,
+    String,
+    cast,
+    func,
+    literal,
+    select,
+    union,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.selectable import NamedFromClause
+from sqlalchemy_utils import Ltree
+
+from app.core.db.models import (
+    Activity,
+    Actor,
+    AddressGeo,
+    Contact,
+    Event,
+    EventActorAssoc,
+    Mobility,
+    Org,
+    OrgActivity,
+    Person,
+    Tour,
+    TourActorAssoc,
+)
+from app.core.db.session import SessionDep
+from app.core.security import OAuthSecurityContextDep, filter_by_permissions
+
+router = APIRouter()
+
+MAX_ZOOM = 22
+EXTENT = 4096
+BUFFER = 64
+MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+
+class TileParams(BaseModel):
+    activity: str | None = None
+    mobility_path: str | None = None
+
+
+TileParamsDep = Annotated[TileParams, Depends()]
+
+
+def get_layer(
+    name: str, rows: NamedFromClause, envelope: ColumnElement
+) -> ColumnElement[bytes]:
+    """
+    Encode the rows of a subquery, with a `geom` column in SRID 4326, as a
+    MVT layer
+    """
+    features = (
+        select(
+            ST_AsMVTGeom(
+                ST_Transform(rows.c.geom, 3857), envelope, EXTENT, BUFFER, True
+            ).label("geom"),
+            *(column for column in rows.c if column.name != "geom"),
+        )
+        .where(rows.c.geom.intersects(ST_Transform(envelope, 4326)))
+        .subquery(f"{name}_features")
+    )
+    mvt = select(ST_AsMVT(features.table_valued(), name, EXTENT, "geom"))
+    return func.coalesce(mvt.scalar_subquery(), literal(b"", LargeBinary))
+
+
+def get_tile_statement(
+    session: Session, z: int, x: int, y: int, params: TileParams
+) -> Select[tuple[bytes]]:
+    envelope = ST_TileEnvelope(z, x, y)
+
+    # Tours crossing the tile
+    tours_statement = select(Tour.id, Tour.name).where(
+        Tour.bbox.intersects(ST_Transform(envelope, 4326))
+    )
+    if params.mobility_path:
+        tours_statement = tours_statement.where(
+            Tour.mobilities.any(
+                Mobility.path.descendant_of(Ltree(params.mobility_path))
+            )
+        )
+    tours = filter_by_permissions(tours_statement, Tour, session).cte("tours")
+
+    # Events in the center of their venues
+    events = filter_by_permissions(
+        select(
+            Event.id,
+            Event.tour_id,
+            Event.name,
+            Event.start_dt,
+            Event.geom_point.label("geom"),
+        )
+        .join(tours, tours.c.id == Event.tour_id)
+        .where(Event.geom_point.isnot(None)),
+        Event,
+        session,
+    ).cte("events")
+
+    tour_lines = (
+        select(
+            cast(tours.c.id, String).label("id"),
+            tours.c.name,
+            ST_MakeLine(aggregate_order_by(events.c.geom, events.c.start_dt)).label(
+                "geom"
+            ),
+        )
+        .join(events, events.c.tour_id == tours.c.id)
+        .group_by(tours.c.id, tours.c.name)
+        .subquery()
+    )
+    event_points = select(
+        cast(events.c.id, String).label("id"),
+        cast(events.c.tour_id, String).label("tour_id"),
+        events.c.name,
+        cast(events.c.start_dt, String).label("start_dt"),
+        events.c.geom,
+    ).subquery()
+
+    # Actors of the tours and of their visible events, including the events
+    # without a point
+    actor_ids = union(
+        select(TourActorAssoc.actor_id).join(
+            tours, tours.c.id == TourActorAssoc.tour_id
+        ),
+        filter_by_permissions(
+            select(EventActorAssoc.actor_id)
+            .join(Event, Event.id == EventActorAssoc.event_id)
+            .join(tours, tours.c.id == Event.tour_id),
+            Event,
+            session,
+        ),
+    )
+    org = Org.__table__
+    person = Person.__table__
+    actors_statement = (
+        select(
+            cast(Actor.id, String).label("id"),
+            Actor.type,
+            func.coalesce(org.c.name, person.c.name).label("name"),
+            AddressGeo.geom_point.label("geom"),
+        )
+        .join(Contact, Contact.id == Actor.contact_id)
+        .join(AddressGeo, AddressGeo.id == Contact.address_id)
+        .outerjoin(org, org.c.id == Actor.id)
+        .outerjoin(person, person.c.id == Actor.id)
+        .where(Actor.id.in_(actor_ids))
+        .where(AddressGeo.geom_point.isnot(None))
+    )
+    if params.activity:
+        # Like the directory, only orgs have activities
+        actors_statement = actors_statement.where(
+            select(OrgActivity.org_id)
+            .join(Activity, Activity.id == OrgActivity.activity_id)
+            .where(OrgActivity.org_id == Actor.id)
+            .where(Activity.path.descendant_of(Ltree(params.activity)))
+            .exists()
+        )
+    actor_points = filter_by_permissions(actors_statement, Actor, session).subquery()
+
+    return select(
+        get_layer("tours", tour_lines, envelope)
+        .op("||")(get_layer("events", event_points, envelope))
+        .op("||")(get_layer("actors", actor_points, envelope))
+    )
+
+
+@router.get(
+    "/tiles/{z}/{x}/{y}.pbf",
+    response_class=Response,
+    responses={200: {"content": {MEDIA_TYPE: {}}}},
+    dependencies=[OAuthSecurityContextDep],
+)
+def get_tile(
+    session: SessionDep,
+    z: int,
+    x: int,
+    y: int,
+    params: TileParamsDep,
+) -> Response:
+    if not 0 <= z <= MAX_ZOOM or not 0 <= x < 2**z or not 0 <= y < 2**z:
+        raise HTTPException(status_code=404, detail="Tile not found")
+
+    tile = session.scalar(get_tile_statement(session, z, x, y, params))
+
+    return Response(
+        content=tile or b"",
+        media_type=MEDIA_TYPE,
+        # Tiles depend on the permissions of the caller
+        headers={"Cache-Control": "private, max-age=60"},
+    )
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import Row, Select, String, cast, literal, null, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.db.models import (
+    Activity,
+    Discipline,
+    Mobility,
+    Org,
+    Person,
+    Tour,
+    TreeBase,
+)
+from app.core.db.search import trigram_matches, trigram_similarity
+from app.core.security import filter_by_permissions
+
+
+def get_suggestions_statement(
+    *,
+    session: Session,
+    q: str,
+    limit: int,
+) -> Select[tuple[Any, ...]]:
+    """
+    Returns the statement of `get_suggestions`.
+
+    Each model is searched with its own trigram index and limited on its own,
+    the union being too opaque for the `do_orm_execute` hook, the permissions
+    are filtered explicitly.
+    """
+
+    def restricted(
+        model: type[Org] | type[Person] | type[Tour],
+    ) -> Select[tuple[Any, ...]]:
+        statement = select(
+            model.id,
+            literal(model.__name__, String).label("type"),
+            model.name,
+            cast(null(), String).label("path"),
+            trigram_similarity(model.name, q).label("similarity"),
+        ).where(trigram_matches(model.name, q))
+        return filter_by_permissions(statement, model, session)
+
+    def tree(model: type[TreeBase]) -> Select[tuple[Any, ...]]:
+        return select(
+            model.id,
+            literal(model.__name__, String).label("type"),
+            model.name,
+            cast(model.path, String).label("path"),
+            trigram_similarity(model.name, q).label("similarity"),
+        ).where(trigram_matches(model.name, q))
+
+    arms = [
+        *(restricted(model) for model in (Org, Person, Tour)),
+        *(tree(model) for model in (Activity, Discipline, Mobility)),
+    ]
+    suggestions = union_all(
+        *(
+            arm.order_by(arm.selected_columns.similarity.desc()).limit(limit)
+            for arm in arms
+        )
+    ).subquery()
+
+    return (
+        select(
+            suggestions.c.id,
+            suggestions.c.type,
+            suggestions.c.name,
+            suggestions.c.path,
+        )
+        .order_by(suggestions.c.similarity.desc(), suggestions.c.name)
+        .limit(limit)
+    )
+
+
+def get_suggestions(
+    *,
+    session: Session,
+    q: str,
+    limit: int = 10,
+) -> Sequence[Row[tuple[Any, ...]]]:
+    """
+    Returns the actors, tours, activities, disciplines and mobilities with a
+    name similar to `q`, the most similar first
+    """
+    return session.execute(
+        get_suggestions_statement(session=session, q=q, limit=limit)
+    ).all()
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+
+from app.core.db.session import SessionDep
+from app.core.security import OAuthSecurityContextDep
+from app.search import repository
+from app.search.schemas import Suggestion, SuggestParamsDep
+
+router = APIRouter()
+
+
+@router.get(
+    "/suggest",
+    response_model=list[Suggestion],
+    response_model_exclude_none=True,
+    dependencies=[OAuthSecurityContextDep],
+)
+def get_suggestions(
+    session: SessionDep,
+    params: SuggestParamsDep,
+) -> list[Suggestion]:
+    """
+    Names similar to the query, for autocompletion
+    """
+    rows = repository.get_suggestions(session=session, q=params.q, limit=params.limit)
+    return [Suggestion.model_validate(row._mapping) for row in rows]
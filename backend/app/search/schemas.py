@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import uuid
+from typing import Annotated, Literal
+
+from fastapi import Depends
+from pydantic import BaseModel, Field
+
+
+class SuggestParams(BaseModel):
+    q: str = Field(min_length=2, max_length=100)
+    limit: int = Field(default=10, gt=0, le=20)
+
+
+SuggestParamsDep = Annotated[SuggestParams, Depends()]
+
+
+class Suggestion(BaseModel):
+    id: uuid.UUID
+    type: Literal["Org", "Person", "Tour", "Activity", "Discipline", "Mobility"]
+    name: str
+    # Path of the activities, disciplines and mobilities
+    path: str | None = None
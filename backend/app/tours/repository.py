@@ -1,76 +1,166 @@
 from __future__ import annotations
 
 from collections.abc import Sequence
+from operator import attrgetter
+from typing import Any, TypeVar
 
-from sqlalchemy import func, select
+from sqlalchemy import Select, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import (
     Session,
     noload,
     selectinload,
 )
+from sqlalchemy.orm.strategy_options import _AbstractLoad
 
 from app.core.db.models import (
     Actor,
+    Event,
+    EventActorAssoc,
     Org,
     Tour,
     TourActorAssoc,
+    User,
 )
-from app.core.security import get_permission_filter, get_security_context
+from app.core.db.search import get_search_query, search_matches, search_rank
+from app.core.fieldsets import get_included_relationships
+from app.core.pagination import SortKey, get_page, get_page_async, paginate
+from app.core.security import filter_by_permissions
 from app.tours.schemas import ToursPageParams
 
+T = TypeVar("T", bound=tuple[Any, ...])
 
-def get_all_tours(
+TOUR_RELATIONSHIPS = (
+    "actor_assocs",
+    "disciplines",
+    "events",
+    "group_owner",
+    "mobilities",
+    "owner",
+)
+# Depth of the serialized tours, down to the actors of their events, see
+# app.core.schemas.NodePublic
+TOUR_MAX_DEPTH = 3
+
+# Tours without events last, the literal 0 matches the ix_tour_sort_year_id index
+TOUR_SORT_KEYS = (
+    SortKey(func.coalesce(Tour.year, literal_column("0")), lambda tour: tour.year or 0),
+    SortKey(Tour.id, attrgetter("id")),
+)
+
+
+def filter_tours_by_year(
+    statement: Select[T], min_year: int | None, max_year: int | None
+) -> Select[T]:
+    """
+    Keep the tours whose first event starts within a range of years
+    """
+    if min_year is not None:
+        statement = statement.where(Tour.year >= min_year)
+    if max_year is not None:
+        statement = statement.where(Tour.year <= max_year)
+    return statement
+
+
+def get_all_tours_statements(
     *,
-    session: Session,
-    page_params: ToursPageParams = ToursPageParams(),
-) -> tuple[Sequence[Tour], int]:
+    session: Session | AsyncSession,
+    page_params: ToursPageParams,
+) -> tuple[Select[Any], Select[tuple[int]]]:
     """
-    Returns all actors paginated and filtered by name or activity
-    Will load actors with their memberships and members. Memberships and members' actors
-    won't have their own children loaded.
+    Returns the paged statement and the count statement of `get_all_tours`
     """
 
-    select_actor = (
-        selectinload(TourActorAssoc.actor).options(
-            noload(Actor.membership_assocs),
-            noload(Actor.tour_assocs),
-            noload(Actor.event_assocs),
-            noload(Actor.contact),
-        ),
-        selectinload(TourActorAssoc.actor.of_type(Org)).options(
-            noload(Org.member_assocs),
+    def select_actor(
+        assoc: type[TourActorAssoc] | type[EventActorAssoc],
+    ) -> tuple[_AbstractLoad, ...]:
+        return (
+            selectinload(assoc.actor).options(
+                noload(Actor.membership_assocs),
+                noload(Actor.tour_assocs),
+                noload(Actor.event_assocs),
+                noload(Actor.contact),
+            ),
+            selectinload(assoc.actor.of_type(Org)).options(
+                noload(Org.member_assocs),
+            ),
+        )
+
+    # Loader options of each relationship, see app.core.fieldsets
+    loaders = {
+        "actor_assocs": select_actor(TourActorAssoc),
+        "events": (
+            selectinload(Event.actor_assocs).options(*select_actor(EventActorAssoc)),
         ),
+        "owner": (selectinload(User.person),),
+    }
+    include = get_included_relationships(
+        page_params.include, TOUR_RELATIONSHIPS, TOUR_RELATIONSHIPS
     )
     statement = select(Tour).options(
-        selectinload(Tour.actor_assocs).options(
-            *select_actor,
-        ),
+        *(
+            selectinload(getattr(Tour, name)).options(*loaders.get(name, ()))
+            if name in include
+            else noload(getattr(Tour, name))
+            for name in TOUR_RELATIONSHIPS
+        )
+    )
+    statement = filter_tours_by_year(
+        statement, page_params.min_year, page_params.max_year
     )
 
-    # Add pagination
-    paged_statement = statement.offset(page_params.offset).limit(page_params.limit)
+    if page_params.q is not None and page_params.q != "":
+        query = get_search_query(page_params.q)
+        statement = statement.where(search_matches(Tour.search_vector, query))
+        statement = statement.order_by(search_rank(Tour.search_vector, query).desc())
 
-    # Retrieve entities
-    tours = session.scalars(paged_statement).unique().all()
+    # Add pagination, the best matches then the most recent tours first
+    paged_statement = paginate(statement, page_params, TOUR_SORT_KEYS, descending=True)
 
     # Count statement
     # Since the security filter works by inspecting selected columns
     # we need to apply directly the filter
-    statement = statement.filter(
-        get_permission_filter(Tour, get_security_context(session))
-    )
+    statement = filter_by_permissions(statement, Tour, session)
     count_statement = select(func.count()).select_from(statement.subquery())
-    count = session.scalars(count_statement).one()
 
-    return tours, count
+    return paged_statement, count_statement
 
 
-def get_tour(*, session: Session, id) -> Tour:
+def get_all_tours(
+    *,
+    session: Session,
+    page_params: ToursPageParams = ToursPageParams(),
+) -> tuple[Sequence[Tour], int]:
     """
-    Returns details of tour:
-    - tour itself
-    - producers (actors with role "producer")
-    - list of events
+    Returns all actors paginated and filtered by name or activity
+    Will load actors with their memberships and members. Memberships and members' actors
+    won't have their own children loaded.
+    """
+    paged_statement, count_statement = get_all_tours_statements(
+        session=session, page_params=page_params
+    )
+
+    return get_page(session, paged_statement, count_statement, page_params)
+
+
+async def get_all_tours_async(
+    *,
+    session: AsyncSession,
+    page_params: ToursPageParams = ToursPageParams(),
+) -> tuple[Sequence[Tour], int]:
+    """
+    Async version of `get_all_tours`
+    """
+    paged_statement, count_statement = get_all_tours_statements(
+        session=session, page_params=page_params
+    )
+
+    return await get_page_async(session, paged_statement, count_statement, page_params)
+
+
+def get_tour_statement(*, id) -> Select[tuple[Tour]]:
+    """
+    Returns the statement of `get_tour`
     """
 
     select_tour_actor = (
@@ -116,4 +206,21 @@ def get_tour(*, session: Session, id) -> Tour:
         .where(Tour.id == id)
     )
 
-    return session.scalars(statement).one()
+    return statement
+
+
+def get_tour(*, session: Session, id) -> Tour:
+    """
+    Returns details of tour:
+    - tour itself
+    - producers (actors with role "producer")
+    - list of events
+    """
+    return session.scalars(get_tour_statement(id=id)).one()
+
+
+async def get_tour_async(*, session: AsyncSession, id) -> Tour:
+    """
+    Async version of `get_tour`
+    """
+    return (await session.scalars(get_tour_statement(id=id))).one()
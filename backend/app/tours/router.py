@@ -9,7 +9,10 @@ from sqlalchemy.exc import NoResultFound
 
 from app.core.db.models import Tour
 from app.core.db.session import SessionDep
-from app.core.schemas import AddressPublic, ErrorResponse, PagedResponse, TourPublic
+from app.core.fieldsets import dump_paged_response, get_excluded_fields
+from app.core.geo import get_segments_coordinates
+from app.core.pagination import get_next_cursor
+from app.core.schemas import ErrorResponse, PagedResponse, TourPublic
 from app.core.security import OAuthSecurityContextDep
 from app.tours import repository
 from app.tours.schemas import (
@@ -24,20 +27,12 @@ def get_tour_feature_collection(tour: Tour) -> FeatureCollection:
     tour.events.sort(key=lambda e: e.start_dt if e.start_dt is not None else -1)
 
     # Generate a MultiLineString, each LineString representing the way between two events
-    coordinates = []
-    for i in range(len(tour.events) - 1):
-        event1 = tour.events[i]
-        event2 = tour.events[i + 1]
-
-        address1 = AddressPublic.model_validate(
-            event1.actor_assocs[0].actor.contact.address
-        )
-        address2 = AddressPublic.model_validate(
-            event2.actor_assocs[0].actor.contact.address
-        )
-        if address1.geom_point and address2.geom_point:
-            coordinates.append(address1.geom_point.coordinates)
-            coordinates.append(address2.geom_point.coordinates)
+    coordinates = get_segments_coordinates(
+        [
+            event.actor_assocs[0].actor.contact.address.geom_point
+            for event in tour.events
+        ]
+    )
 
     if len(coordinates) < 1:
         return FeatureCollection.model_validate(
@@ -75,18 +70,33 @@ def get_all_tours(
     page_params: ToursPageParamsDep,
 ) -> Any:
     """
-    Paginated list of tours
+    Paginated list of tours, `include` and `fields` select the relationships
+    and the fields of the results
 
     """
 
-    actors, count = repository.get_all_tours(session=session, page_params=page_params)
+    excluded = get_excluded_fields(
+        (TourPublic,),
+        repository.TOUR_RELATIONSHIPS,
+        page_params.include,
+        page_params.fields,
+    )
+    tours, count = repository.get_all_tours(session=session, page_params=page_params)
 
-    return {
-        "total": count,
-        "limit": page_params.limit,
-        "offset": page_params.offset,
-        "results": actors,
-    }
+    return dump_paged_response(
+        PagedResponse[TourPublic],
+        {
+            "total": count,
+            "limit": page_params.limit,
+            "offset": page_params.offset,
+            "next_cursor": get_next_cursor(
+                tours, page_params, repository.TOUR_SORT_KEYS
+            ),
+            "results": tours,
+        },
+        excluded,
+        context={"max_depth": repository.TOUR_MAX_DEPTH},
+    )
 
 
 @router.get(
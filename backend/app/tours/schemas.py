@@ -5,12 +5,17 @@ from typing import Annotated
 from fastapi import Depends
 
 from app.core.schemas import (
-    PageParams,
+    KeysetPageParams,
 )
 
 
-class ToursPageParams(PageParams):
-    pass
+class ToursPageParams(KeysetPageParams):
+    # Year of the first event of the tours
+    min_year: int | None = None
+    max_year: int | None = None
+    # Comma separated relationships and fields, see app.core.fieldsets
+    include: str | None = None
+    fields: str | None = None
 
 
 ToursPageParamsDep = Annotated[ToursPageParams, Depends()]
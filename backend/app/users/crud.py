@@ -1,13 +1,18 @@
 from collections.abc import Sequence
+from operator import attrgetter
 
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.core.db.models import User
-from app.core.schemas import PageParams
+from app.core.pagination import SortKey, get_page, paginate
+from app.core.schemas import KeysetPageParams
 from app.core.security import get_password_hash, verify_password
 from app.users.schemas import UserCreate, UserUpdate
 
+# Emails are unique
+USER_SORT_KEYS = (SortKey(User.email, attrgetter("email")),)
+
 
 def create_user(*, session: Session, user_create: UserCreate) -> User:
     db_obj = User(**user_create.model_dump(exclude={"password"}))
@@ -21,13 +26,11 @@ def create_user(*, session: Session, user_create: UserCreate) -> User:
 def read_users(
     *,
     session: Session,
-    page_params: PageParams = PageParams(),
+    page_params: KeysetPageParams = KeysetPageParams(),
 ) -> tuple[Sequence[User], int]:
     count_statement = select(func.count()).select_from(User)
-    statement = select(User).offset(page_params.offset).limit(page_params.limit)
-    count = session.scalars(count_statement).one()
-    users = session.scalars(statement).all()
-    return users, count
+    statement = paginate(select(User), page_params, USER_SORT_KEYS)
+    return get_page(session, statement, count_statement, page_params)
 
 
 def update_user(
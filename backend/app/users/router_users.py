@@ -9,10 +9,11 @@ from app.core.db.models import (
 )
 from app.core.db.session import SessionDep
 from app.core.email.utils import generate_new_account_email, send_email
+from app.core.pagination import get_next_cursor
 from app.core.schemas import (
     ErrorResponse,
+    KeysetPageParamsDep,
     PagedResponse,
-    PageParamsDep,
 )
 from app.core.security import (
     CurrentUserDep,
@@ -37,7 +38,7 @@ router = APIRouter()
 )
 def read(
     session: SessionDep,
-    page_params: PageParamsDep,
+    page_params: KeysetPageParamsDep,
 ) -> PagedResponse[UserPublic]:
     """
     Read users.
@@ -51,6 +52,7 @@ def read(
             "total": count,
             "limit": page_params.limit,
             "offset": page_params.offset,
+            "next_cursor": get_next_cursor(users, page_params, crud.USER_SORT_KEYS),
             "results": users,
         }
     )
@@ -66,6 +66,7 @@ class Token(BaseModel):
 # Contents of JWT token
 class TokenPayload(BaseModel):
     sub: str | None = None
+    iat: int | None = None
 
 
 class NewPassword(BaseModel):
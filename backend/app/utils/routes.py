@@ -1,8 +1,14 @@
 from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
 
+from app.core.cache import CacheStats
 from app.core.email.utils import generate_test_email, send_email
-from app.core.security import get_current_active_superuser
+from app.core.security import (
+    get_current_active_superuser,
+    permission_plan_cache,
+    security_context_cache,
+)
+from app.explore.cache import explore_cache, explore_tours_cache
 from app.utils.schemas import Message
 
 router = APIRouter()
@@ -26,6 +32,22 @@ def test_email(email_to: EmailStr) -> Message:
     return Message(message="Test email sent")
 
 
+@router.get(
+    "/cache-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def cache_stats() -> dict[str, CacheStats]:
+    """
+    Hits, misses and sizes of the caches of the worker process.
+    """
+    return {
+        "explore": explore_cache.stats,
+        "explore_tours": explore_tours_cache.stats,
+        "permission_plan": permission_plan_cache.stats,
+        "security_context": security_context_cache.stats,
+    }
+
+
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
@@ -52,7 +52,7 @@ def find_first_tour_org_producer(tour: Tour) -> Org | None:
     Returns the first org attached to a tour via a "producer" relation.
     """
     for assoc in tour.actor_assocs:
-        if isinstance(assoc.actor, Org) and assoc.data["role"] == "producer":
+        if isinstance(assoc.actor, Org) and assoc.role == "producer":
             return assoc.actor
     return None
 
@@ -36,6 +36,8 @@ def test_db(session: Session) -> None:
 def create_db_extensions(session: Session) -> None:
     session.execute(text("CREATE EXTENSION IF NOT EXISTS ltree"))
     session.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+    session.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
+    session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
     session.commit()
 
 
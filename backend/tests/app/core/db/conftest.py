@@ -1,6 +1,7 @@
 import uuid
 
 import pytest
+from sqlalchemy import Select
 from sqlalchemy.orm import Session
 
 from app.core.db.models import (
@@ -18,6 +19,17 @@ def iid(name: str) -> uuid.UUID:
     return uuid.uuid5(uuid.NAMESPACE_OID, name)
 
 
+def explain(session: Session, statement: Select) -> str:
+    """Return the query plan of a statement"""
+    compiled = statement.compile(
+        dialect=session.get_bind().dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    return "\n".join(
+        session.connection().exec_driver_sql(f"EXPLAIN {compiled}").scalars()
+    )
+
+
 def create_person(
     session: Session,
     name: str,
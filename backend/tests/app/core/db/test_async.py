@@ -0,0 +1,151 @@
+"""
+Queries of the async repository variants on an `AsyncSession`.
+
+The async connections can't see the uncommitted data of `db_session`, so the
+entities are committed by a session of their own and deleted afterwards.
+"""
+
+import uuid
+from collections.abc import Generator
+from dataclasses import dataclass
+
+import pytest
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.activities.repository import get_activities_async
+from app.core.config import settings
+from app.core.db.models import Activity, Org, Tour
+from app.core.security import SecurityContext, set_security_context
+from app.directory.repository import get_all_actors_async, get_org_async
+from app.directory.schemas import DirectoryPageParams
+from app.tours.repository import get_all_tours_async, get_tour_async
+from app.tours.schemas import ToursPageParams
+
+pytestmark = pytest.mark.anyio
+
+
+@dataclass
+class CommittedEntities:
+    public_tour_id: uuid.UUID
+    private_tour_id: uuid.UUID
+    public_org_id: uuid.UUID
+    private_org_id: uuid.UUID
+
+
+@pytest.fixture(scope="function", params=[False, True], ids=["orm", "rls"])
+def committed_entities(
+    request: pytest.FixtureRequest,
+    db_session_factory: sessionmaker[Session],
+    monkeypatch: pytest.MonkeyPatch,
+) -> Generator[CommittedEntities, None, None]:
+    """
+    Commit public and private entities as the table owner, then filter them by
+    the ORM hooks or by the row level security policies
+    """
+    with db_session_factory() as session:
+        tours = [
+            Tour(name="async public tour", other_read=True),
+            Tour(name="async private tour", other_read=False),
+        ]
+        orgs = [
+            Org(name="async public org", other_read=True),
+            Org(name="async private org", other_read=False),
+        ]
+        session.add_all([*tours, *orgs])
+        session.commit()
+        entities = CommittedEntities(
+            public_tour_id=tours[0].id,
+            private_tour_id=tours[1].id,
+            public_org_id=orgs[0].id,
+            private_org_id=orgs[1].id,
+        )
+        monkeypatch.setattr(settings, "POSTGRES_ROW_LEVEL_SECURITY", request.param)
+
+        yield entities
+
+        monkeypatch.undo()
+        for entity in [*tours, *orgs]:
+            session.delete(entity)
+        session.commit()
+
+
+async def test_get_all_tours_async(
+    async_session: AsyncSession, committed_entities: CommittedEntities
+):
+    set_security_context(async_session, SecurityContext())
+
+    tours, _ = await get_all_tours_async(
+        session=async_session, page_params=ToursPageParams(limit=100)
+    )
+
+    tour_ids = {tour.id for tour in tours}
+    assert committed_entities.public_tour_id in tour_ids
+    assert committed_entities.private_tour_id not in tour_ids
+
+
+async def test_get_all_tours_async_superuser(
+    async_session: AsyncSession, committed_entities: CommittedEntities
+):
+    set_security_context(async_session, SecurityContext(is_superuser=True))
+
+    tours, _ = await get_all_tours_async(
+        session=async_session, page_params=ToursPageParams(limit=100)
+    )
+
+    assert {
+        committed_entities.public_tour_id,
+        committed_entities.private_tour_id,
+    } <= {tour.id for tour in tours}
+
+
+async def test_get_tour_async(
+    async_session: AsyncSession, committed_entities: CommittedEntities
+):
+    set_security_context(async_session, SecurityContext())
+
+    tour = await get_tour_async(
+        session=async_session, id=committed_entities.public_tour_id
+    )
+
+    assert tour.name == "async public tour"
+    with pytest.raises(NoResultFound):
+        await get_tour_async(
+            session=async_session, id=committed_entities.private_tour_id
+        )
+
+
+async def test_get_all_actors_async(
+    async_session: AsyncSession, committed_entities: CommittedEntities
+):
+    set_security_context(async_session, SecurityContext())
+
+    actors, _ = await get_all_actors_async(
+        session=async_session, page_params=DirectoryPageParams(limit=100)
+    )
+
+    actor_ids = {actor.id for actor in actors}
+    assert committed_entities.public_org_id in actor_ids
+    assert committed_entities.private_org_id not in actor_ids
+    with pytest.raises(NoResultFound):
+        await get_org_async(session=async_session, id=committed_entities.private_org_id)
+
+
+async def test_get_activities_async(
+    async_session: AsyncSession, db_session_factory: sessionmaker[Session]
+):
+    with db_session_factory() as session:
+        activity = Activity(path="async_theatre", name="Theatre")
+        session.add(activity)
+        session.commit()
+        try:
+            activities, count = await get_activities_async(
+                session=async_session, path="async_theatre"
+            )
+
+            assert [a.name for a in activities] == ["Theatre"]
+            assert count == 1
+        finally:
+            session.delete(activity)
+            session.commit()
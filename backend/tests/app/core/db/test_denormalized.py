@@ -0,0 +1,202 @@
+from datetime import datetime
+from typing import Any
+
+from geoalchemy2 import Geometry, WKBElement
+from geoalchemy2.shape import from_shape, to_shape
+from shapely.geometry import Point
+from sqlalchemy.orm import Session
+
+from app.core.db.models import (
+    AddressGeo,
+    Contact,
+    Event,
+    EventActorAssoc,
+    Org,
+    Person,
+    Tour,
+    TourActorAssoc,
+)
+
+
+def create_point(lon: float, lat: float) -> Any:
+    return from_shape(Point(lon, lat), srid=4326)
+
+
+def get_shape(geometry: Geometry | None) -> Any:
+    # Loaded geometries are WKB elements
+    assert isinstance(geometry, WKBElement)
+    return to_shape(geometry)
+
+
+def create_venue(session: Session, name: str, lon: float, lat: float) -> Org:
+    address = AddressGeo(q=name, geom_point=create_point(lon, lat))
+    org = Org(name=name, contact=Contact(address=address))
+    session.add(org)
+    return org
+
+
+def test_tour_bbox(db_session: Session):
+    tour = Tour(name="tour")
+    venue1 = create_venue(db_session, "venue1", 1, 2)
+    venue2 = create_venue(db_session, "venue2", 3, 5)
+    event1 = Event(tour=tour)
+    event1.actor_assocs.append(EventActorAssoc(actor=venue1, data={}))
+    db_session.add_all([tour, event1])
+    db_session.flush()
+
+    assert get_shape(tour.bbox).bounds == (1, 2, 1, 2)
+
+    # New event
+    event2 = Event(tour=tour)
+    event2.actor_assocs.append(EventActorAssoc(actor=venue2, data={}))
+    db_session.add(event2)
+    db_session.flush()
+
+    assert get_shape(tour.bbox).bounds == (1, 2, 3, 5)
+
+    # Moved venue
+    venue2.contact.address.geom_point = create_point(0, 0)
+    db_session.flush()
+
+    assert get_shape(tour.bbox).bounds == (0, 0, 1, 2)
+
+    # Deleted event
+    db_session.delete(event2)
+    db_session.flush()
+
+    assert get_shape(tour.bbox).bounds == (1, 2, 1, 2)
+
+
+def test_tour_bbox_last_venue_removed(db_session: Session):
+    tour = Tour(name="tour")
+    venue = create_venue(db_session, "venue", 1, 2)
+    event = Event(tour=tour)
+    event.actor_assocs.append(EventActorAssoc(actor=venue, data={}))
+    db_session.add_all([tour, event])
+    db_session.flush()
+
+    assert get_shape(tour.bbox).bounds == (1, 2, 1, 2)
+
+    # The deleted assoc was the only link of the event to a venue
+    event.actor_assocs.clear()
+    db_session.flush()
+
+    assert tour.bbox is None
+
+
+def test_tour_bbox_without_venue(db_session: Session):
+    tour = Tour(name="tour")
+    db_session.add_all([tour, Event(tour=tour)])
+    db_session.flush()
+
+    assert tour.bbox is None
+
+
+def test_event_geom_point(db_session: Session):
+    venue1 = create_venue(db_session, "venue1", 1, 2)
+    venue2 = create_venue(db_session, "venue2", 3, 4)
+    producer = create_venue(db_session, "producer", 10, 10)
+    event = Event(tour=Tour(name="tour"))
+    event.actor_assocs.append(EventActorAssoc(actor=venue1, data={"role": "diffusion"}))
+    event.actor_assocs.append(EventActorAssoc(actor=producer, data={}))
+    db_session.add(event)
+    db_session.flush()
+
+    assert get_shape(event.geom_point).coords[0] == (1, 2)
+
+    # New venue
+    assoc = EventActorAssoc(actor=venue2, data={"role": "diffusion"})
+    event.actor_assocs.append(assoc)
+    db_session.flush()
+
+    assert get_shape(event.geom_point).coords[0] == (2, 3)
+
+    # Moved venue
+    venue2.contact.address.geom_point = create_point(5, 6)
+    db_session.flush()
+
+    assert get_shape(event.geom_point).coords[0] == (3, 4)
+
+    # Removed venues
+    event.actor_assocs.remove(assoc)
+    db_session.flush()
+
+    assert get_shape(event.geom_point).coords[0] == (1, 2)
+
+    event.actor_assocs[0].data = {}
+    db_session.flush()
+
+    assert event.geom_point is None
+
+
+def test_assoc_role(db_session: Session):
+    producer = create_venue(db_session, "producer", 1, 2)
+    coproducer = create_venue(db_session, "coproducer", 3, 4)
+    tour = Tour(name="tour")
+    assoc = TourActorAssoc(actor=producer, data={"role": "producer"})
+    tour.actor_assocs.append(assoc)
+    tour.actor_assocs.append(TourActorAssoc(actor=coproducer, role="coproducer"))
+    db_session.add(tour)
+    db_session.flush()
+
+    assert assoc.role == "producer"
+    assert tour.actor_assocs[1].data == {"role": "coproducer"}
+
+    # Changed data
+    assoc.data = {"role": "diffuser"}
+    db_session.flush()
+
+    assert assoc.role == "diffuser"
+
+    # Changed role
+    assoc.role = "producer"
+    db_session.flush()
+
+    assert assoc.data == {"role": "producer"}
+    db_session.expire(tour)
+    assert tour.producers == [producer]
+
+
+def test_tour_first_start_dt(db_session: Session):
+    tour = Tour(name="tour")
+    event1 = Event(tour=tour, start_dt=datetime(2025, 3, 1))
+    db_session.add_all([tour, event1])
+    db_session.flush()
+
+    assert tour.first_start_dt == datetime(2025, 3, 1)
+    assert tour.year == 2025
+
+    # Earlier event
+    event2 = Event(tour=tour, start_dt=datetime(2024, 12, 1))
+    db_session.add(event2)
+    db_session.flush()
+
+    assert tour.year == 2024
+
+    # Rescheduled event
+    event2.start_dt = datetime(2025, 4, 1)
+    db_session.flush()
+
+    assert tour.first_start_dt == datetime(2025, 3, 1)
+
+    # Deleted events
+    db_session.delete(event1)
+    db_session.delete(event2)
+    db_session.flush()
+
+    assert tour.first_start_dt is None
+    assert tour.year is None
+
+
+def test_actor_sort_name(db_session: Session):
+    org = Org(name="org")
+    person = Person(name="person")
+    db_session.add_all([org, person])
+    db_session.flush()
+
+    assert (org.sort_name, person.sort_name) == ("org", "person")
+
+    org.name = "renamed"
+    db_session.flush()
+
+    assert org.sort_name == "renamed"
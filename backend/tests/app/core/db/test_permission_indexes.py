@@ -0,0 +1,107 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.db.models import Actor, Tour
+from app.core.security import (
+    SecurityContext,
+    get_permission_filter,
+    set_security_context,
+)
+from app.directory.repository import get_all_actors_statements
+from app.directory.schemas import DirectoryPageParams
+from app.tours.repository import get_all_tours_statements
+from app.tours.schemas import ToursPageParams
+from tests.app.core.db.conftest import create_default_users, explain, iid
+
+ROWS = 100_000
+
+
+def generate_dataset(session: Session) -> None:
+    """
+    Generate `ROWS` orgs and tours, a few of them readable by others, by members
+    or by the owner's group, like a real directory where most entries are private.
+    """
+    owner, owner_org = create_default_users(session)
+    params = {"rows": ROWS, "owner_id": owner.id, "group_owner_id": owner_org.id}
+    session.execute(
+        text(
+            """
+            WITH generated AS (
+                INSERT INTO actor (
+                    id, type, sort_name, owner_id, group_owner_id,
+                    group_read, group_write, member_read, member_write, other_read
+                )
+                SELECT
+                    id, 'Org', 'org ' || id, :owner_id,
+                    CASE WHEN i % 1000 = 0 THEN :group_owner_id END,
+                    i % 1000 = 0, true, i % 500 = 1, false, i % 500 = 2
+                FROM (
+                    SELECT gen_random_uuid() AS id, i
+                    FROM generate_series(1, :rows) AS i
+                ) AS series
+                RETURNING id, sort_name
+            )
+            INSERT INTO org (id, name) SELECT id, sort_name FROM generated
+            """
+        ),
+        params,
+    )
+    session.execute(
+        text(
+            """
+            INSERT INTO tour (
+                id, name, owner_id, group_owner_id,
+                group_read, group_write, member_read, member_write, other_read
+            )
+            SELECT
+                gen_random_uuid(), 'tour ' || i, :owner_id,
+                CASE WHEN i % 1000 = 0 THEN :group_owner_id END,
+                i % 1000 = 0, true, i % 500 = 1, false, i % 500 = 2
+            FROM generate_series(1, :rows) AS i
+            """
+        ),
+        params,
+    )
+    session.execute(text("ANALYZE actor, org, tour"))
+
+
+def get_security_contexts() -> dict[str, SecurityContext]:
+    return {
+        "anonymous": SecurityContext(),
+        "member": SecurityContext(user_id=iid("member"), is_member=True),
+        "group_member": SecurityContext(
+            user_id=iid("group_member"), group_ids=[iid("owner_org")]
+        ),
+    }
+
+
+@pytest.mark.parametrize("name", get_security_contexts())
+def test_directory_listing_uses_permission_indexes(db_session: Session, name: str):
+    generate_dataset(db_session)
+    security_context = get_security_contexts()[name]
+    set_security_context(db_session, security_context)
+    statement, count_statement = get_all_actors_statements(
+        session=db_session, page_params=DirectoryPageParams()
+    )
+    permission_filter = get_permission_filter(Actor, security_context)
+
+    for plan in (
+        explain(db_session, statement.filter(permission_filter)),
+        explain(db_session, count_statement),
+    ):
+        assert "Seq Scan on actor" not in plan, plan
+        assert "Index" in plan, plan
+
+
+@pytest.mark.parametrize("name", get_security_contexts())
+def test_tour_listing_uses_permission_indexes(db_session: Session, name: str):
+    generate_dataset(db_session)
+    statement, _count_statement = get_all_tours_statements(
+        session=db_session, page_params=ToursPageParams()
+    )
+    permission_filter = get_permission_filter(Tour, get_security_contexts()[name])
+
+    plan = explain(db_session, statement.filter(permission_filter))
+    assert "Seq Scan on tour" not in plan, plan
+    assert "Index" in plan, plan
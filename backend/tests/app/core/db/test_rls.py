@@ -0,0 +1,80 @@
+import pytest
+from pytest import FixtureRequest
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db.models import Event, Org, Person, Tour
+from app.core.security import (
+    SecurityContext,
+    set_security_context,
+    set_security_context_from_user,
+)
+from app.users.crud import get_user_by_email
+
+
+def get_visible_ids(session: Session, email: str) -> dict[str, set]:
+    # Start from a blank context, it is updated in place
+    session.info["security_context"] = SecurityContext()
+    set_security_context_from_user(
+        session, get_user_by_email(session=session, email=email)
+    )
+    return {
+        model.__name__: set(session.scalars(select(model.id)).all())
+        for model in (Tour, Event, Org, Person)
+    }
+
+
+@pytest.mark.parametrize(
+    "fixture",
+    [
+        "entities_with_default_permissions",
+        "entities_with_other_read_permission",
+        "entities_with_member_read_permission",
+        "entities_with_group_member_read_permission",
+    ],
+)
+@pytest.mark.parametrize(
+    "email",
+    [
+        "unprivileged@module",
+        "member@module",
+        "owner@module",
+        "group_member@module",
+        "superuser@module",
+    ],
+)
+def test_row_level_security_parity(
+    db_session: Session,
+    request: FixtureRequest,
+    monkeypatch: pytest.MonkeyPatch,
+    fixture: str,
+    email: str,
+):
+    request.getfixturevalue(fixture)
+
+    orm_ids = get_visible_ids(db_session, email)
+
+    monkeypatch.setattr(settings, "POSTGRES_ROW_LEVEL_SECURITY", True)
+    rls_ids = get_visible_ids(db_session, email)
+
+    assert rls_ids == orm_ids
+
+
+def test_row_level_security_bypassed_by_owner(
+    db_session: Session, monkeypatch: pytest.MonkeyPatch
+):
+    private = Tour(name="private", other_read=False)
+    db_session.add(private)
+    db_session.flush()
+    # Plain SQL, not filtered by the do_orm_execute hook
+    statement = text("SELECT id FROM tour WHERE id = :id").bindparams(id=private.id)
+
+    # The policies don't apply to the owner of the tables, so they don't get in
+    # the way of the indexes when the mode is off
+    set_security_context(db_session, SecurityContext())
+    assert db_session.scalars(statement).all() == [private.id]
+
+    monkeypatch.setattr(settings, "POSTGRES_ROW_LEVEL_SECURITY", True)
+    set_security_context(db_session, SecurityContext())
+    assert db_session.scalars(statement).all() == []
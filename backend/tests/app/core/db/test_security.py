@@ -1,13 +1,22 @@
 import uuid
-from unittest.mock import Mock, create_autospec
+from datetime import timedelta
+from unittest.mock import Mock, create_autospec, patch
 
 import pytest
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, with_polymorphic
 
+from app.core.db.models import Actor, Org, OrgActorAssoc, Person, Tour, User
 from app.core.security import (
     SecurityContext,
+    create_access_token,
+    get_restricted_models,
     get_security_context,
+    invalidate_security_contexts,
+    security_context_cache,
     set_security_context,
+    set_security_context_from_oauth,
     set_security_context_from_user,
 )
 
@@ -86,3 +95,68 @@ def test_set_security_context_from_user_no_person(mock_session):
     assert security_context.is_member is True
     assert len(security_context.group_ids) == 0
     mock_session.expunge_all.assert_called_once()
+
+
+def test_set_security_context_async_session():
+    # Arrange
+    async_session = AsyncSession()
+    security_context = SecurityContext(user_id=uuid.uuid4(), is_member=True)
+
+    # Act
+    set_security_context(async_session, security_context)
+
+    # Assert: the do_orm_execute hook reads the context from the proxied Session
+    assert get_security_context(async_session.sync_session) == security_context
+
+
+def test_set_security_context_from_oauth_is_cached(db_session: Session):
+    # Arrange
+    user = User(
+        email="cached@module", hashed_password="", is_active=True, is_member=True
+    )
+    db_session.add(user)
+    db_session.flush()
+    token = create_access_token(user.id, timedelta(minutes=5))
+    security_context_cache.clear()
+
+    # Act
+    set_security_context_from_oauth(db_session, token)
+    db_session.info.pop("security_context")
+    with (
+        patch.object(db_session, "scalars", side_effect=AssertionError),
+        patch.object(db_session, "scalar", side_effect=AssertionError),
+    ):
+        set_security_context_from_oauth(db_session, token)
+    security_context = get_security_context(db_session)
+
+    # Assert
+    assert security_context.user_id == user.id
+    assert security_context.is_member is True
+
+
+def test_security_context_invalidated_on_user_change(db_session: Session):
+    # Arrange
+    user = User(email="invalidated@module", hashed_password="", is_active=True)
+    db_session.add(user)
+    db_session.flush()
+    security_context_cache.set((str(user.id), None), SecurityContext(user_id=user.id))
+
+    # Act
+    user.is_member = True
+    db_session.flush()
+    invalidate_security_contexts(db_session)
+
+    # Assert
+    assert security_context_cache.get((str(user.id), None)) is None
+
+
+def test_get_restricted_models():
+    actor_poly = with_polymorphic(Actor, [Org, Person])
+
+    assert set(get_restricted_models(select(actor_poly))) == {Actor, Org, Person}
+    assert set(get_restricted_models(select(Tour.name))) == {Tour}
+    assert get_restricted_models(select(OrgActorAssoc)) == ()
+    # Columns of a subquery are filtered inside the subquery
+    subquery = select(Tour).subquery()
+    assert get_restricted_models(select(func.count()).select_from(subquery)) == ()
+    assert get_restricted_models(select(subquery.c.id)) == ()
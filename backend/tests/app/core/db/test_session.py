@@ -0,0 +1,16 @@
+from app.core.db.session import dispose_engine, get_engine, get_session_factory
+
+
+def test_get_engine_is_shared():
+    engine = get_engine()
+
+    assert get_engine() is engine
+    assert get_session_factory().kw["bind"] is engine
+
+
+def test_dispose_engine():
+    engine = get_engine()
+
+    dispose_engine()
+
+    assert get_engine() is not engine
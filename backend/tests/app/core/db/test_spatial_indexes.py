@@ -0,0 +1,68 @@
+from geoalchemy2.functions import (
+    ST_Intersects,
+    ST_MakeEnvelope,
+    ST_MakePoint,
+    ST_SetSRID,
+)
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.core.db.models import AddressGeo
+from tests.app.core.db.conftest import explain
+
+ROWS = 100_000
+
+
+def generate_addresses(session: Session) -> None:
+    """
+    Generate `ROWS` addresses spread over France, with a small square around
+    each point
+    """
+    session.execute(
+        text(
+            """
+            INSERT INTO addressgeo (id, q, geom_point, geom_shape)
+            SELECT
+                gen_random_uuid(),
+                'address ' || i,
+                ST_SetSRID(ST_MakePoint(x, y), 4326),
+                ST_Expand(ST_SetSRID(ST_MakePoint(x, y), 4326), 0.001)
+            FROM (
+                SELECT i, -5 + random() * 13 AS x, 42 + random() * 9 AS y
+                FROM generate_series(1, :rows) AS i
+            ) AS points
+            """
+        ),
+        {"rows": ROWS},
+    )
+    session.execute(text("ANALYZE addressgeo"))
+
+
+def test_bbox_uses_spatial_indexes(db_session: Session):
+    generate_addresses(db_session)
+    envelope = ST_MakeEnvelope(2.2, 48.8, 2.5, 48.9, 4326)
+
+    plan = explain(
+        db_session,
+        select(AddressGeo.id).where(ST_Intersects(AddressGeo.geom_point, envelope)),
+    )
+    assert "idx_addressgeo_geom_point" in plan, plan
+
+    plan = explain(
+        db_session,
+        select(AddressGeo.id).where(ST_Intersects(AddressGeo.geom_shape, envelope)),
+    )
+    assert "idx_addressgeo_geom_shape" in plan, plan
+
+
+def test_nearest_neighbours_use_spatial_index(db_session: Session):
+    generate_addresses(db_session)
+    point = ST_SetSRID(ST_MakePoint(2.35, 48.85), 4326)
+
+    plan = explain(
+        db_session,
+        select(AddressGeo.id)
+        .order_by(AddressGeo.geom_point.distance_centroid(point))
+        .limit(10),
+    )
+    assert "idx_addressgeo_geom_point" in plan, plan
@@ -0,0 +1,51 @@
+from unittest.mock import patch
+
+from app.core.cache import LRUCache
+
+
+def test_lru_cache_get_set():
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_cache_ttl():
+    cache: LRUCache[str, int] = LRUCache(maxsize=2, ttl=10)
+
+    with patch("app.core.cache.time.monotonic", return_value=100):
+        cache.set("a", 1)
+    with patch("app.core.cache.time.monotonic", return_value=105):
+        assert cache.get("a") == 1
+    with patch("app.core.cache.time.monotonic", return_value=111):
+        assert cache.get("a") is None
+
+
+def test_lru_cache_discard_where():
+    cache: LRUCache[tuple[str, int], int] = LRUCache(maxsize=10)
+    cache.set(("a", 1), 1)
+    cache.set(("a", 2), 2)
+    cache.set(("b", 1), 3)
+
+    cache.discard_where(lambda key: key[0] == "a")
+
+    assert len(cache) == 1
+    assert cache.get(("b", 1)) == 3
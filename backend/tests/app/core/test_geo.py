@@ -0,0 +1,60 @@
+import struct
+
+import numpy as np
+import pytest
+from geoalchemy2 import Geometry, WKBElement
+from geoalchemy2.shape import from_shape
+from shapely.geometry import LineString, Point
+
+from app.core.geo import (
+    decode_point,
+    decode_points,
+    get_centroid,
+    get_segments_coordinates,
+)
+
+
+def test_decode_point():
+    assert decode_point(from_shape(Point(2.35, 48.85), srid=4326)) == (2.35, 48.85)
+    assert decode_point(from_shape(Point(1, 2))) == (1, 2)
+
+    # Big endian, as a hex string
+    wkb = struct.pack(">BIdd", 0, 1, 3.5, -4.25)
+    assert decode_point(WKBElement(wkb.hex())) == (3.5, -4.25)
+
+    with pytest.raises(ValueError):
+        decode_point(from_shape(LineString([(0, 0), (1, 1)])))
+
+    with pytest.raises(TypeError):
+        decode_point(Geometry("POINT"))
+
+
+def test_decode_points():
+    points = decode_points(
+        [from_shape(Point(1, 2), srid=4326), None, from_shape(Point(3, 4))]
+    )
+
+    assert points.shape == (3, 2)
+    assert points[0].tolist() == [1, 2]
+    assert np.isnan(points[1]).all()
+    assert points[2].tolist() == [3, 4]
+
+
+def test_get_centroid():
+    points = [from_shape(Point(1, 2)), None, from_shape(Point(3, 6))]
+
+    assert get_centroid(points) == (2, 4)
+    assert get_centroid([None]) is None
+    assert get_centroid([]) is None
+
+
+def test_get_segments_coordinates():
+    a, b = from_shape(Point(1, 2)), from_shape(Point(3, 4))
+
+    assert get_segments_coordinates([a, b, None, a, b]) == [
+        (1, 2),
+        (3, 4),
+        (1, 2),
+        (3, 4),
+    ]
+    assert get_segments_coordinates([a]) == []
@@ -0,0 +1,34 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor, get_estimated_count
+
+
+def test_cursor_round_trip():
+    id = uuid.uuid4()
+
+    assert decode_cursor(encode_cursor(["Théâtre", id]), 2) == ["Théâtre", str(id)]
+
+
+@pytest.mark.parametrize(
+    "cursor", ["not a cursor", encode_cursor(["a", "b"]), encode_cursor(["a"])[:-2]]
+)
+def test_decode_invalid_cursor(cursor: str):
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor, 1)
+
+
+def test_get_estimated_count():
+    plan = [
+        {
+            "Plan": {
+                "Node Type": "Aggregate",
+                "Plan Rows": 1,
+                "Plans": [{"Node Type": "Seq Scan", "Plan Rows": 1234}],
+            }
+        }
+    ]
+
+    assert get_estimated_count(plan) == 1234
@@ -0,0 +1,66 @@
+import uuid
+
+from app.core.db.models import Org, OrgActorAssoc, Person
+from app.core.schemas import OrgPublic
+
+
+def create_org(name: str) -> Org:
+    return Org(
+        id=uuid.uuid4(),
+        name=name,
+        other_read=True,
+        member_read=True,
+        group_read=True,
+    )
+
+
+def test_org_public_drops_cyclic_assocs():
+    org = create_org("org")
+    member_org = create_org("member org")
+    person = Person(
+        id=uuid.uuid4(),
+        name="person",
+        other_read=True,
+        member_read=True,
+        group_read=True,
+    )
+    # Both orgs are members of each other
+    assoc = OrgActorAssoc(org=org, actor=member_org)
+    reverse_assoc = OrgActorAssoc(org=member_org, actor=org)
+    person_assoc = OrgActorAssoc(org=org, actor=person)
+    org.member_assocs = [assoc, person_assoc]
+    org.membership_assocs = [reverse_assoc]
+    member_org.member_assocs = [reverse_assoc]
+    member_org.membership_assocs = [assoc]
+    person.membership_assocs = [person_assoc]
+
+    org_public = OrgPublic.model_validate(org)
+
+    member_org_public = org_public.member_assocs[0].actor
+    assert isinstance(member_org_public, OrgPublic)
+    assert member_org_public.name == "member org"
+    # The assocs back to the org are dropped
+    assert member_org_public.member_assocs == []
+    assert member_org_public.membership_assocs == []
+    assert org_public.member_assocs[1].actor.membership_assocs == []
+    assert org_public.membership_assocs[0].org.name == "member org"
+
+
+def test_org_public_max_depth():
+    org = create_org("org")
+    member_org = create_org("member org")
+    nested_member_org = create_org("nested member org")
+    assoc = OrgActorAssoc(org=org, actor=member_org)
+    nested_assoc = OrgActorAssoc(org=member_org, actor=nested_member_org)
+    org.member_assocs = [assoc]
+    member_org.member_assocs = [nested_assoc]
+
+    org_public = OrgPublic.model_validate(org)
+    limited_org_public = OrgPublic.model_validate(org, context={"max_depth": 2})
+
+    member_org_public = org_public.member_assocs[0].actor
+    limited_member_org_public = limited_org_public.member_assocs[0].actor
+    assert isinstance(member_org_public, OrgPublic)
+    assert isinstance(limited_member_org_public, OrgPublic)
+    assert len(member_org_public.member_assocs) == 1
+    assert limited_member_org_public.member_assocs == []
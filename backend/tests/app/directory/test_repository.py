@@ -32,6 +32,51 @@ def test_get_all_actors_paginated(db_session: Session):
     assert count == 20  # Ensure count is returned
 
 
+@pytest.mark.usefixtures("function_create_actors")
+def test_get_all_actors_total(db_session: Session):
+    set_security_context(db_session, SecurityContext(is_superuser=True))
+
+    # Past the last page, the total is counted apart
+    actors, count = get_all_actors(
+        session=db_session, page_params=DirectoryPageParams(offset=20)
+    )
+
+    assert actors == []
+    assert count == 20
+
+    actors, count = get_all_actors(
+        session=db_session, page_params=DirectoryPageParams(total="estimate")
+    )
+
+    assert len(actors) == 10
+    assert count >= 0
+
+
+@pytest.mark.usefixtures("function_create_actors")
+def test_get_all_actors_search(db_session: Session):
+    set_security_context(db_session, SecurityContext(is_superuser=True))
+    db_session.add_all(
+        [
+            Org(name="Compagnie du Théâtre"),
+            Org(name="Cirque", description="Spectacles de théâtre de rue"),
+            Person(name="Théo"),
+        ]
+    )
+    db_session.flush()
+
+    # Accents and plurals are ignored, names rank first
+    actors, count = get_all_actors(
+        session=db_session, page_params=DirectoryPageParams(q="theatres")
+    )
+
+    assert all(isinstance(actor, Org | Person) for actor in actors)
+    assert [actor.name for actor in actors if isinstance(actor, Org | Person)] == [
+        "Compagnie du Théâtre",
+        "Cirque",
+    ]
+    assert count == 2
+
+
 def test_get_org(db_session: Session):
     set_security_context(db_session, SecurityContext(is_superuser=True))
 
@@ -19,6 +19,45 @@ def test_get_all_actors_endpoint(
     assert len(json_response["results"]) == 10  # Ensure results match the limit
 
 
+@pytest.mark.usefixtures("function_create_actors", "function_create_superuser")
+def test_get_all_actors_endpoint_cursor(
+    client: TestClient, superuser_token_headers: dict[str, str]
+):
+    first_page = client.get("/directory/?limit=15", headers=superuser_token_headers)
+    offset_page = client.get(
+        "/directory/?limit=5&offset=5", headers=superuser_token_headers
+    )
+    next_cursor = client.get(
+        "/directory/?limit=5", headers=superuser_token_headers
+    ).json()["next_cursor"]
+    cursor_page = client.get(
+        f"/directory/?limit=5&cursor={next_cursor}", headers=superuser_token_headers
+    )
+
+    ids = [actor["id"] for actor in first_page.json()["results"]]
+    assert [actor["id"] for actor in offset_page.json()["results"]] == ids[5:10]
+    assert [actor["id"] for actor in cursor_page.json()["results"]] == ids[5:10]
+
+
+@pytest.mark.usefixtures("function_create_actors", "function_create_superuser")
+def test_get_all_actors_endpoint_fieldsets(
+    client: TestClient, superuser_token_headers: dict[str, str]
+):
+    response = client.get(
+        "/directory/?include=activities&fields=name",
+        headers=superuser_token_headers,
+    )
+    unknown_field = client.get(
+        "/directory/?fields=password", headers=superuser_token_headers
+    )
+
+    assert response.status_code == 200
+    for actor in response.json()["results"]:
+        assert set(actor) <= {"id", "type", "name", "activities"}
+        assert "name" in actor
+    assert unknown_field.status_code == 422
+
+
 @pytest.mark.usefixtures("function_create_actors")
 def test_get_org_endpoint(client: TestClient, db_session: Session):
     org = Org(name="test_org", other_read=True)
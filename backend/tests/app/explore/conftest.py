@@ -0,0 +1,79 @@
+from datetime import datetime
+
+import pytest
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
+from sqlalchemy.orm import Session
+
+from app.core.db.models import (
+    Activity,
+    AddressGeo,
+    Contact,
+    Discipline,
+    Event,
+    EventActorAssoc,
+    Mobility,
+    Org,
+    Tour,
+    TourActorAssoc,
+)
+
+
+def create_venue(
+    session: Session, name: str, lon: float, lat: float, other_read: bool = True
+) -> Org:
+    address = AddressGeo(q=name, geom_point=from_shape(Point(lon, lat), srid=4326))
+    org = Org(name=name, contact=Contact(address=address), other_read=other_read)
+    session.add(org)
+    return org
+
+
+def create_tour(
+    session: Session,
+    name: str,
+    venues: list[Org],
+    other_read: bool = True,
+    producer: Org | None = None,
+) -> Tour:
+    tour = Tour(name=name, other_read=other_read)
+    if producer is not None:
+        tour.actor_assocs.append(
+            TourActorAssoc(actor=producer, data={"role": "producer"})
+        )
+    for day, venue in enumerate(venues, start=1):
+        event = Event(tour=tour, other_read=other_read, start_dt=datetime(2025, 1, day))
+        event.actor_assocs.append(
+            EventActorAssoc(actor=venue, data={"role": "diffusion"})
+        )
+        session.add(event)
+    session.add(tour)
+    session.flush()
+    return tour
+
+
+@pytest.fixture(scope="function")
+def public_and_private_tours(db_session: Session) -> tuple[Tour, Tour]:
+    """
+    Create a public tour in Paris and a private tour in Lyon
+    """
+    paris = create_venue(db_session, "paris", 2.35, 48.85)
+    versailles = create_venue(db_session, "versailles", 2.13, 48.80)
+    lyon = create_venue(db_session, "lyon", 4.83, 45.76)
+    public = create_tour(db_session, "public", [paris, versailles])
+    private = create_tour(db_session, "private", [lyon], other_read=False)
+    return public, private
+
+
+@pytest.fixture(scope="function")
+def explore_tours(db_session: Session) -> None:
+    activity = Activity(path="theatre", name="Theatre")
+    paris = create_venue(db_session, "paris", 2.35, 48.85)
+    paris.activities.append(activity)
+    versailles = create_venue(db_session, "versailles", 2.13, 48.80)
+    producer = create_venue(db_session, "producer", 2.30, 48.90)
+    producer.activities.append(activity)
+    tour = create_tour(db_session, "tour", [paris, versailles], producer=producer)
+    tour.disciplines.append(Discipline(path="dance", name="Dance"))
+    tour.mobilities.append(Mobility(path="bike", name="Bike"))
+    create_tour(db_session, "private", [paris], other_read=False)
+    db_session.flush()
@@ -0,0 +1,119 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.db.models import Tour
+from app.core.security import SecurityContext
+from app.explore.cache import (
+    ExploreCacheKey,
+    collect_explore_cache_invalidation,
+    explore_cache,
+    explore_tours_cache,
+    get_security_fingerprint,
+    intersects,
+    invalidate_explore_cache,
+    snap_bbox,
+)
+from tests.app.explore.conftest import create_tour, create_venue
+
+CACHE_KEY: ExploreCacheKey = (
+    ((0, 0, 1, 1), (), "python", "anonymous"),
+    (),
+    None,
+    "geojson",
+)
+
+
+def test_snap_bbox():
+    min_lon, min_lat, max_lon, max_lat = snap_bbox(2.1, 48.1, 2.9, 48.9)
+
+    assert min_lon <= 2.1 and min_lat <= 48.1
+    assert max_lon >= 2.9 and max_lat >= 48.9
+    # Nearby viewports share the snapped bounding box
+    assert snap_bbox(2.11, 48.12, 2.91, 48.88) == (min_lon, min_lat, max_lon, max_lat)
+
+
+def test_snap_bbox_world():
+    assert snap_bbox(-200, -100, 200, 100) == (-180, -90, 180, 90)
+
+
+def test_intersects():
+    assert intersects((0, 0, 2, 2), (1, 1, 3, 3))
+    # Borders included
+    assert intersects((0, 0, 1, 1), (1, 1, 2, 2))
+    assert intersects((0, 0, 1, 1), (0.5, 0.5, 0.5, 0.5))
+    assert not intersects((0, 0, 1, 1), (1.5, 0, 2, 1))
+    assert not intersects((0, 0, 1, 1), (0, 1.5, 1, 2))
+
+
+def test_get_security_fingerprint():
+    user_id = uuid.uuid4()
+    group_ids = [uuid.uuid4(), uuid.uuid4()]
+
+    assert get_security_fingerprint(SecurityContext()) == "anonymous"
+    assert (
+        get_security_fingerprint(SecurityContext(user_id=user_id, is_superuser=True))
+        == "superuser"
+    )
+    assert get_security_fingerprint(
+        SecurityContext(user_id=user_id, group_ids=group_ids)
+    ) == get_security_fingerprint(
+        SecurityContext(user_id=user_id, group_ids=group_ids[::-1])
+    )
+
+
+@pytest.mark.usefixtures("explore_tours")
+def test_explore_response_is_cached(client: TestClient, db_session: Session):
+    response = client.get("/explore/?bbox=2,48,3,49&engine=python")
+    hits = explore_cache.stats.hits
+
+    # Uncommitted changes don't invalidate the cache
+    tour = db_session.scalars(select(Tour).where(Tour.name == "tour")).one()
+    tour.name = "renamed"
+    db_session.flush()
+    cached_response = client.get("/explore/?bbox=2.01,48.01,3.01,49.01&engine=python")
+
+    assert explore_cache.stats.hits == hits + 1
+    assert cached_response.json() == response.json()
+
+
+@pytest.mark.usefixtures("explore_tours")
+def test_explore_response_only_shows_viewport(client: TestClient, db_session: Session):
+    # Outside of the viewport, inside of its snapped bounding box
+    outside = create_tour(
+        db_session, "outside", [create_venue(db_session, "reims", 3.5, 48.5)]
+    )
+    assert snap_bbox(2, 48, 3, 49) == snap_bbox(2, 48, 4, 49)
+
+    response = client.get("/explore/?bbox=2,48,3,49&engine=python")
+    wider_response = client.get("/explore/?bbox=2,48,4,49&engine=python")
+
+    assert response.status_code == 200
+    assert str(outside.id) not in [c["properties"]["id"] for c in response.json()]
+    assert str(outside.id) in [c["properties"]["id"] for c in wider_response.json()]
+
+
+def test_explore_cache_invalidated_on_change(db_session: Session):
+    explore_tours_cache.set(CACHE_KEY[0], [])
+    explore_cache.set(CACHE_KEY, b"[]")
+
+    tour = Tour(name="tour")
+    db_session.add(tour)
+    db_session.flush()
+    invalidate_explore_cache(db_session)
+
+    assert len(explore_tours_cache) == 0
+    assert len(explore_cache) == 0
+
+
+def test_explore_cache_kept_on_unrelated_change(db_session: Session):
+    explore_cache.clear()
+    explore_cache.set(CACHE_KEY, b"[]")
+
+    collect_explore_cache_invalidation(db_session, None)
+    invalidate_explore_cache(db_session)
+
+    assert len(explore_cache) == 1
@@ -0,0 +1,83 @@
+import uuid
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.explore.clustering import cluster_collections
+
+
+def point_feature(
+    type: str, lon: float, lat: float, id: str | None = None
+) -> dict[str, Any]:
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [lon, lat]},
+        "properties": {"id": id or str(uuid.uuid4()), "type": type},
+    }
+
+
+def test_cluster_collections():
+    line = {"type": "Feature", "properties": {"id": "tour", "type": "tour_line"}}
+    paris = point_feature("event_point", 2.35, 48.85)
+    collections = [
+        {
+            "type": "FeatureCollection",
+            "features": [
+                line,
+                paris,
+                point_feature("event_point", 2.36, 48.86),
+                point_feature("event_point", -4.48, 48.39),
+                point_feature("tour_actor", 2.35, 48.85, "actor"),
+                point_feature("event_actor", 2.35, 48.85, "actor"),
+                point_feature("event_actor", 2.35, 48.85, "actor"),
+            ],
+            "properties": {"id": "tour", "type": "tour_collection"},
+        }
+    ]
+
+    result = cluster_collections(collections, zoom=5)
+
+    assert result["tours"][0]["features"] == [line]
+    clusters = {
+        (f["properties"]["cluster_of"], f["properties"]["count"]): f
+        for f in result["clusters"]["features"]
+    }
+    assert set(clusters) == {
+        ("event_point", 2),
+        ("event_point", 1),
+        ("tour_actor", 1),
+        ("event_actor", 1),
+    }
+    assert clusters[("event_point", 2)]["geometry"]["coordinates"] == pytest.approx(
+        [2.355, 48.855]
+    )
+    assert clusters[("event_actor", 1)]["properties"]["id"] == "actor"
+
+
+def test_cluster_collections_without_points():
+    result = cluster_collections([], zoom=5)
+
+    assert result == {
+        "tours": [],
+        "clusters": {"type": "FeatureCollection", "features": []},
+    }
+
+
+@pytest.mark.usefixtures("explore_tours")
+def test_explore_clusters_at_low_zoom(client: TestClient):
+    response = client.get("/explore/?bbox=2,48,3,49&zoom=5")
+
+    assert response.status_code == 200
+    result = response.json()
+    assert len(result["tours"]) == 1
+    assert all(
+        feature["properties"]["type"] == "tour_line"
+        for feature in result["tours"][0]["features"]
+    )
+    assert result["clusters"]["features"]
+
+    # Individual features at high zoom
+    response = client.get("/explore/?bbox=2,48,3,49&zoom=15")
+
+    assert isinstance(response.json(), list)
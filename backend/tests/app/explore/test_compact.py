@@ -0,0 +1,152 @@
+import json
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.explore.compact import compact_collections
+from app.explore.schemas import CompactExplore
+
+THEATRE = {"name": "Theatre", "path": "theatre"}
+
+
+def actor_feature(
+    type: str, parent_id: str, role: str, id: str = "actor"
+) -> dict[str, Any]:
+    return {
+        "type": "Feature",
+        "id": id,
+        "geometry": {"type": "Point", "coordinates": [2.35, 48.85]},
+        "properties": {
+            "id": id,
+            "type": type,
+            "parent_id": parent_id,
+            "name": "Actor",
+            "role": role,
+            "actor_type": "Org",
+            "activities": [THEATRE],
+        },
+    }
+
+
+def test_compact_collections():
+    venue = {"id": "actor", "type": "Org", "name": "Actor", "activities": [THEATRE]}
+    event = {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [2.35, 48.85]},
+        "properties": {
+            "id": "event",
+            "type": "event_point",
+            "start_dt": "2025-01-01T00:00:00",
+            "tour_id": "tour",
+            "event_venues": [venue],
+        },
+    }
+    collections = [
+        {
+            "type": "FeatureCollection",
+            "features": [
+                event,
+                actor_feature("tour_actor", "tour", "producer"),
+                actor_feature("event_actor", "event", "diffusion"),
+            ],
+            "properties": {
+                "id": "tour",
+                "type": "tour_collection",
+                "name": "Tour",
+                "year": 2025,
+                "producers": [venue],
+                "disciplines": [{"name": "Dance", "path": "dance"}],
+                "mobilities": [],
+            },
+        }
+    ]
+
+    result = compact_collections(collections)
+
+    assert result["actors"] == {
+        "actor": {
+            "type": "Org",
+            "name": "Actor",
+            "geometry": {"type": "Point", "coordinates": [2.35, 48.85]},
+            "activities": ["theatre"],
+        }
+    }
+    assert result["activities"] == {"theatre": THEATRE}
+    assert result["disciplines"] == {"dance": {"name": "Dance", "path": "dance"}}
+    tour = result["tours"][0]
+    assert tour["properties"]["producers"] == ["actor"]
+    assert tour["properties"]["disciplines"] == ["dance"]
+    assert tour["properties"]["actors"] == [{"id": "actor", "role": "producer"}]
+    assert len(tour["features"]) == 1
+    event_properties = tour["features"][0]["properties"]
+    assert event_properties["event_venues"] == ["actor"]
+    assert "actors" not in event_properties
+
+
+def test_compact_collections_reference_tour_actors_once():
+    actor_ids = [f"actor-{i}" for i in range(4)]
+    event_ids = [f"event-{i}" for i in range(10)]
+    features = [
+        actor_feature("tour_actor", "tour", "producer", actor_id)
+        for actor_id in actor_ids
+    ]
+    for event_id in event_ids:
+        features.append(
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [2.35, 48.85]},
+                "properties": {
+                    "id": event_id,
+                    "type": "event_point",
+                    "start_dt": "2025-01-01T00:00:00",
+                    "tour_id": "tour",
+                    "event_venues": [],
+                },
+            }
+        )
+        # The tour actors, repeated for each event
+        features.extend(
+            actor_feature("event_actor", event_id, "producer", actor_id)
+            for actor_id in actor_ids
+        )
+    collection = {
+        "type": "FeatureCollection",
+        "features": features,
+        "properties": {
+            "id": "tour",
+            "type": "tour_collection",
+            "name": "Tour",
+            "year": 2025,
+            "producers": [],
+            "disciplines": [],
+            "mobilities": [],
+        },
+    }
+
+    result = compact_collections([collection])
+
+    assert set(result["actors"]) == set(actor_ids)
+    tour = result["tours"][0]
+    assert [a["id"] for a in tour["properties"]["actors"]] == actor_ids
+    assert [f["properties"]["id"] for f in tour["features"]] == event_ids
+    # Each actor is referenced once, however many events the tour has
+    assert json.dumps(result).count('"actor-0"') == 2
+
+
+@pytest.mark.usefixtures("explore_tours")
+@pytest.mark.parametrize("engine", ["python", "sql"])
+def test_explore_compact_format(client: TestClient, engine: str):
+    collections = client.get(f"/explore/?bbox=2,48,3,49&engine={engine}").json()
+
+    response = client.get(f"/explore/?bbox=2,48,3,49&engine={engine}&format=compact")
+
+    assert response.status_code == 200
+    result = CompactExplore.model_validate(response.json())
+    assert len(result.tours) == len(collections)
+    assert {str(id) for id in result.actors} >= {
+        feature["properties"]["id"]
+        for collection in collections
+        for feature in collection["features"]
+        if feature["properties"]["type"] in ("tour_actor", "event_actor")
+    }
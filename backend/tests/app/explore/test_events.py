@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from tests.app.explore.conftest import create_tour, create_venue
+
+
+def test_get_events(client: TestClient, db_session: Session):
+    paris = create_venue(db_session, "paris", 2.35, 48.85)
+    lyon = create_venue(db_session, "lyon", 4.83, 45.76)
+    create_tour(db_session, "public", [paris, lyon, paris])
+    create_tour(db_session, "private", [paris], other_read=False)
+
+    response = client.get("/explore/events?bbox=2,48,3,49")
+
+    assert response.status_code == 200
+    features = response.json()["features"]
+    assert [f["properties"]["tour_name"] for f in features] == ["public", "public"]
+    assert [f["properties"]["start_dt"] for f in features] == [
+        datetime(2025, 1, 1).isoformat(),
+        datetime(2025, 1, 3).isoformat(),
+    ]
+    assert features[0]["geometry"]["coordinates"] == [2.35, 48.85]
+
+
+def test_get_events_in_date_range(client: TestClient, db_session: Session):
+    paris = create_venue(db_session, "paris", 2.35, 48.85)
+    create_tour(db_session, "tour", [paris, paris, paris])
+
+    response = client.get(
+        "/explore/events?bbox=2,48,3,49"
+        "&start_dt=2025-01-02T00:00:00&end_dt=2025-01-02T12:00:00"
+    )
+
+    assert response.status_code == 200
+    assert [f["properties"]["start_dt"] for f in response.json()["features"]] == [
+        datetime(2025, 1, 2).isoformat()
+    ]
+
+
+def test_get_events_invalid_bbox(client: TestClient):
+    for bbox in ("2,48,3", "2,48,3,north", "3,48,2,49"):
+        response = client.get(f"/explore/events?bbox={bbox}")
+
+        assert response.status_code == 422
@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.db.models import Event, EventActorAssoc
+from tests.app.explore.conftest import create_tour, create_venue
+
+
+def get_collections(client: TestClient, engine: str) -> list[dict[str, Any]]:
+    response = client.get(f"/explore/?bbox=2,48,3,49&engine={engine}")
+    assert response.status_code == 200
+    return sorted(response.json(), key=lambda c: c["properties"]["id"])
+
+
+@pytest.mark.usefixtures("explore_tours")
+def test_sql_engine_matches_python_engine(client: TestClient):
+    collections = get_collections(client, "sql")
+
+    assert len(collections) == 1
+    assert collections == get_collections(client, "python")
+
+
+def test_sql_engine_hides_private_event_actors(client: TestClient, db_session: Session):
+    venue = create_venue(db_session, "venue", 2.35, 48.85)
+    private_venue = create_venue(db_session, "private venue", 2.36, 48.86)
+    tour = create_tour(db_session, "tour", [venue])
+    private_event = Event(tour=tour, other_read=False, start_dt=datetime(2025, 2, 1))
+    private_event.actor_assocs.append(
+        EventActorAssoc(actor=private_venue, data={"role": "diffusion"})
+    )
+    db_session.add(private_event)
+    db_session.flush()
+
+    collections = get_collections(client, "sql")
+
+    assert collections == get_collections(client, "python")
+    assert str(private_event.id) not in str(collections)
+    assert str(private_venue.id) not in str(collections)
+
+
+@pytest.mark.parametrize("stream", ["", "&stream=json"])
+def test_explore_invalid_bbox(client: TestClient, stream: str):
+    response = client.get(f"/explore/?bbox=2,48,north,49&engine=python{stream}")
+
+    assert response.status_code == 422
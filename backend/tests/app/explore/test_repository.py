@@ -0,0 +1,62 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.db.models import Activity
+from app.core.security import SecurityContext, set_security_context
+from app.explore.repository import get_tours_in_bbox
+from app.explore.router import get_tour_feature_collection
+from tests.app.explore.conftest import create_tour, create_venue
+
+
+@contextmanager
+def count_statements(session: Session) -> Iterator[list[str]]:
+    statements: list[str] = []
+
+    def before_cursor_execute(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explore(session: Session) -> int:
+    """
+    Return the number of statements executed to render the explore features
+    of the tours around Paris
+    """
+    session.expunge_all()
+    with count_statements(session) as statements:
+        for tour in get_tours_in_bbox(session, None, 2, 48, 3, 49):
+            get_tour_feature_collection(tour)
+    return len(statements)
+
+
+def create_tours(session: Session, count: int) -> None:
+    activity = Activity(path="explore", name="explore")
+    for i in range(count):
+        venue1 = create_venue(session, f"venue{i}_1", 2.35, 48.85)
+        venue1.activities.append(activity)
+        venue2 = create_venue(session, f"venue{i}_2", 2.13, 48.80)
+        producer = create_venue(session, f"producer{i}", 2.30, 48.90)
+        producer.activities.append(activity)
+        create_tour(session, f"tour{i}", [venue1, venue2], producer=producer)
+    session.flush()
+
+
+def test_explore_statement_count_is_constant(db_session: Session):
+    set_security_context(db_session, SecurityContext(is_superuser=True))
+
+    create_tours(db_session, 1)
+    count_for_one = explore(db_session)
+
+    create_tours(db_session, 10)
+    count_for_eleven = explore(db_session)
+
+    assert count_for_one == count_for_eleven
@@ -0,0 +1,47 @@
+import json
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.explore import router
+
+pytestmark = pytest.mark.usefixtures("explore_tours")
+
+
+def get_collections(client: TestClient) -> list[dict[str, Any]]:
+    response = client.get("/explore/?bbox=2,48,3,49&engine=python")
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def small_batches(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(router, "STREAM_BATCH_SIZE", 1)
+
+
+def test_stream_json(client: TestClient):
+    response = client.get("/explore/?bbox=2,48,3,49&engine=python&stream=json")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    # The stream leaves the session of the request, and the test data, as is
+    assert response.json() == get_collections(client)
+
+
+def test_stream_ndjson(client: TestClient):
+    collections = get_collections(client)
+
+    response = client.get("/explore/?bbox=2,48,3,49&engine=python&stream=ndjson")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line) for line in lines] == collections
+
+
+def test_stream_empty(client: TestClient):
+    response = client.get("/explore/?bbox=-2,-2,-1,-1&engine=python&stream=json")
+
+    assert response.status_code == 200
+    assert response.json() == []
@@ -0,0 +1,103 @@
+import math
+from datetime import datetime
+from typing import Any
+
+import mapbox_vector_tile  # type: ignore[import-untyped]
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.db.models import Event, EventActorAssoc, Tour
+from app.core.security import SecurityContext, set_security_context
+from app.explore.tiles import TileParams, get_tile_statement
+from tests.app.explore.conftest import create_tour, create_venue
+
+
+def get_tile_coordinates(lon: float, lat: float, z: int) -> tuple[int, int, int]:
+    n = 2**z
+    x = int((lon + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return z, x, y
+
+
+def get_tile(session: Session, lon: float, lat: float, z: int = 10) -> bytes:
+    tile = session.scalar(
+        get_tile_statement(session, *get_tile_coordinates(lon, lat, z), TileParams())
+    )
+    assert tile is not None
+    return tile
+
+
+def get_feature_ids(tile: bytes) -> dict[str, set[str]]:
+    """
+    Return the ids of the features of each layer of a tile
+    """
+    layers: dict[str, Any] = mapbox_vector_tile.decode(tile)
+    return {
+        name: {feature["properties"]["id"] for feature in layer["features"]}
+        for name, layer in layers.items()
+    }
+
+
+def test_get_tile(db_session: Session, public_and_private_tours: tuple[Tour, Tour]):
+    public, _private = public_and_private_tours
+    set_security_context(db_session, SecurityContext(is_superuser=True))
+
+    feature_ids = get_feature_ids(get_tile(db_session, 2.35, 48.85))
+
+    assert feature_ids["tours"] == {str(public.id)}
+    assert feature_ids["events"] == {str(event.id) for event in public.events}
+    assert feature_ids["actors"] == {
+        str(assoc.actor_id) for event in public.events for assoc in event.actor_assocs
+    }
+    # Nothing in the ocean
+    assert get_tile(db_session, -30, 40) == b""
+
+
+def test_get_tile_permissions(
+    db_session: Session, public_and_private_tours: tuple[Tour, Tour]
+):
+    _public, private = public_and_private_tours
+    set_security_context(db_session, SecurityContext())
+
+    assert get_tile(db_session, 2.35, 48.85) != b""
+    assert get_tile(db_session, 4.83, 45.76) == b""
+
+    set_security_context(db_session, SecurityContext(is_superuser=True))
+
+    assert get_feature_ids(get_tile(db_session, 4.83, 45.76))["tours"] == {
+        str(private.id)
+    }
+
+
+def test_get_tile_private_event_actors(db_session: Session):
+    venue = create_venue(db_session, "venue", 2.35, 48.85)
+    private_venue = create_venue(db_session, "private venue", 2.36, 48.86)
+    tour = create_tour(db_session, "tour", [venue])
+    public_event = tour.events[0]
+    # A public actor whose only link to the tour is a private event
+    private_event = Event(tour=tour, other_read=False, start_dt=datetime(2025, 2, 1))
+    private_event.actor_assocs.append(
+        EventActorAssoc(actor=private_venue, data={"role": "diffusion"})
+    )
+    db_session.add(private_event)
+    db_session.flush()
+    set_security_context(db_session, SecurityContext())
+
+    feature_ids = get_feature_ids(get_tile(db_session, 2.35, 48.85))
+
+    assert feature_ids["events"] == {str(public_event.id)}
+    assert feature_ids["actors"] == {str(venue.id)}
+
+
+@pytest.mark.usefixtures("public_and_private_tours")
+def test_get_tile_route(client: TestClient):
+    z, x, y = get_tile_coordinates(2.35, 48.85, 10)
+
+    response = client.get(f"/explore/tiles/{z}/{x}/{y}.pbf")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.mapbox-vector-tile"
+    assert b"tours" in response.content
+
+    response = client.get(f"/explore/tiles/{z}/{2**z}/{y}.pbf")
+    assert response.status_code == 404
@@ -0,0 +1,18 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.db.models import Activity, Org, Person, Tour
+
+
+@pytest.fixture(scope="function")
+def searchable_names(db_session: Session) -> None:
+    db_session.add_all(
+        [
+            Org(name="Compagnie Zéphyrine", other_read=True),
+            Org(name="Zéphyrine privée", other_read=False),
+            Person(name="Zéphyrin Martin", other_read=True),
+            Tour(name="Tournée Zéphyrine", other_read=True),
+            Activity(name="Zéphyrinologie", path="zephyrinologie"),
+        ]
+    )
+    db_session.flush()
@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.security import SecurityContext, set_security_context
+from app.search.repository import get_suggestions
+
+
+@pytest.mark.usefixtures("searchable_names")
+def test_get_suggestions(db_session: Session):
+    set_security_context(db_session, SecurityContext(is_superuser=True))
+
+    # Misspelled and without accents
+    suggestions = get_suggestions(session=db_session, q="zephirine")
+
+    assert {(s.type, s.name) for s in suggestions} >= {
+        ("Org", "Compagnie Zéphyrine"),
+        ("Org", "Zéphyrine privée"),
+        ("Tour", "Tournée Zéphyrine"),
+    }
+
+
+@pytest.mark.usefixtures("searchable_names")
+def test_get_suggestions_permissions(db_session: Session):
+    set_security_context(db_session, SecurityContext())
+
+    suggestions = get_suggestions(session=db_session, q="zephyrine")
+
+    assert "Zéphyrine privée" not in {s.name for s in suggestions}
+
+
+@pytest.mark.usefixtures("searchable_names")
+def test_get_suggestions_limit(db_session: Session):
+    set_security_context(db_session, SecurityContext(is_superuser=True))
+
+    suggestions = get_suggestions(session=db_session, q="zephyrin", limit=2)
+
+    assert len(suggestions) == 2
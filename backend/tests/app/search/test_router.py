@@ -0,0 +1,21 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.mark.usefixtures("searchable_names")
+def test_get_suggestions_endpoint(client: TestClient):
+    response = client.get("/search/suggest?q=zephyrinologie")
+
+    assert response.status_code == 200
+    assert response.json()[0] == {
+        "id": response.json()[0]["id"],
+        "type": "Activity",
+        "name": "Zéphyrinologie",
+        "path": "zephyrinologie",
+    }
+
+
+def test_get_suggestions_endpoint_short_query(client: TestClient):
+    response = client.get("/search/suggest?q=z")
+
+    assert response.status_code == 422
@@ -1,10 +1,11 @@
 import uuid
+from datetime import datetime
 
 import pytest
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import Session
 
-from app.core.db.models import Tour
+from app.core.db.models import Event, Tour
 from app.core.security import SecurityContext, set_security_context
 from app.tours.repository import get_all_tours, get_tour
 from app.tours.schemas import ToursPageParams
@@ -34,6 +35,40 @@ def test_get_all_tours_paginated(db_session: Session):
     assert count == 10  # Ensure count is returned
 
 
+def test_get_all_tours_by_year(db_session: Session):
+    set_security_context(db_session, SecurityContext(is_superuser=True))
+    for year in (2023, 2024, 2025):
+        tour = Tour(name=f"tour{year}")
+        db_session.add(Event(tour=tour, start_dt=datetime(year, 6, 1)))
+    db_session.flush()
+
+    tours, count = get_all_tours(
+        session=db_session, page_params=ToursPageParams(min_year=2024)
+    )
+
+    assert [tour.name for tour in tours] == ["tour2025", "tour2024"]
+    assert count == 2
+
+
+def test_get_all_tours_search(db_session: Session):
+    set_security_context(db_session, SecurityContext(is_superuser=True))
+    db_session.add_all(
+        [
+            Tour(name="Tournée des écoles"),
+            Tour(name="Festival", description="Une tournée à vélo"),
+            Tour(name="Autre"),
+        ]
+    )
+    db_session.flush()
+
+    tours, count = get_all_tours(
+        session=db_session, page_params=ToursPageParams(q="tournee")
+    )
+
+    assert [tour.name for tour in tours] == ["Tournée des écoles", "Festival"]
+    assert count == 2
+
+
 def test_get_tour(db_session: Session):
     set_security_context(db_session, SecurityContext(is_superuser=True))
 
@@ -1,12 +1,13 @@
 import uuid
 
 import pytest
+from fastapi.testclient import TestClient
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import Session
 
 from app.core.db.models import Tour
 from app.core.security import SecurityContext, set_security_context
-from app.tours.repository import get_all_tours, get_tour
+from app.tours.repository import TOUR_RELATIONSHIPS, get_all_tours, get_tour
 from app.tours.schemas import ToursPageParams
 
 
@@ -57,3 +58,33 @@ def test_get_tour_with_invalid_id(db_session: Session):
 
     with pytest.raises(NoResultFound):
         get_tour(session=db_session, id=invalid_id)
+
+
+@pytest.mark.usefixtures("function_create_tours", "function_create_superuser")
+def test_get_all_tours_endpoint_fieldsets(
+    client: TestClient, superuser_token_headers: dict[str, str]
+):
+    response = client.get(
+        "/tours/?include=events&fields=name", headers=superuser_token_headers
+    )
+    unknown_field = client.get(
+        "/tours/?fields=password", headers=superuser_token_headers
+    )
+
+    assert response.status_code == 200
+    tours = response.json()["results"]
+    assert len(tours) > 0
+    for tour in tours:
+        assert set(tour) <= {"id", "type", "name", "events"}
+        assert "name" in tour
+        assert not set(tour) & (set(TOUR_RELATIONSHIPS) - {"events"})
+    assert unknown_field.status_code == 422
+
+
+@pytest.mark.usefixtures("function_create_superuser")
+def test_get_all_tours_endpoint_unknown_include(
+    client: TestClient, superuser_token_headers: dict[str, str]
+):
+    response = client.get("/tours/?include=password", headers=superuser_token_headers)
+
+    assert response.status_code == 422
@@ -29,3 +29,24 @@ def test_health_check(client: TestClient) -> None:
     result = r.json()
     assert r.status_code == 200
     assert result
+
+
+@pytest.mark.usefixtures("function_create_superuser")
+def test_cache_stats(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get("/utils/cache-stats/", headers=superuser_token_headers)
+    result = r.json()
+    assert r.status_code == 200
+    assert set(result) == {
+        "explore",
+        "explore_tours",
+        "permission_plan",
+        "security_context",
+    }
+    assert set(result["explore"]) == {"hits", "misses", "size", "maxsize"}
+
+
+def test_cache_stats_requires_superuser(client: TestClient) -> None:
+    r = client.get("/utils/cache-stats/")
+    assert r.status_code == 401
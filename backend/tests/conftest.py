@@ -1,21 +1,25 @@
 import random
 import string
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from typing import Any
 
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import Session, SessionTransaction, sessionmaker
 from sqlalchemy.pool import NullPool
 from sqlalchemy_utils import create_database, database_exists, drop_database
 
 from app.core.config import settings
 from app.core.db.models import Base, User
-from app.core.db.session import get_db
+from app.core.db.rls import create_row_level_security
+from app.core.db.search import create_search_functions
+from app.core.db.session import get_db, get_session_factory
 from app.core.routes import api_router
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash, security_context_cache
+from app.explore.cache import explore_cache, explore_tours_cache
 
 
 def random_lower_string() -> str:
@@ -51,10 +55,19 @@ def db_engine() -> Generator[Engine, None, None]:
     with engine.connect() as conn:
         conn.execute(text("CREATE EXTENSION IF NOT EXISTS ltree"))
         conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        # Used by the generated search columns, see app.core.db.search
+        create_search_functions(conn)
         conn.commit()
 
     Base.metadata.create_all(engine)
 
+    # Policies are created by a migration, see app.core.db.rls
+    with engine.connect() as conn:
+        create_row_level_security(conn)
+        conn.commit()
+
     yield engine
 
     # Optional: Drop database after all tests
@@ -70,6 +83,29 @@ def db_session_factory(
     return sessionmaker(bind=db_engine)
 
 
+@pytest.fixture(scope="session")
+def async_db_engine(db_engine: Engine) -> AsyncEngine:
+    """
+    Async engine on the test database. Its connections can't see the
+    uncommitted data of `db_session`: async tests use committed data.
+    """
+    return create_async_engine(db_engine.url, poolclass=NullPool)
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    # psycopg runs async on asyncio
+    return "asyncio"
+
+
+@pytest.fixture(scope="function")
+async def async_session(
+    async_db_engine: AsyncEngine,
+) -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSession(async_db_engine) as session:
+        yield session
+
+
 @pytest.fixture(scope="function")
 def db_session(
     db_session_factory: sessionmaker[Session],
@@ -152,6 +188,13 @@ def client(app: FastAPI, db_session: Session) -> Generator[TestClient, Any, None
             pass
 
     app.dependency_overrides[get_db] = _get_test_db
+    # The sessions opened by the routes join the test transaction
+    app.dependency_overrides[get_session_factory] = lambda: sessionmaker(
+        bind=db_session.connection(), join_transaction_mode="create_savepoint"
+    )
+    security_context_cache.clear()
+    explore_tours_cache.clear()
+    explore_cache.clear()
     with TestClient(app) as client:
         yield client
 